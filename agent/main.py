@@ -4,19 +4,33 @@ import os
 import sys
 import logging
 from pathlib import Path
-from fastapi import FastAPI
+from fastapi import FastAPI, Query
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from ag_ui_adk import ADKAgent, add_adk_fastapi_endpoint
+from ag_ui_adk.session_manager import SessionManager
 from dotenv import load_dotenv
 import uvicorn
 
 # Add parent directory to Python path so we can import first_responder_agent
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from first_responder_agent.agent import root_agent
-
-# Load environment variables
+# Load environment variables (before importing the agent, which reads its workflow mode)
 load_dotenv()
 
+# Install span exporters before any agent code creates spans
+from first_responder_agent.common.tracing import setup_tracing
+from first_responder_agent.common.metrics import (
+    setup_metrics, render_metrics, ACTIVE_SESSIONS, SESSIONS_IN_MEMORY, SESSION_MEMORY_BYTES
+)
+setup_tracing()
+setup_metrics()
+
+from first_responder_agent.agent import root_agent
+from first_responder_agent.briefing import stream_briefing
+from agent.state_sync import DeltaSyncADKAgent, get_state_sync_mode, get_snapshot_interval, SYNC_DELTA
+from agent.session_store import create_session_service, get_session_store, STORE_MEMORY
+from agent.session_memory import MemoryBoundedSessionService
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -24,14 +38,36 @@ logging.basicConfig(
     datefmt='%Y-%m-%d %H:%M:%S'
 )
 
+# SESSION_STORE=sqlite keeps sessions in a shared SQLite file (several workers can serve them);
+# the default "memory" keeps them in this process only, within SESSION_MEMORY_BUDGET_MB
+session_service = create_session_service()
+
 # Create ADK Agent wrapper for AG-UI protocol
-adk_first_responder = ADKAgent(
+# AGUI_STATE_SYNC=delta (default) sends minimal state patches; "full" re-sends each changed key
+adk_agent_options = dict(
     adk_agent=root_agent,
     app_name="first_responder_agent",
     user_id="demo_user",
     session_timeout_seconds=3600,
+    # Runs beyond this many in flight are rejected with RUN_ERROR (ag_ui_adk default: 10)
+    max_concurrent_executions=int(os.getenv("AGUI_MAX_CONCURRENT_EXECUTIONS", "10")),
+    session_service=session_service,
+    # In-memory artifact, memory and credential services
     use_in_memory_services=True
 )
+if get_state_sync_mode() == SYNC_DELTA:
+    adk_first_responder = DeltaSyncADKAgent(snapshot_interval=get_snapshot_interval(), **adk_agent_options)
+else:
+    adk_first_responder = ADKAgent(**adk_agent_options)
+
+# Sessions held by the AG-UI session manager, read when /metrics is scraped
+ACTIVE_SESSIONS.set_function(lambda: [((), SessionManager.get_instance().get_session_count())])
+
+if isinstance(session_service, MemoryBoundedSessionService):
+    # Sessions with a run in flight (AG-UI thread id == session id) are never evicted
+    session_service.is_busy = lambda session_id: session_id in adk_first_responder._active_executions
+    SESSIONS_IN_MEMORY.set_function(lambda: [((), len(session_service))])
+    SESSION_MEMORY_BYTES.set_function(lambda: [((), session_service.total_bytes)])
 
 # Create FastAPI app
 app = FastAPI(
@@ -44,12 +80,35 @@ app = FastAPI(
 add_adk_fastapi_endpoint(app, adk_first_responder, path="/")
 
 
+app.add_event_handler("shutdown", session_service.close)
+
+
 @app.get("/health")
 async def health():
     """Health check endpoint."""
     return {"status": "healthy"}
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus metrics: latency histograms, error/timeout/cache counters and load gauges."""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/brief")
+async def brief(
+    lat: float = Query(..., ge=-90, le=90, description="Latitude in decimal degrees"),
+    lng: float = Query(..., ge=-180, le=180, description="Longitude in decimal degrees"),
+    radius: int = Query(5000, gt=0, le=50000, description="Relief search radius in meters")
+):
+    """Fast-path structured briefing for callers that already have coordinates.
+
+    Collects disaster and relief data directly (no agent loop) and streams the
+    insights analysis as server-sent events from a single model call.
+    """
+    return StreamingResponse(stream_briefing(lat, lng, radius), media_type="text/event-stream")
+
+
 if __name__ == "__main__":
     if not os.getenv("GOOGLE_API_KEY"):
         print("⚠️  Warning: GOOGLE_API_KEY environment variable not set!")
@@ -59,12 +118,20 @@ if __name__ == "__main__":
 
     # Backend always runs on port 8000 (frontend runs on PORT env var which is 3000 in Cloud Run)
     port = 8000
-    print(f"🚀 Starting First Responder Agent API on port {port}")
+    # Several workers need sessions they can share (SESSION_STORE=sqlite)
+    workers = int(os.getenv("API_WORKERS", "1"))
+    if workers > 1 and get_session_store() == STORE_MEMORY:
+        print("⚠️  API_WORKERS > 1 needs SESSION_STORE=sqlite (in-memory sessions are per process); using 1 worker")
+        workers = 1
+    print(f"🚀 Starting First Responder Agent API on port {port} ({workers} worker{'s' if workers > 1 else ''})")
 
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
         port=port,
         reload=False,  # Disable reload for faster startup
+        workers=workers,
+        # Each worker imports the agent tree before it answers health checks
+        timeout_worker_healthcheck=60,
         log_level="info"
     )
@@ -0,0 +1,285 @@
+"""Memory-bounded in-process session service for SESSION_STORE=memory.
+
+ag_ui_adk's default InMemorySessionService keeps every session until its
+timeout (an hour here): the whole event log, tool responses included, and the
+state with its map markers and activity history. Under incident-day load that
+grows until the container is OOM-killed. MemoryBoundedSessionService keeps the
+same in-process sessions under a per-process byte budget:
+
+  - Each session's size is estimated as the JSON size of its state and events,
+    kept up to date per appended event (only the state keys an event changes
+    are measured again)
+  - Past SESSION_MEMORY_BUDGET_MB, the least recently updated idle sessions are
+    evicted until the estimate is back under budget. A session is idle when no
+    run is in flight for it, it has no client tool calls awaiting results and
+    it has not been updated for SESSION_MEMORY_MIN_IDLE_SECONDS
+  - With SESSION_SPILL_DB_PATH set, evicted sessions are written to that SQLite
+    file (agent.session_store's schema) and read from it until they are
+    written to again, when they move back into memory. Without it they are
+    dropped; a client that comes back starts a new session from the state it
+    sends
+
+The estimate counts the data as JSON, not the Python objects holding it; the
+heap for the same sessions measured about 1.5 times the estimate, so leave
+headroom under the container limit. SESSION_MEMORY_BUDGET_MB=0 only measures.
+"""
+
+import copy
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from google.adk.events import Event
+from google.adk.sessions import InMemorySessionService, Session
+from google.adk.sessions.base_session_service import GetSessionConfig
+from google.adk.sessions.state import State
+
+from agent.session_store import SqliteSessionService, number_from_env, sqlite_options_from_env
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUDGET_MB = 256
+DEFAULT_MIN_IDLE_SECONDS = 60
+
+# State key ag_ui_adk keeps client tool calls awaiting results under
+PENDING_TOOL_CALLS_KEY = "pending_tool_calls"
+
+SessionKey = Tuple[str, str, str]
+
+
+def json_bytes(value: Any) -> int:
+    """Size of a value as JSON, the measure sessions are budgeted by."""
+    return len(json.dumps(value, default=str))
+
+
+def event_bytes(event: Event) -> int:
+    """Size of an event as JSON."""
+    return len(event.model_dump_json(exclude_none=True))
+
+
+class SessionSize:
+    """Estimated bytes of one in-memory session: each state key, and its events."""
+
+    def __init__(self, session: Session):
+        self.state = {name: json_bytes(value) for name, value in session.state.items()}
+        self.events = sum(event_bytes(event) for event in session.events)
+
+    @property
+    def total(self) -> int:
+        return sum(self.state.values()) + self.events
+
+
+class MemoryBoundedSessionService(InMemorySessionService):
+    """ADK in-memory session service that evicts idle sessions past a byte budget."""
+
+    def __init__(
+        self,
+        budget_bytes: int = DEFAULT_BUDGET_MB * 1024 * 1024,
+        min_idle_seconds: float = DEFAULT_MIN_IDLE_SECONDS,
+        spill: Optional[SqliteSessionService] = None,
+        is_busy: Optional[Callable[[str], bool]] = None
+    ):
+        """Create the service.
+
+        Args:
+            budget_bytes: Estimated bytes of sessions kept in memory (0 disables eviction)
+            min_idle_seconds: Sessions updated more recently than this are never evicted
+            spill: Store evicted sessions are written to (None drops them)
+            is_busy: Whether a session id has a run in flight; such sessions are never evicted
+        """
+        super().__init__()
+        self.budget_bytes = budget_bytes
+        self.min_idle_seconds = min_idle_seconds
+        self.spill = spill
+        self.is_busy = is_busy
+        self.total_bytes = 0
+        # Sessions held in memory, least recently updated first
+        self._sizes: "OrderedDict[SessionKey, SessionSize]" = OrderedDict()
+        # Evicted sessions whose spill write has not finished yet
+        self._spilling: Dict[SessionKey, Session] = {}
+        self._evicting = False
+        self._over_budget = False
+
+    def __len__(self) -> int:
+        return len(self._sizes)
+
+    def close(self) -> None:
+        """Close the spill store."""
+        if self.spill is not None:
+            self.spill.close()
+
+    # ===== Size accounting =====
+
+    def _stored(self, key: SessionKey) -> Optional[Session]:
+        return self.sessions.get(key[0], {}).get(key[1], {}).get(key[2])
+
+    def _track(self, key: SessionKey) -> None:
+        """Measure a session just put in memory and mark it most recently updated."""
+        self._untrack(key)
+        size = SessionSize(self._stored(key))
+        self._sizes[key] = size
+        self.total_bytes += size.total
+
+    def _untrack(self, key: SessionKey) -> None:
+        size = self._sizes.pop(key, None)
+        if size is not None:
+            self.total_bytes -= size.total
+
+    def _measure_event(self, key: SessionKey, event: Event) -> None:
+        """Add an appended event and the state keys it changed to the session's size."""
+        size = self._sizes.get(key)
+        stored = self._stored(key)
+        if size is None or stored is None:
+            return
+        before = size.total
+        size.events += event_bytes(event)
+        for name in (event.actions.state_delta if event.actions else None) or {}:
+            if not name.startswith(State.TEMP_PREFIX):
+                size.state[name] = json_bytes(stored.state.get(name))
+        self.total_bytes += size.total - before
+        self._sizes.move_to_end(key)
+
+    # ===== Eviction =====
+
+    def _next_idle(self) -> Optional[SessionKey]:
+        """Least recently updated session that can be evicted, or None."""
+        now = time.time()
+        for key in self._sizes:
+            session = self._stored(key)
+            if now - session.last_update_time < self.min_idle_seconds:
+                # The rest were updated even more recently
+                return None
+            if session.state.get(PENDING_TOOL_CALLS_KEY):
+                continue
+            if self.is_busy is not None and self.is_busy(key[2]):
+                continue
+            return key
+        return None
+
+    async def _evict(self) -> None:
+        """Evict idle sessions, least recently updated first, until back under budget."""
+        from first_responder_agent.common.metrics import SESSION_EVICTIONS
+
+        if not self.budget_bytes or self._evicting:
+            return
+        if self.total_bytes <= self.budget_bytes:
+            self._over_budget = False
+            return
+        self._evicting = True
+        try:
+            while self.total_bytes > self.budget_bytes:
+                key = self._next_idle()
+                if key is None:
+                    if not self._over_budget:
+                        logger.warning(f"[MemoryBoundedSessionService] {self.total_bytes} bytes in {len(self)} sessions "
+                                       f"is over the {self.budget_bytes}-byte budget and none is idle")
+                    self._over_budget = True
+                    return
+                size = self._sizes[key].total
+                session = self.sessions[key[0]][key[1]].pop(key[2])
+                self._untrack(key)
+                if self.spill is None:
+                    SESSION_EVICTIONS.inc("dropped")
+                    logger.info(f"[MemoryBoundedSessionService] Dropped session {key[2]} ({size} bytes)")
+                    continue
+                self._spilling[key] = session
+                try:
+                    await self.spill.store_session(session)
+                except Exception as e:
+                    logger.error(f"[MemoryBoundedSessionService] Spilling session {key[2]} failed, keeping it: {str(e)}")
+                    if self._spilling.pop(key, None) is not None:
+                        self._restore(key, session)
+                    return
+                SESSION_EVICTIONS.inc("spilled")
+                logger.info(f"[MemoryBoundedSessionService] Spilled session {key[2]} ({size} bytes)")
+                if self._spilling.pop(key, None) is None:
+                    # Written to again while it was being stored; memory has the current copy
+                    await self.spill.delete_session(app_name=key[0], user_id=key[1], session_id=key[2])
+            self._over_budget = False
+        finally:
+            self._evicting = False
+
+    def _restore(self, key: SessionKey, session: Session) -> None:
+        """Put an evicted session back in memory."""
+        self.sessions.setdefault(key[0], {}).setdefault(key[1], {})[key[2]] = session
+        self._track(key)
+
+    async def _unspill(self, key: SessionKey, session: Session) -> bool:
+        """Move a spilled session back into memory before it is written to; False if it was never evicted."""
+        spilling = self._spilling.pop(key, None)
+        if spilling is not None:
+            self._restore(key, spilling)
+            return True
+        if self.spill is None:
+            return False
+        # The caller's copy came from the spill store and is at least as current
+        self._restore(key, copy.deepcopy(session))
+        await self.spill.delete_session(app_name=key[0], user_id=key[1], session_id=key[2])
+        return True
+
+    # ===== BaseSessionService =====
+
+    async def create_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: Optional[Dict[str, Any]] = None,
+        session_id: Optional[str] = None
+    ) -> Session:
+        session = await super().create_session(app_name=app_name, user_id=user_id, state=state, session_id=session_id)
+        self._track((app_name, user_id, session.id))
+        await self._evict()
+        return session
+
+    async def get_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        config: Optional[GetSessionConfig] = None
+    ) -> Optional[Session]:
+        session = await super().get_session(app_name=app_name, user_id=user_id, session_id=session_id, config=config)
+        if session is not None or self.spill is None:
+            return session
+        key = (app_name, user_id, session_id)
+        if key in self._spilling:
+            self._restore(key, self._spilling.pop(key))
+            return await super().get_session(app_name=app_name, user_id=user_id, session_id=session_id, config=config)
+        # Read from the spill store; it moves back into memory when next written to
+        session = await self.spill.get_session(app_name=app_name, user_id=user_id, session_id=session_id, config=config)
+        return self._merge_state(app_name, user_id, session) if session is not None else None
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        key = (app_name, user_id, session_id)
+        self._untrack(key)
+        self._spilling.pop(key, None)
+        await super().delete_session(app_name=app_name, user_id=user_id, session_id=session_id)
+        if self.spill is not None:
+            await self.spill.delete_session(app_name=app_name, user_id=user_id, session_id=session_id)
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        if event.partial:
+            return event
+        key = (session.app_name, session.user_id, session.id)
+        if key not in self._sizes:
+            await self._unspill(key, session)
+        await super().append_event(session=session, event=event)
+        self._measure_event(key, event)
+        await self._evict()
+        return event
+
+
+def create_memory_session_service() -> MemoryBoundedSessionService:
+    """In-memory session service bounded by SESSION_MEMORY_BUDGET_MB, spilling to SESSION_SPILL_DB_PATH if set."""
+    budget_mb = number_from_env("SESSION_MEMORY_BUDGET_MB", DEFAULT_BUDGET_MB, 0, float)
+    min_idle_seconds = number_from_env("SESSION_MEMORY_MIN_IDLE_SECONDS", DEFAULT_MIN_IDLE_SECONDS, 0, float)
+    spill_path = os.getenv("SESSION_SPILL_DB_PATH")
+    spill = SqliteSessionService(spill_path, **sqlite_options_from_env()) if spill_path else None
+    logger.info(f"[create_memory_session_service] Sessions kept in memory up to {budget_mb:g} MB (0 = unbounded); "
+                f"evicted sessions {'spill to ' + spill_path if spill_path else 'are dropped'}")
+    return MemoryBoundedSessionService(int(budget_mb * 1024 * 1024), min_idle_seconds, spill)
@@ -0,0 +1,216 @@
+"""Retention for the SQLite session store: compact old invocations, drop idle sessions, vacuum.
+
+Every agent run leaves its model turns, tool calls and tool responses in the
+events table, and ADK loads (and sends to the model) a session's whole
+history. This job keeps that history from growing without bound:
+
+  - Compaction: for each invocation whose last event is older than
+    --compact-after-hours, the user's messages are kept and every other event
+    is replaced by one summary event. The summary carries the invocation's
+    model text (so the conversation still reads the same to the model) and a
+    `compacted` record in custom_metadata: how many events it replaced, tool
+    call counts, the agents involved and the start/end times. State is not
+    touched; it already holds the result of every delta.
+  - Deletion: sessions not updated for --delete-after-days are removed with
+    their events.
+  - --vacuum rebuilds the file afterwards so the freed pages are returned.
+
+Work is done a few invocations per transaction, so API workers writing to the
+same file wait at most one short transaction.
+
+Usage:
+    python -m agent.session_retention sessions.db --compact-after-hours 24
+    python -m agent.session_retention sessions.db --delete-after-days 30 --vacuum
+    python -m agent.session_retention sessions.db --compact-after-hours 1 --dry-run
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import uuid
+from collections import Counter
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from google.adk.events.event import Event
+from google.adk.events.event_actions import EventActions
+from google.adk.sessions.database_session_service import StorageEvent, StorageSession
+from google.adk.sessions.session import Session
+from google.genai import types
+from sqlalchemy import delete, func, select
+
+from agent.session_store import SqliteSessionService, utcnow
+
+logger = logging.getLogger(__name__)
+
+# custom_metadata key marking a summary event
+COMPACTED_KEY = "compacted"
+
+# Invocations compacted, or sessions deleted, per transaction
+DEFAULT_CHUNK_SIZE = 20
+
+InvocationKey = Tuple[str, str, str, str]
+
+
+def summarize_invocation(invocation_id: str, events: List[Event]) -> Event:
+    """One event standing in for an invocation's non-user events."""
+    text_parts: List[types.Part] = []
+    tool_calls: Counter = Counter()
+    agents: List[str] = []
+    author = events[-1].author
+    for event in events:
+        if event.author not in agents:
+            agents.append(event.author)
+        for call in event.get_function_calls():
+            tool_calls[call.name] += 1
+        if event.content and event.content.parts:
+            texts = [part for part in event.content.parts if part.text and not part.thought]
+            if texts:
+                text_parts.extend(types.Part(text=part.text) for part in texts)
+                author = event.author
+    return Event(
+        id=str(uuid.uuid4()),
+        invocation_id=invocation_id,
+        author=author,
+        branch=events[-1].branch,
+        timestamp=events[-1].timestamp,
+        content=types.Content(role="model", parts=text_parts) if text_parts else None,
+        actions=EventActions(),
+        custom_metadata={COMPACTED_KEY: {
+            "events": len(events),
+            "tool_calls": dict(tool_calls),
+            "agents": agents,
+            "started": events[0].timestamp,
+            "ended": events[-1].timestamp,
+        }},
+    )
+
+
+def find_compactable(service: SqliteSessionService, older_than_hours: float) -> List[InvocationKey]:
+    """Invocations that ended before the cutoff and still have more than one non-user event."""
+    cutoff = utcnow() - timedelta(hours=older_than_hours)
+    key = (StorageEvent.app_name, StorageEvent.user_id, StorageEvent.session_id, StorageEvent.invocation_id)
+    with service.read_session() as db:
+        rows = db.execute(
+            select(*key)
+            .group_by(*key)
+            .having(func.max(StorageEvent.timestamp) < cutoff)
+            .having(func.sum(StorageEvent.author != "user") > 1)
+        ).all()
+    return [tuple(row) for row in rows]
+
+
+def compact_invocations(service: SqliteSessionService, invocations: List[InvocationKey]) -> Dict[str, int]:
+    """Replace each invocation's non-user events with a summary event, in one transaction."""
+    removed = 0
+    with service.write_session() as db:
+        for app_name, user_id, session_id, invocation_id in invocations:
+            rows = db.scalars(
+                select(StorageEvent).where(
+                    StorageEvent.app_name == app_name,
+                    StorageEvent.user_id == user_id,
+                    StorageEvent.session_id == session_id,
+                    StorageEvent.invocation_id == invocation_id,
+                    StorageEvent.author != "user",
+                ).order_by(StorageEvent.timestamp)
+            ).all()
+            if len(rows) < 2:
+                continue
+            session = Session(app_name=app_name, user_id=user_id, id=session_id)
+            summary = summarize_invocation(invocation_id, [row.to_event() for row in rows])
+            for row in rows:
+                db.delete(row)
+            db.add(StorageEvent.from_event(session, summary))
+            removed += len(rows) - 1
+        db.commit()
+    return {"invocations": len(invocations), "events_removed": removed}
+
+
+def delete_idle_sessions(service: SqliteSessionService, older_than_days: float, chunk_size: int,
+                         dry_run: bool = False) -> int:
+    """Delete sessions not updated since the cutoff (their events cascade); returns how many."""
+    cutoff = utcnow() - timedelta(days=older_than_days)
+    if dry_run:
+        with service.read_session() as db:
+            return db.scalar(select(func.count()).where(StorageSession.update_time < cutoff))
+    deleted = 0
+    while True:
+        with service.write_session() as db:
+            keys = db.execute(
+                select(StorageSession.app_name, StorageSession.user_id, StorageSession.id)
+                .where(StorageSession.update_time < cutoff)
+                .limit(chunk_size)
+            ).all()
+            if not keys:
+                return deleted
+            for app_name, user_id, session_id in keys:
+                db.execute(delete(StorageSession).where(
+                    StorageSession.app_name == app_name,
+                    StorageSession.user_id == user_id,
+                    StorageSession.id == session_id,
+                ))
+            db.commit()
+        deleted += len(keys)
+
+
+def run_retention(
+    service: SqliteSessionService,
+    compact_after_hours: Optional[float] = None,
+    delete_after_days: Optional[float] = None,
+    vacuum: bool = False,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    dry_run: bool = False
+) -> Dict[str, Any]:
+    """Run the selected retention steps and report what they did."""
+    report: Dict[str, Any] = {"status": "success", "dry_run": dry_run}
+    if delete_after_days is not None:
+        report["sessions_deleted"] = delete_idle_sessions(service, delete_after_days, chunk_size, dry_run)
+    if compact_after_hours is not None:
+        invocations = find_compactable(service, compact_after_hours)
+        report["invocations_compacted"] = len(invocations)
+        report["events_removed"] = 0
+        if not dry_run:
+            for start in range(0, len(invocations), chunk_size):
+                result = compact_invocations(service, invocations[start:start + chunk_size])
+                report["events_removed"] += result["events_removed"]
+    if vacuum and not dry_run:
+        size_before = os.path.getsize(service.path)
+        service.vacuum()
+        report["bytes_before_vacuum"] = size_before
+        report["bytes_after_vacuum"] = os.path.getsize(service.path)
+    logger.info(f"[run_retention] {report}")
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compact old invocations and drop idle sessions in the session store")
+    parser.add_argument("path", help="Session database (e.g. sessions.db)")
+    parser.add_argument("--compact-after-hours", type=float,
+                        help="Compact invocations whose last event is older than this")
+    parser.add_argument("--delete-after-days", type=float, help="Delete sessions not updated for this long")
+    parser.add_argument("--vacuum", action="store_true", help="Rebuild the file afterwards to return freed space")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"Invocations or sessions per transaction (default: {DEFAULT_CHUNK_SIZE})")
+    parser.add_argument("--dry-run", action="store_true", help="Only count what would change")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.path):
+        print(f"No session database at {args.path}", file=sys.stderr)
+        return 1
+    if args.compact_after_hours is None and args.delete_after_days is None and not args.vacuum:
+        parser.error("choose at least one of --compact-after-hours, --delete-after-days, --vacuum")
+
+    service = SqliteSessionService(args.path, pool_size=1)
+    try:
+        report = run_retention(service, args.compact_after_hours, args.delete_after_days, args.vacuum,
+                               args.chunk_size, args.dry_run)
+    finally:
+        service.close()
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,754 @@
+"""Persistent SQLite session service that several API workers can share.
+
+ADK's DatabaseSessionService keeps sessions in the sessions/events/app_states/
+user_states schema (the one in sqlite.db). It runs every query on the event
+loop, opens SQLite with a rollback journal (one writer blocks every reader),
+and has no index for loading a session's events. This service uses the same
+tables and ADK's own row models, so the database stays readable by `adk web`,
+perf.event_latency and perf.replay. It adds:
+
+  - WAL journaling with synchronous=NORMAL and a busy timeout, so readers never
+    wait for a writer and several uvicorn workers (or replicas sharing a
+    volume on one host) can use the same file
+  - A pool of reader connections and one writer connection per process.
+    Writes take the database lock up front (BEGIN IMMEDIATE), so writers from
+    other processes queue on the busy timeout instead of failing on a lock
+    upgrade
+  - Secondary indexes for session loads, invocation lookups and retention
+    scans (INDEXES)
+  - Queries on a small thread pool instead of the event loop
+  - Batched, asynchronous event appends: append_event queues the event and
+    returns; a writer thread waits SESSION_DB_BATCH_MS for more and writes
+    each session's events plus one merged state update in a single
+    transaction. So a run's many events cost a few commits and state
+    rewrites, not one each. Reads of a session wait for its queued events
+    (read-your-writes within a process). Another worker can see a session up
+    to one batch interval behind; SESSION_DB_BATCH_MS=0 writes every event
+    before append_event returns. Queued events are never dropped: a batch
+    that finds the database locked stays queued with backoff, and a session
+    whose events cannot be stored fails alone, its next read raising the
+    error
+  - State deltas applied to the stored state inside the write transaction. A
+    session written by another worker since it was loaded has its other keys
+    kept, instead of the append being rejected as stale
+  - Incremental state persistence (SESSION_STATE_PERSISTENCE=delta, the
+    default): instead of rewriting the whole session state (map markers,
+    activity history) on every write, each write appends the JSON Patch
+    operations that changed it (agent.state_sync.diff_value: changed keys,
+    appended and replaced items) to the state_log table. The log is folded
+    into sessions.state (a checkpoint) every SESSION_STATE_CHECKPOINT_EVERY
+    entries, or once it is larger than the checkpoint, so loads replay a
+    bounded log. Stored events carry their own patches (custom_metadata
+    "state_patch") in place of the full values in their state_delta.
+    sessions.state alone is the last checkpoint; tools that read the table
+    directly see state as of then. "full" rewrites the state on every write
+    and keeps whole values in the events
+
+SESSION_STORE selects the service: "memory" (default, in-process sessions
+under a byte budget, see agent/session_memory.py) or "sqlite". SESSION_DB_PATH,
+SESSION_DB_POOL_SIZE and SESSION_DB_BUSY_TIMEOUT_MS tune it.
+agent/session_retention.py compacts old invocations and vacuums the file.
+"""
+
+import asyncio
+import atexit
+import copy
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from google.adk.events import Event
+from google.adk.sessions import BaseSessionService, Session
+from google.adk.sessions.base_session_service import GetSessionConfig, ListSessionsResponse
+from google.adk.sessions.database_session_service import (
+    Base, StorageAppState, StorageEvent, StorageSession, StorageUserState
+)
+from google.adk.sessions.state import State
+from sqlalchemy import create_engine, delete, event as sqlalchemy_event, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session as DatabaseSession, sessionmaker
+from sqlalchemy.pool import QueuePool
+
+from agent.state_sync import apply_patch, diff_value, json_pointer
+
+logger = logging.getLogger(__name__)
+
+# Session stores (SESSION_STORE)
+STORE_MEMORY = "memory"
+STORE_SQLITE = "sqlite"
+
+# Session database next to the agent/ package; not the tracked sqlite.db, which WAL mode and state_log would change
+DEFAULT_DB_PATH = str(Path(__file__).resolve().parent.parent / "sessions.db")
+DEFAULT_POOL_SIZE = 8
+DEFAULT_BUSY_TIMEOUT_MS = 5000
+DEFAULT_BATCH_MS = 20
+
+# Session state persistence (SESSION_STATE_PERSISTENCE)
+STATE_DELTA = "delta"
+STATE_FULL = "full"
+DEFAULT_CHECKPOINT_EVERY = 50
+
+# custom_metadata key of a stored event's session-scope state change (delta persistence)
+STATE_PATCH_KEY = "state_patch"
+
+# Sessions whose persisted state the writer keeps to diff new writes against
+MAX_LOGGED_STATES = 256
+
+# Session state changes since the session's checkpoint in sessions.state, oldest first
+STATE_LOG_SCHEMA = """
+CREATE TABLE IF NOT EXISTS state_log (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    app_name VARCHAR(128) NOT NULL,
+    user_id VARCHAR(128) NOT NULL,
+    session_id VARCHAR(128) NOT NULL,
+    patches TEXT NOT NULL,
+    FOREIGN KEY (app_name, user_id, session_id) REFERENCES sessions (app_name, user_id, id) ON DELETE CASCADE
+)
+"""
+
+# Most events written in one transaction
+MAX_BATCH_EVENTS = 500
+# Busy-timeout waits a read allows for its session's queued events, and the failed rounds allowed at shutdown
+WRITE_ATTEMPTS = 3
+# Backoff between rounds of a batch that found the database locked, doubling up to the cap
+RETRY_BACKOFF_SECONDS = 0.1
+MAX_RETRY_BACKOFF_SECONDS = 5.0
+
+# Secondary indexes created on startup (name -> indexed columns)
+INDEXES = {
+    # Session loads: a session's events in time order
+    "ix_events_session_timestamp": "events (app_name, user_id, session_id, timestamp)",
+    # Replay and compaction: one invocation's events
+    "ix_events_invocation": "events (app_name, user_id, session_id, invocation_id)",
+    # Retention: sessions idle since a cutoff
+    "ix_sessions_update_time": "sessions (update_time)",
+    # State loads: a session's state log in order
+    "ix_state_log_session": "state_log (app_name, user_id, session_id, id)",
+}
+
+
+def get_session_store() -> str:
+    """Session store from SESSION_STORE ("memory" by default, or "sqlite")."""
+    store = os.getenv("SESSION_STORE", STORE_MEMORY).lower()
+    if store not in (STORE_MEMORY, STORE_SQLITE):
+        logger.warning(f"[get_session_store] Unknown SESSION_STORE={store}, using {STORE_MEMORY}")
+        return STORE_MEMORY
+    return store
+
+
+def get_state_persistence() -> str:
+    """State persistence from SESSION_STATE_PERSISTENCE ("delta" by default, or "full")."""
+    mode = os.getenv("SESSION_STATE_PERSISTENCE", STATE_DELTA).lower()
+    if mode not in (STATE_DELTA, STATE_FULL):
+        logger.warning(f"[get_state_persistence] Unknown SESSION_STATE_PERSISTENCE={mode}, using {STATE_DELTA}")
+        return STATE_DELTA
+    return mode
+
+
+def number_from_env(name: str, default: Any, minimum: Any, cast: Callable[[str], Any] = int) -> Any:
+    """A numeric setting from the environment, at least minimum; malformed values fall back to default."""
+    value = os.getenv(name)
+    if not value:
+        return default
+    try:
+        return max(cast(value), minimum)
+    except ValueError:
+        logger.warning(f"[number_from_env] Invalid {name}={value}, using {default}")
+        return default
+
+
+def utcnow() -> datetime:
+    """Naive UTC timestamp, the way ADK's row models expect it on SQLite."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def split_state_delta(delta: Optional[Dict[str, Any]]) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]:
+    """Split a state delta into app ("app:"), user ("user:") and session keys; "temp:" keys are dropped."""
+    app_delta: Dict[str, Any] = {}
+    user_delta: Dict[str, Any] = {}
+    session_delta: Dict[str, Any] = {}
+    for key, value in (delta or {}).items():
+        if key.startswith(State.APP_PREFIX):
+            app_delta[key[len(State.APP_PREFIX):]] = value
+        elif key.startswith(State.USER_PREFIX):
+            user_delta[key[len(State.USER_PREFIX):]] = value
+        elif not key.startswith(State.TEMP_PREFIX):
+            session_delta[key] = value
+    return app_delta, user_delta, session_delta
+
+
+def merge_state(app_state: Dict[str, Any], user_state: Dict[str, Any], session_state: Dict[str, Any]) -> Dict[str, Any]:
+    """Session state as ADK sees it: session keys plus prefixed app and user keys."""
+    merged = copy.deepcopy(dict(session_state))
+    merged.update({State.APP_PREFIX + key: value for key, value in app_state.items()})
+    merged.update({State.USER_PREFIX + key: value for key, value in user_state.items()})
+    return merged
+
+
+class PendingEvent(NamedTuple):
+    """An event waiting to be written, with its session key and state delta."""
+    key: Tuple[str, str, str]
+    record: StorageEvent
+    state_delta: Dict[str, Any]
+
+
+class LoggedState:
+    """A session's state as this process last persisted it (checkpoint plus state log)."""
+
+    def __init__(self, state: Dict[str, Any], update_time: datetime, entries: int, log_bytes: int):
+        self.state = state
+        # sessions.update_time after that write; any other value means another worker wrote since
+        self.update_time = update_time
+        self.entries = entries
+        self.log_bytes = log_bytes
+        self.checkpoint_bytes = 0
+
+
+class SqliteSessionService(BaseSessionService):
+    """ADK session service on a SQLite file in WAL mode, safe to share across processes."""
+
+    def __init__(
+        self,
+        path: str = DEFAULT_DB_PATH,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        busy_timeout_ms: int = DEFAULT_BUSY_TIMEOUT_MS,
+        batch_ms: int = DEFAULT_BATCH_MS,
+        state_persistence: str = STATE_DELTA,
+        checkpoint_every: int = DEFAULT_CHECKPOINT_EVERY
+    ):
+        """Open (and if needed create) the database.
+
+        Args:
+            path: SQLite database file
+            pool_size: Reader connections per process (there is one writer)
+            busy_timeout_ms: How long a write waits for another process's write lock
+            batch_ms: How long queued events wait for more before they are written (0 writes each event inline)
+            state_persistence: "delta" (state log plus checkpoints) or "full" (rewrite the state on every write)
+            checkpoint_every: State log entries per session before they are folded into a checkpoint
+        """
+        self.path = path
+        self.busy_timeout_ms = busy_timeout_ms
+        self.batch_ms = batch_ms
+        self.state_persistence = state_persistence
+        self.checkpoint_every = checkpoint_every
+        url = f"sqlite:///{path}"
+        # The pools hand connections to executor threads; SQLite's own lock handles concurrency
+        connect_args = {"check_same_thread": False, "timeout": busy_timeout_ms / 1000}
+        self._reader = create_engine(url, poolclass=QueuePool, pool_size=pool_size, max_overflow=0,
+                                     connect_args=connect_args)
+        self._writer = create_engine(url, poolclass=QueuePool, pool_size=1, max_overflow=0,
+                                     connect_args=connect_args)
+        for engine, begin in ((self._reader, "BEGIN"), (self._writer, "BEGIN IMMEDIATE")):
+            sqlalchemy_event.listen(engine, "connect", self._configure_connection)
+            sqlalchemy_event.listen(engine, "begin", self._begin_with(begin))
+        self.read_session: Callable[[], DatabaseSession] = sessionmaker(bind=self._reader, expire_on_commit=False)
+        self.write_session: Callable[[], DatabaseSession] = sessionmaker(bind=self._writer, expire_on_commit=False)
+        self._executor = ThreadPoolExecutor(max_workers=pool_size + 1, thread_name_prefix="a4i-session-db")
+        # Write-behind queue, drained by the writer thread
+        self._pending: List[PendingEvent] = []
+        self._pending_counts: Counter = Counter()
+        self._pending_changed = threading.Condition()
+        # Why a session's queued events could not be stored, raised by its next read
+        self._write_errors: Dict[Tuple[str, str, str], Exception] = {}
+        self._writer_thread: Optional[threading.Thread] = None
+        self._closing = False
+        self._closed = False
+        # Only touched inside write transactions, which the single writer connection serializes
+        self._logged_states: "OrderedDict[Tuple[str, str, str], LoggedState]" = OrderedDict()
+        self._create_schema()
+        # Queued events are written before the interpreter exits
+        atexit.register(self.close)
+
+    @staticmethod
+    def _configure_connection(dbapi_connection: Any, connection_record: Any) -> None:
+        # Transactions are begun explicitly (see _begin_with), not by the sqlite3 module
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+
+    @staticmethod
+    def _begin_with(statement: str) -> Callable[[Any], None]:
+        def begin(connection: Any) -> None:
+            connection.exec_driver_sql(statement)
+        return begin
+
+    def _create_schema(self) -> None:
+        """Switch the file to WAL and create the tables and indexes that are missing."""
+        # journal_mode cannot change inside a transaction, so use a raw connection
+        connection = self._writer.raw_connection()
+        try:
+            cursor = connection.cursor()
+            mode = cursor.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+            cursor.close()
+        finally:
+            connection.close()
+        if mode.lower() != "wal":
+            logger.warning(f"[SqliteSessionService] {self.path} is in {mode} mode, not WAL; workers will block each other")
+        Base.metadata.create_all(self._writer)
+        with self._writer.begin() as connection:
+            connection.exec_driver_sql(STATE_LOG_SCHEMA)
+            for name, columns in INDEXES.items():
+                connection.exec_driver_sql(f"CREATE INDEX IF NOT EXISTS {name} ON {columns}")
+
+    async def _run(self, function: Callable[..., Any], *args: Any) -> Any:
+        """Run a blocking database call on the service's thread pool."""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, function, *args)
+
+    def close(self) -> None:
+        """Write queued events, then close the connection pools and thread pools."""
+        if self._closed:
+            return
+        with self._pending_changed:
+            self._closing = True
+            self._pending_changed.notify_all()
+        if self._writer_thread is not None:
+            self._writer_thread.join()
+        self._closed = True
+        self._executor.shutdown(wait=True)
+        self._reader.dispose()
+        self._writer.dispose()
+
+    def vacuum(self) -> None:
+        """Rebuild the file to return space freed by deletes, then truncate the WAL."""
+        # VACUUM cannot run inside a transaction; the writer connection keeps this process's writes out meanwhile
+        connection = self._writer.raw_connection()
+        try:
+            cursor = connection.cursor()
+            cursor.execute("VACUUM")
+            cursor.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            cursor.close()
+        finally:
+            connection.close()
+
+    # ===== Write-behind queue =====
+
+    def _enqueue(self, item: PendingEvent) -> None:
+        with self._pending_changed:
+            if self._writer_thread is None:
+                self._writer_thread = threading.Thread(target=self._write_behind, name="a4i-session-writer", daemon=True)
+                self._writer_thread.start()
+            self._pending.append(item)
+            self._pending_counts[item.key] += 1
+            self._pending_changed.notify_all()
+
+    def _write_behind(self) -> None:
+        """Writer thread: wait for queued events, linger batch_ms for more, write them together."""
+        failed_rounds = 0
+        while True:
+            with self._pending_changed:
+                self._pending_changed.wait_for(lambda: self._pending or self._closing)
+                if not self._pending:
+                    return
+            if not self._closing:
+                time.sleep(self.batch_ms / 1000)
+            with self._pending_changed:
+                batch = self._pending[:MAX_BATCH_EVENTS]
+                del self._pending[:len(batch)]
+            retry = self._write_batch(batch)
+            if retry and self._closing and failed_rounds + 1 >= WRITE_ATTEMPTS:
+                logger.error(f"[SqliteSessionService] Database still locked at shutdown; "
+                             f"{len(retry)} queued events were not written")
+                retry = []
+            kept = {id(item) for item in retry}
+            with self._pending_changed:
+                # Back at the front, ahead of the sessions' newer events
+                self._pending[:0] = retry
+                self._pending_counts.subtract(item.key for item in batch if id(item) not in kept)
+                self._pending_counts += Counter()  # drop keys that reached zero
+                self._pending_changed.notify_all()
+            if retry:
+                failed_rounds += 1
+                time.sleep(min(RETRY_BACKOFF_SECONDS * 2 ** (failed_rounds - 1), MAX_RETRY_BACKOFF_SECONDS))
+            else:
+                failed_rounds = 0
+
+    def _write_batch(self, batch: List[PendingEvent]) -> List[PendingEvent]:
+        """Write a batch of queued events; returns the ones to keep queued because the database was locked.
+
+        A batch that fails for any other reason is written again one session at
+        a time, so a session whose events cannot be stored (e.g. a state value
+        that is not JSON) fails alone. Its error is kept for the session's next
+        read to raise, instead of the session loading without those events.
+        """
+        try:
+            self._write_events(batch)
+            return []
+        except OperationalError as e:
+            # Locked or busy: another worker held the write lock past the busy timeout
+            logger.warning(f"[SqliteSessionService] Writing {len(batch)} events failed ({e}), keeping them queued")
+            return batch
+        except Exception as e:
+            logger.warning(f"[SqliteSessionService] Writing {len(batch)} events failed ({e}), retrying per session")
+        by_session: Dict[Tuple[str, str, str], List[PendingEvent]] = {}
+        for item in batch:
+            by_session.setdefault(item.key, []).append(item)
+        retry: List[PendingEvent] = []
+        for key, items in by_session.items():
+            try:
+                self._write_events(items)
+            except OperationalError as e:
+                logger.warning(f"[SqliteSessionService] Writing {len(items)} events of session {key[0]}:{key[2]} "
+                               f"failed ({e}), keeping them queued")
+                retry.extend(items)
+            except Exception as e:
+                logger.error(f"[SqliteSessionService] Cannot store {len(items)} events of session {key[0]}:{key[2]}: {e}",
+                             exc_info=True)
+                with self._pending_changed:
+                    self._write_errors[key] = e
+        return retry
+
+    def _wait_flushed(self, key: Tuple[str, str, str], check: bool = True) -> None:
+        """Block until the session's queued events are written.
+
+        Raises RuntimeError if they could not be stored, or are still queued
+        behind a locked database after WRITE_ATTEMPTS busy timeouts; check=False
+        only waits.
+        """
+        timeout = WRITE_ATTEMPTS * (self.busy_timeout_ms / 1000 + 1)
+        with self._pending_changed:
+            flushed = self._pending_changed.wait_for(lambda: not self._pending_counts.get(key), timeout=timeout)
+            error = self._write_errors.pop(key, None)
+        if not check:
+            return
+        if error is not None:
+            raise RuntimeError(f"Events of session {key[0]}:{key[2]} could not be stored: {error}") from error
+        if not flushed:
+            raise RuntimeError(f"Session {key[0]}:{key[2]} still has queued events after {timeout:.0f}s; "
+                               f"the database is locked")
+
+    # ===== Blocking implementations (run on the thread pool) =====
+
+    @staticmethod
+    def _scoped_states(
+        db: DatabaseSession,
+        app_name: str,
+        user_id: str,
+        app_delta: Optional[Dict[str, Any]] = None,
+        user_delta: Optional[Dict[str, Any]] = None,
+        now: Optional[datetime] = None
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """App and user state, with any deltas applied and written back."""
+        app_row = db.get(StorageAppState, app_name)
+        user_row = db.get(StorageUserState, (app_name, user_id))
+        if app_delta:
+            if app_row is None:
+                app_row = StorageAppState(app_name=app_name, state={})
+                db.add(app_row)
+            app_row.state = {**app_row.state, **app_delta}
+            app_row.update_time = now or utcnow()
+        if user_delta:
+            if user_row is None:
+                user_row = StorageUserState(app_name=app_name, user_id=user_id, state={})
+                db.add(user_row)
+            user_row.state = {**user_row.state, **user_delta}
+            user_row.update_time = now or utcnow()
+        return (dict(app_row.state) if app_row else {}), (dict(user_row.state) if user_row else {})
+
+    # ===== Session state =====
+
+    @staticmethod
+    def _state_log(db: DatabaseSession, key: Tuple[str, str, str]) -> List[str]:
+        """The session's state log entries (encoded patch lists), oldest first."""
+        return list(db.execute(
+            text("SELECT patches FROM state_log WHERE app_name = :app_name AND user_id = :user_id "
+                 "AND session_id = :session_id ORDER BY id"),
+            {"app_name": key[0], "user_id": key[1], "session_id": key[2]},
+        ).scalars())
+
+    @staticmethod
+    def _clear_state_log(db: DatabaseSession, key: Tuple[str, str, str]) -> None:
+        db.execute(
+            text("DELETE FROM state_log WHERE app_name = :app_name AND user_id = :user_id AND session_id = :session_id"),
+            {"app_name": key[0], "user_id": key[1], "session_id": key[2]},
+        )
+
+    def _session_state(self, db: DatabaseSession, row: StorageSession) -> Tuple[Dict[str, Any], List[str]]:
+        """Session-scope state: the checkpoint with the state log applied, and the log entries.
+
+        Without log entries this is the row's own state dict, not a copy.
+        """
+        entries = self._state_log(db, (row.app_name, row.user_id, row.id))
+        if not entries:
+            return row.state, entries
+        state = copy.deepcopy(dict(row.state))
+        for encoded in entries:
+            apply_patch(state, json.loads(encoded))
+        return state, entries
+
+    def _logged_state(self, db: DatabaseSession, key: Tuple[str, str, str], row: StorageSession) -> LoggedState:
+        """The session's persisted state as last written, reloaded if another worker wrote since."""
+        logged = self._logged_states.get(key)
+        if logged is None or logged.update_time != row.update_time:
+            state, entries = self._session_state(db, row)
+            logged = LoggedState(copy.deepcopy(dict(state)) if not entries else state, row.update_time,
+                                 len(entries), sum(len(encoded) for encoded in entries))
+            logged.checkpoint_bytes = len(json.dumps(row.state))
+            self._logged_states[key] = logged
+            while len(self._logged_states) > MAX_LOGGED_STATES:
+                self._logged_states.popitem(last=False)
+        self._logged_states.move_to_end(key)
+        return logged
+
+    @staticmethod
+    def _record_patches(record: StorageEvent, patches: List[Dict[str, Any]]) -> None:
+        """Store an event with its session-scope state change as patches instead of whole values."""
+        scoped = {name: value for name, value in record.actions.state_delta.items()
+                  if name.startswith((State.APP_PREFIX, State.USER_PREFIX))}
+        # A copy: the live event keeps its full delta
+        record.actions = record.actions.model_copy(update={"state_delta": scoped})
+        record.custom_metadata = {**(record.custom_metadata or {}), STATE_PATCH_KEY: patches}
+
+    def _persist_state(self, db: DatabaseSession, key: Tuple[str, str, str], row: StorageSession,
+                       items: List[PendingEvent], session_deltas: List[Dict[str, Any]], now: datetime) -> None:
+        """Write the events' session-scope state deltas and the new update time."""
+        if self.state_persistence != STATE_DELTA:
+            merged = {name: value for delta in session_deltas for name, value in delta.items()}
+            if merged:
+                state, entries = self._session_state(db, row)
+                if entries:
+                    self._clear_state_log(db, key)
+                row.state = {**state, **merged}
+            row.update_time = now
+            return
+
+        logged = self._logged_state(db, key, row)
+        # Invalid until this write is done, so a failed transaction reloads it
+        logged.update_time = None
+        batch_patches: List[Dict[str, Any]] = []
+        for item, delta in zip(items, session_deltas):
+            patches: List[Dict[str, Any]] = []
+            for name, value in delta.items():
+                # Tools may keep editing the live value; the log must describe what was written
+                value = copy.deepcopy(value)
+                if name in logged.state:
+                    patches.extend(diff_value(json_pointer(name), logged.state[name], value))
+                else:
+                    patches.append({"op": "add", "path": json_pointer(name), "value": value})
+                logged.state[name] = value
+            if delta:
+                self._record_patches(item.record, patches)
+            batch_patches.extend(patches)
+        if batch_patches:
+            encoded = json.dumps(batch_patches)
+            if logged.entries >= self.checkpoint_every or logged.log_bytes + len(encoded) > logged.checkpoint_bytes:
+                # Fold the log into a new checkpoint so loads replay a bounded log
+                row.state = dict(logged.state)
+                self._clear_state_log(db, key)
+                logged.entries = logged.log_bytes = 0
+                logged.checkpoint_bytes = len(json.dumps(logged.state))
+            else:
+                db.execute(
+                    text("INSERT INTO state_log (app_name, user_id, session_id, patches) "
+                         "VALUES (:app_name, :user_id, :session_id, :patches)"),
+                    {"app_name": key[0], "user_id": key[1], "session_id": key[2], "patches": encoded},
+                )
+                logged.entries += 1
+                logged.log_bytes += len(encoded)
+        row.update_time = logged.update_time = now
+
+    # ===== Sessions =====
+
+    def _create_session(self, app_name: str, user_id: str, state: Optional[Dict[str, Any]],
+                        session_id: Optional[str]) -> Session:
+        app_delta, user_delta, session_state = split_state_delta(state)
+        now = utcnow()
+        with self.write_session() as db:
+            app_state, user_state = self._scoped_states(db, app_name, user_id, app_delta, user_delta, now)
+            row = StorageSession(
+                app_name=app_name,
+                user_id=user_id,
+                id=session_id or str(uuid.uuid4()),
+                state=session_state,
+                create_time=now,
+                update_time=now,
+            )
+            db.add(row)
+            db.commit()
+            return row.to_session(state=merge_state(app_state, user_state, session_state))
+
+    def _get_session(self, app_name: str, user_id: str, session_id: str,
+                     config: Optional[GetSessionConfig]) -> Optional[Session]:
+        self._wait_flushed((app_name, user_id, session_id))
+        with self.read_session() as db:
+            row = db.get(StorageSession, (app_name, user_id, session_id))
+            if row is None:
+                return None
+            query = db.query(StorageEvent).filter(
+                StorageEvent.app_name == app_name,
+                StorageEvent.user_id == user_id,
+                StorageEvent.session_id == session_id,
+            )
+            if config and config.after_timestamp:
+                query = query.filter(StorageEvent.timestamp >= datetime.fromtimestamp(config.after_timestamp))
+            # Newest first so num_recent_events can limit; rowid breaks timestamp ties in insert order
+            query = query.order_by(StorageEvent.timestamp.desc(), text("events.rowid DESC"))
+            if config and config.num_recent_events:
+                query = query.limit(config.num_recent_events)
+            events = [storage_event.to_event() for storage_event in reversed(query.all())]
+            app_state, user_state = self._scoped_states(db, app_name, user_id)
+            session_state, _ = self._session_state(db, row)
+            return row.to_session(state=merge_state(app_state, user_state, session_state), events=events)
+
+    def _list_sessions(self, app_name: str, user_id: str) -> ListSessionsResponse:
+        with self.read_session() as db:
+            rows = db.query(StorageSession).filter(
+                StorageSession.app_name == app_name,
+                StorageSession.user_id == user_id,
+            ).all()
+            app_state, user_state = self._scoped_states(db, app_name, user_id)
+            return ListSessionsResponse(sessions=[
+                row.to_session(state=merge_state(app_state, user_state, self._session_state(db, row)[0])) for row in rows
+            ])
+
+    def _delete_session(self, app_name: str, user_id: str, session_id: str) -> None:
+        # Events that could not be stored go with the session
+        self._wait_flushed((app_name, user_id, session_id), check=False)
+        with self.write_session() as db:
+            # Events go with the session (ON DELETE CASCADE)
+            db.execute(delete(StorageSession).where(
+                StorageSession.app_name == app_name,
+                StorageSession.user_id == user_id,
+                StorageSession.id == session_id,
+            ))
+            db.commit()
+
+    def _store_session(self, session: Session) -> None:
+        """Write a whole session (state of every scope and events), replacing any stored copy."""
+        key = (session.app_name, session.user_id, session.id)
+        self._wait_flushed(key)
+        app_state, user_state, session_state = split_state_delta(session.state)
+        updated = datetime.fromtimestamp(session.last_update_time, timezone.utc).replace(tzinfo=None)
+        with self.write_session() as db:
+            self._scoped_states(db, session.app_name, session.user_id, app_state, user_state, updated)
+            # Events and state log go with the old row (ON DELETE CASCADE)
+            db.execute(delete(StorageSession).where(
+                StorageSession.app_name == session.app_name,
+                StorageSession.user_id == session.user_id,
+                StorageSession.id == session.id,
+            ))
+            self._logged_states.pop(key, None)
+            db.add(StorageSession(
+                app_name=session.app_name,
+                user_id=session.user_id,
+                id=session.id,
+                state=session_state,
+                create_time=updated,
+                update_time=updated,
+            ))
+            db.flush()
+            db.add_all(StorageEvent.from_event(session, event) for event in session.events if not event.partial)
+            db.commit()
+
+    def _write_events(self, batch: List[PendingEvent]) -> float:
+        """Store events and their merged state deltas in one transaction; returns the update time."""
+        now = utcnow()
+        by_session: Dict[Tuple[str, str, str], List[PendingEvent]] = {}
+        for item in batch:
+            by_session.setdefault(item.key, []).append(item)
+        with self.write_session() as db:
+            try:
+                for key, items in by_session.items():
+                    row = db.get(StorageSession, key)
+                    if row is None:
+                        logger.warning(f"[SqliteSessionService] Session {key[0]}:{key[2]} no longer exists; "
+                                       f"dropping {len(items)} events")
+                        continue
+                    app_delta: Dict[str, Any] = {}
+                    user_delta: Dict[str, Any] = {}
+                    session_deltas: List[Dict[str, Any]] = []
+                    for item in items:
+                        app_part, user_part, session_part = split_state_delta(item.state_delta)
+                        app_delta.update(app_part)
+                        user_delta.update(user_part)
+                        session_deltas.append(session_part)
+                    if app_delta or user_delta:
+                        self._scoped_states(db, key[0], key[1], app_delta, user_delta, now)
+                    self._persist_state(db, key, row, items, session_deltas, now)
+                    db.add_all(item.record for item in items)
+                db.commit()
+            except Exception:
+                # Rolling back (not just closing) makes records already flushed new again, so a retry inserts them
+                db.rollback()
+                raise
+        return now.replace(tzinfo=timezone.utc).timestamp()
+
+    # ===== BaseSessionService =====
+
+    async def create_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: Optional[Dict[str, Any]] = None,
+        session_id: Optional[str] = None
+    ) -> Session:
+        return await self._run(self._create_session, app_name, user_id, state, session_id)
+
+    async def get_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        config: Optional[GetSessionConfig] = None
+    ) -> Optional[Session]:
+        return await self._run(self._get_session, app_name, user_id, session_id, config)
+
+    async def list_sessions(self, *, app_name: str, user_id: str) -> ListSessionsResponse:
+        return await self._run(self._list_sessions, app_name, user_id)
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        await self._run(self._delete_session, app_name, user_id, session_id)
+
+    async def store_session(self, session: Session) -> None:
+        """Write a session held elsewhere (e.g. evicted from memory) as it is, events included."""
+        await self._run(self._store_session, session)
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        if event.partial:
+            return event
+        item = PendingEvent(
+            key=(session.app_name, session.user_id, session.id),
+            record=StorageEvent.from_event(session, event),
+            state_delta=dict(event.actions.state_delta) if event.actions and event.actions.state_delta else {},
+        )
+        if self.batch_ms > 0:
+            self._enqueue(item)
+            session.last_update_time = event.timestamp
+        else:
+            session.last_update_time = await self._run(self._write_events, [item])
+        # Apply the delta to the in-memory session too
+        await super().append_event(session=session, event=event)
+        return event
+
+
+def sqlite_options_from_env() -> Dict[str, Any]:
+    """SqliteSessionService tuning from SESSION_DB_* variables."""
+    return {
+        "pool_size": number_from_env("SESSION_DB_POOL_SIZE", DEFAULT_POOL_SIZE, 1),
+        "busy_timeout_ms": number_from_env("SESSION_DB_BUSY_TIMEOUT_MS", DEFAULT_BUSY_TIMEOUT_MS, 0),
+        "batch_ms": number_from_env("SESSION_DB_BATCH_MS", DEFAULT_BATCH_MS, 0),
+        "state_persistence": get_state_persistence(),
+        "checkpoint_every": number_from_env("SESSION_STATE_CHECKPOINT_EVERY", DEFAULT_CHECKPOINT_EVERY, 1),
+    }
+
+
+def create_session_service() -> BaseSessionService:
+    """Session service for SESSION_STORE: the SQLite store, or in-memory sessions under a byte budget."""
+    if get_session_store() != STORE_SQLITE:
+        from agent.session_memory import create_memory_session_service
+        return create_memory_session_service()
+    path = os.getenv("SESSION_DB_PATH", DEFAULT_DB_PATH)
+    service = SqliteSessionService(path, **sqlite_options_from_env())
+    logger.info(f"[create_session_service] Sessions stored in {path} (SQLite, WAL)")
+    return service
@@ -0,0 +1,194 @@
+"""Delta-based state synchronization for the AG-UI endpoint.
+
+ag_ui_adk turns every ADK state_delta into a STATE_DELTA event that re-sends
+the full value of each changed key, so every activity update re-ships the
+whole activity history and every map update re-ships all markers. In delta
+mode the events are rewritten against a shadow of the client's state (seeded
+from the state the client sends with each run): unchanged keys are dropped,
+list growth is sent as appended items, changed list items and dict fields are
+patched individually (JSON Patch, RFC 6902), and a full STATE_SNAPSHOT is sent
+every few deltas so the client can resync. Lists that drop items from the
+front as they grow (the activity history ring buffer) are patched as removes
+plus appends. agent/session_store.py uses the same patches for its state log.
+"""
+
+import logging
+import os
+from typing import Any, AsyncGenerator, Dict, List
+from ag_ui.core import BaseEvent, EventType, RunAgentInput, StateDeltaEvent, StateSnapshotEvent
+from ag_ui_adk import ADKAgent
+
+logger = logging.getLogger(__name__)
+
+# State sync modes (AGUI_STATE_SYNC)
+SYNC_DELTA = "delta"
+SYNC_FULL = "full"
+
+# Default number of delta events between full resync snapshots
+DEFAULT_SNAPSHOT_INTERVAL = 25
+
+# Most items a list may have lost from its front and still be patched
+MAX_TRIMMED_ITEMS = 16
+
+# Sentinel for keys missing from the shadow state
+_MISSING = object()
+
+
+def get_state_sync_mode() -> str:
+    """State sync mode from AGUI_STATE_SYNC ("delta" by default, or "full")."""
+    mode = os.getenv("AGUI_STATE_SYNC", SYNC_DELTA).lower()
+    if mode not in (SYNC_DELTA, SYNC_FULL):
+        logger.warning(f"[get_state_sync_mode] Unknown AGUI_STATE_SYNC={mode}, using {SYNC_DELTA}")
+        return SYNC_DELTA
+    return mode
+
+
+def get_snapshot_interval() -> int:
+    """Delta events between resync snapshots from AGUI_STATE_SNAPSHOT_INTERVAL (0 or less disables)."""
+    value = os.getenv("AGUI_STATE_SNAPSHOT_INTERVAL")
+    if not value:
+        return DEFAULT_SNAPSHOT_INTERVAL
+    try:
+        return max(int(value), 0)
+    except ValueError:
+        logger.warning(f"[get_snapshot_interval] Invalid AGUI_STATE_SNAPSHOT_INTERVAL={value}, using {DEFAULT_SNAPSHOT_INTERVAL}")
+        return DEFAULT_SNAPSHOT_INTERVAL
+
+
+def json_pointer(*parts: Any) -> str:
+    """JSON Pointer for a path, escaping "~" and "/" in each part."""
+    return "".join("/" + str(part).replace("~", "~0").replace("/", "~1") for part in parts)
+
+
+def _copy(value: Any) -> Any:
+    """Shallow copy of containers so later in-place edits by tools do not leak into the shadow."""
+    if isinstance(value, list):
+        return list(value)
+    if isinstance(value, dict):
+        return dict(value)
+    return value
+
+
+def diff_value(path: str, old: Any, new: Any) -> List[Dict[str, Any]]:
+    """JSON Patch operations that turn old into new at path.
+
+    Lists that keep their existing items (possibly minus a few from the front)
+    are patched as front removes, item replacements and appends, dicts field
+    by field; anything else (or a diff larger than the value) is sent whole.
+    """
+    if old is _MISSING:
+        return [{"op": "add", "path": path, "value": new}]
+    if old == new:
+        return []
+
+    patches = None
+    if isinstance(old, list) and isinstance(new, list):
+        for trimmed in range(min(max(len(old) - 1, 0), MAX_TRIMMED_ITEMS) + 1):
+            kept = len(old) - trimmed
+            if len(new) < kept:
+                continue
+            changed = [index for index in range(kept) if old[trimmed + index] != new[index]]
+            if len(changed) <= kept // 2:
+                patches = [{"op": "remove", "path": f"{path}/0"} for _ in range(trimmed)]
+                patches += [{"op": "replace", "path": f"{path}/{index}", "value": new[index]} for index in changed]
+                patches += [{"op": "add", "path": f"{path}/-", "value": item} for item in new[kept:]]
+                break
+    elif isinstance(old, dict) and isinstance(new, dict):
+        patches = [{"op": "remove", "path": path + json_pointer(key)} for key in old if key not in new]
+        patches += [
+            {"op": "add", "path": path + json_pointer(key), "value": value}
+            for key, value in new.items() if old.get(key, _MISSING) != value
+        ]
+        if len(patches) > len(new) // 2 + 1:
+            patches = None
+
+    if patches is None:
+        return [{"op": "add", "path": path, "value": new}]
+    return patches
+
+
+def apply_patch(state: Dict[str, Any], patches: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Apply add/replace/remove operations (as produced by diff_value) to state in place."""
+    for patch in patches:
+        parts = [part.replace("~1", "/").replace("~0", "~") for part in patch["path"].split("/")[1:]]
+        parent: Any = state
+        for part in parts[:-1]:
+            parent = parent[int(part)] if isinstance(parent, list) else parent[part]
+        last = parts[-1]
+        if isinstance(parent, list):
+            if last == "-":
+                parent.append(patch["value"])
+            elif patch["op"] == "remove":
+                del parent[int(last)]
+            elif patch["op"] == "add":
+                parent.insert(int(last), patch["value"])
+            else:
+                parent[int(last)] = patch["value"]
+        elif patch["op"] == "remove":
+            parent.pop(last, None)
+        else:
+            parent[last] = patch["value"]
+    return state
+
+
+class StateDiffer:
+    """Rewrites full-value state deltas into minimal patches against a shadow of client state."""
+
+    def __init__(self, client_state: Any = None):
+        self.shadow: Dict[str, Any] = {}
+        self.reset(client_state)
+
+    def reset(self, state: Any) -> None:
+        """Replace the shadow (e.g., after a snapshot)."""
+        self.shadow = {key: _copy(value) for key, value in state.items()} if isinstance(state, dict) else {}
+
+    def rewrite(self, delta: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Minimal patches for a list of top-level "add" operations, updating the shadow."""
+        patches = []
+        for operation in delta:
+            path = operation.get("path", "")
+            key = path[1:]
+            if operation.get("op") not in ("add", "replace") or not path.startswith("/") or "/" in key:
+                # Not a whole-key write; pass it through untracked
+                patches.append(operation)
+                continue
+            key = key.replace("~1", "/").replace("~0", "~")
+            value = operation.get("value")
+            patches.extend(diff_value(path, self.shadow.get(key, _MISSING), value))
+            self.shadow[key] = _copy(value)
+        return patches
+
+
+class DeltaSyncADKAgent(ADKAgent):
+    """ADKAgent that sends minimal state patches and periodic resync snapshots."""
+
+    def __init__(self, *args: Any, snapshot_interval: int = DEFAULT_SNAPSHOT_INTERVAL, **kwargs: Any):
+        """Create the agent.
+
+        Args:
+            snapshot_interval: Delta events between full resync snapshots (0 disables)
+            *args, **kwargs: Passed to ADKAgent
+        """
+        super().__init__(*args, **kwargs)
+        self.snapshot_interval = snapshot_interval
+
+    async def run(self, input: RunAgentInput) -> AsyncGenerator[BaseEvent, None]:
+        """Run the agent, rewriting STATE_DELTA events against the client's state."""
+        differ = StateDiffer(input.state)
+        deltas_since_snapshot = 0
+
+        async for event in super().run(input):
+            if event.type == EventType.STATE_SNAPSHOT:
+                differ.reset(event.snapshot)
+                deltas_since_snapshot = 0
+            elif event.type == EventType.STATE_DELTA:
+                patches = differ.rewrite(event.delta)
+                if not patches:
+                    continue
+                deltas_since_snapshot += 1
+                if self.snapshot_interval and deltas_since_snapshot >= self.snapshot_interval:
+                    deltas_since_snapshot = 0
+                    event = StateSnapshotEvent(type=EventType.STATE_SNAPSHOT, snapshot=dict(differ.shadow))
+                else:
+                    event = StateDeltaEvent(type=EventType.STATE_DELTA, delta=patches)
+            yield event
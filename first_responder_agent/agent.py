@@ -1,16 +1,23 @@
 """First Responder Main Agent - Emergency response coordination with disaster discovery, relief finder, and insights tool."""
 
 import logging
-from google.adk.agents import Agent
+import os
+from google.adk.agents import Agent, ParallelAgent, SequentialAgent
 from google.adk.agents.callback_context import CallbackContext
 from .disaster_discovery_agent.agent import create_disaster_discovery_agent
 from .relief_finder_agent.agent import create_relief_finder_agent
-from .insights_agent.agent import create_insights_tool
+from .insights_agent.agent import create_insights_tool, create_insights_workflow_agent
 from .common.geocoding import geocode_location
-from .common.state_tools import update_agent_activity
+from .common.state_tools import update_agent_activity, DISASTER_REPORT_KEY, RELIEF_REPORT_KEY
+from .common.location_store import publish_locations, publish_locations_callback
+from .common.context_compaction import compact_context
 
 logger = logging.getLogger(__name__)
 
+# Workflow modes for the root agent (FIRST_RESPONDER_WORKFLOW)
+WORKFLOW_AGENTIC = "agentic"
+WORKFLOW_PARALLEL = "parallel"
+
 
 def on_before_agent(callback_context: CallbackContext):
     """Initialize state before agent execution."""
@@ -37,16 +44,99 @@ def on_before_agent(callback_context: CallbackContext):
 
 def on_after_agent(callback_context: CallbackContext):
     """Update state after agent execution."""
+    publish_locations(callback_context)
+
     agent_name = callback_context.agent_name
     if agent_name:
         update_agent_activity(callback_context.state, agent_name, "completed")
         logger.info(f"[on_after_agent] Agent completed: {agent_name}")
 
+    # The root agent's run is the whole turn; fold long histories into a summary
+    compact_context(callback_context)
+
     return None
 
 
+def create_briefing_workflow_agent():
+    """Create the briefing workflow used by the parallel workflow mode.
+
+    Disaster discovery and relief finding only depend on the coordinates, so they
+    run side by side in a ParallelAgent. Each writes its report to its own state
+    key, and the insights agent then reads both keys in the next sequential step.
+    """
+    logger.info("[create_briefing_workflow_agent] Creating parallel briefing workflow")
+
+    discovery_and_relief = ParallelAgent(
+        name="discovery_and_relief",
+        description="Runs disaster discovery and relief finding concurrently",
+        sub_agents=[
+            create_disaster_discovery_agent(output_key=DISASTER_REPORT_KEY),
+            create_relief_finder_agent(output_key=RELIEF_REPORT_KEY),
+        ],
+    )
+
+    briefing_workflow = SequentialAgent(
+        name="briefing_workflow",
+        description="Discovers disasters and relief resources in parallel, then synthesizes insights",
+        sub_agents=[
+            discovery_and_relief,
+            create_insights_workflow_agent(DISASTER_REPORT_KEY, RELIEF_REPORT_KEY),
+        ],
+    )
+    logger.info("[create_briefing_workflow_agent] Briefing workflow created successfully")
+    return briefing_workflow
+
+
+def create_parallel_first_responder_agent():
+    """Create the First Responder root agent in parallel workflow mode."""
+    logger.info("[create_parallel_first_responder_agent] Creating First Responder root agent (parallel workflow)")
+
+    briefing_workflow = create_briefing_workflow_agent()
+
+    first_responder = Agent(
+        name="first_responder",
+        model="gemini-2.5-flash",
+        description="Main agent for emergency storm response coordination",
+        instruction="""You are the First Responder Main Agent for emergency management and disaster response.
+
+CRITICAL: Execute the following workflow AUTOMATICALLY WITHOUT STOPPING BETWEEN STEPS.
+
+WORKFLOW EXECUTION SEQUENCE:
+1. IF user location is not provided: Ask user for their location ONCE, then immediately proceed to step 2
+2. Convert the location string to latitude/longitude coordinates using the geocode_location tool
+3. Transfer control to briefing_workflow with the coordinates
+
+briefing_workflow discovers disasters and relief resources in parallel and then
+presents the final insights analysis to the user. You do not need to summarize it.
+
+EXECUTION RULES:
+- Ask for location ONLY if not provided by user
+- After getting location, DO NOT ask for any more user confirmation
+- DO NOT wait for user input between steps 2-3
+- Always state the coordinates before transferring so the workflow can use them""",
+        tools=[geocode_location],
+        sub_agents=[briefing_workflow],
+        before_agent_callback=on_before_agent,
+        after_agent_callback=on_after_agent,
+        before_model_callback=publish_locations_callback,
+    )
+    logger.info("[create_parallel_first_responder_agent] First Responder agent created successfully")
+    return first_responder
+
+
 def create_first_responder_agent():
-    """Create and return the First Responder root agent."""
+    """Create and return the First Responder root agent.
+
+    The FIRST_RESPONDER_WORKFLOW environment variable selects the workflow:
+    "agentic" (default) transfers between sub-agents step by step, while
+    "parallel" runs disaster discovery and relief finding concurrently.
+    """
+    workflow = os.getenv("FIRST_RESPONDER_WORKFLOW", WORKFLOW_AGENTIC).lower()
+    if workflow == WORKFLOW_PARALLEL:
+        return create_parallel_first_responder_agent()
+    if workflow != WORKFLOW_AGENTIC:
+        logger.warning(f"[create_first_responder_agent] Unknown FIRST_RESPONDER_WORKFLOW={workflow}, using {WORKFLOW_AGENTIC}")
+
     logger.info("[create_first_responder_agent] Creating First Responder root agent")
 
     # Create sub-agents
@@ -87,6 +177,7 @@ IMPORTANT: Once location is obtained, execute all remaining steps in sequence wi
         sub_agents=[disaster_discovery, relief_finder],
         before_agent_callback=on_before_agent,
         after_agent_callback=on_after_agent,
+        before_model_callback=publish_locations_callback,
     )
     logger.info("[create_first_responder_agent] First Responder agent created successfully")
     return first_responder
@@ -0,0 +1,170 @@
+"""Briefing Fast Path - Collects briefing data directly in Python and makes a single insights model call."""
+
+import asyncio
+import json
+import logging
+import uuid
+from typing import Any, AsyncGenerator, Dict
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+from .common.bigquery_tools import fetch_storms_info
+from .common.concurrency import run_legs, flatten_legs, group_results
+from .common.tracing import traced
+from .common.metrics import INFLIGHT_WORKFLOWS
+from .disaster_discovery_agent.live_discovery_tool import live_disaster_legs, publish_live_disasters
+from .relief_finder_agent.all_relief_tool import relief_legs, publish_relief, parse_relief_types
+from .insights_agent.agent import create_insights_agent
+
+logger = logging.getLogger(__name__)
+
+APP_NAME = "first_responder_briefing"
+USER_ID = "briefing_fast_path"
+
+_runner = None
+
+
+class BriefingContext:
+    """Minimal stand-in for ToolContext so tools can run outside an ADK invocation.
+
+    Tools only touch `state`; map locations and activity written there are
+    returned with the briefing data instead of being synced to a UI session.
+    """
+
+    def __init__(self):
+        self.state: Dict[str, Any] = {}
+        self.session = None
+
+
+def _get_runner() -> Runner:
+    """Get or create the runner for the insights agent."""
+    global _runner
+    if _runner is None:
+        _runner = Runner(
+            app_name=APP_NAME,
+            agent=create_insights_agent(),
+            session_service=InMemorySessionService()
+        )
+    return _runner
+
+
+@traced("briefing collect", "radius", kind="briefing")
+def collect_briefing_data(latitude: float, longitude: float, radius: int = 5000) -> Dict[str, Any]:
+    """Collect storm, FEMA/NOAA and relief data for a location without any model calls.
+
+    The legs of the storm, live disaster and relief tools run side by side in
+    one run_legs call, through the same fetch functions (and shared caches) as
+    the agentic path; their results are applied here once it returns.
+
+    Args:
+        latitude: Latitude coordinate
+        longitude: Longitude coordinate
+        radius: Relief search radius in meters (default: 5000)
+
+    Returns:
+        Dict with "storms", "live_disasters", "relief" and "locations" sections
+    """
+    logger.info(f"[collect_briefing_data] Collecting briefing data for ({latitude}, {longitude}), radius={radius}")
+    context = BriefingContext()
+
+    relief_types = parse_relief_types(None)
+    legs, timed_out = run_legs(flatten_legs({
+        "storms": {"bigquery": lambda: fetch_storms_info(context, latitude, longitude)},
+        "live_disasters": live_disaster_legs(context, latitude, longitude),
+        "relief": relief_legs(context, latitude, longitude, radius, relief_types),
+    }))
+
+    storms, _ = group_results("storms", legs, timed_out)
+    live_legs, live_timed_out = group_results("live_disasters", legs, timed_out)
+    relief_results, relief_timed_out = group_results("relief", legs, timed_out)
+    sections = {
+        "storms": storms.get("bigquery", {}),
+        "live_disasters": publish_live_disasters(context, live_legs, live_timed_out, latitude, longitude),
+        "relief": publish_relief(context, relief_results, relief_timed_out, latitude, longitude, radius, relief_types),
+    }
+    timed_out_sections = sorted({name.split(".", 1)[0] for name in timed_out})
+
+    data = {
+        "latitude": latitude,
+        "longitude": longitude,
+        "radius": radius,
+        "partial": bool(timed_out),
+        "timed_out_sections": timed_out_sections,
+        **sections,
+        "locations": context.state.get("locations", [])
+    }
+    logger.info(f"[collect_briefing_data] Collected briefing data (timed out: {timed_out})")
+    return data
+
+
+def _insights_prompt(data: Dict[str, Any]) -> str:
+    """Build the insights agent prompt from collected briefing data."""
+    payload = {key: value for key, value in data.items() if key != "locations"}
+    return (
+        f"Create an emergency brief for coordinates ({data['latitude']}, {data['longitude']}).\n"
+        f"All disaster and relief data has already been collected:\n\n"
+        f"{json.dumps(payload, default=str)}"
+    )
+
+
+def _sse(event: str, data: Any) -> str:
+    """Format one server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+async def stream_briefing(latitude: float, longitude: float, radius: int = 5000) -> AsyncGenerator[str, None]:
+    """Collect briefing data and stream the insights analysis as server-sent events.
+
+    Emits a "data" event with the collected data, "token" events with analysis
+    text as it is generated, then a "done" event (or "error" on failure).
+
+    Args:
+        latitude: Latitude coordinate
+        longitude: Longitude coordinate
+        radius: Relief search radius in meters (default: 5000)
+    """
+    INFLIGHT_WORKFLOWS.inc("briefing")
+    try:
+        async for chunk in _stream_briefing(latitude, longitude, radius):
+            yield chunk
+    finally:
+        INFLIGHT_WORKFLOWS.dec("briefing")
+
+
+async def _stream_briefing(latitude: float, longitude: float, radius: int) -> AsyncGenerator[str, None]:
+    """Body of stream_briefing (see there)."""
+    data = await asyncio.to_thread(collect_briefing_data, latitude, longitude, radius)
+    yield _sse("data", data)
+
+    runner = _get_runner()
+    session_service = runner.session_service
+    session = await session_service.create_session(
+        app_name=APP_NAME, user_id=USER_ID, session_id=str(uuid.uuid4())
+    )
+    try:
+        message = types.Content(role="user", parts=[types.Part(text=_insights_prompt(data))])
+        streamed_partial = False
+        async for event in runner.run_async(
+            user_id=USER_ID,
+            session_id=session.id,
+            new_message=message,
+            run_config=RunConfig(streaming_mode=StreamingMode.SSE)
+        ):
+            if not event.content or not event.content.parts:
+                continue
+            text = "".join(part.text or "" for part in event.content.parts)
+            if not text:
+                continue
+            if event.partial:
+                streamed_partial = True
+                yield _sse("token", {"text": text})
+            elif not streamed_partial:
+                # Model did not stream; send the final response in one piece
+                yield _sse("token", {"text": text})
+        yield _sse("done", {"status": "success"})
+    except Exception as e:
+        logger.error(f"[stream_briefing] Error generating insights: {str(e)}", exc_info=True)
+        yield _sse("error", {"status": "error", "message": f"Error generating insights: {str(e)}"})
+    finally:
+        await session_service.delete_session(app_name=APP_NAME, user_id=USER_ID, session_id=session.id)
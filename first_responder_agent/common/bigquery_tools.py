@@ -1,21 +1,32 @@
 """BigQuery Tools - Functions for querying disaster and relief data from BigQuery."""
 
+import asyncio
 import os
 import logging
-from typing import Optional
+from typing import List, Optional
 from google.cloud import bigquery
 from google.adk.tools import ToolContext
+from . import prefetch
+from .cassette import attach_cassettes, replay_only
+from .tracing import traced
 
 logger = logging.getLogger(__name__)
 
 
+# Shared BigQuery client (clients are thread-safe and expensive to create)
+bigquery_client = None
+
+
 def _get_bigquery_client():
-    """Get BigQuery client.
+    """Get or create the shared BigQuery client.
 
     Raises:
         ValueError: If GCP_PROJECT environment variable is not set
         Exception: If BigQuery client creation fails
     """
+    global bigquery_client
+    if bigquery_client is not None:
+        return bigquery_client
     logger.info("[_get_bigquery_client] Attempting to get BigQuery client")
     project_id = os.getenv("GCP_PROJECT")
     if not project_id:
@@ -23,9 +34,26 @@ def _get_bigquery_client():
         raise ValueError("GCP_PROJECT environment variable not set")
     logger.info(f"[_get_bigquery_client] Creating BigQuery client for project: {project_id}")
     try:
-        client = bigquery.Client(project=project_id)
+        # BIGQUERY_API_ENDPOINT points the client at an emulator or local fixture server (no credentials needed)
+        api_endpoint = os.getenv("BIGQUERY_API_ENDPOINT")
+        if api_endpoint:
+            from google.auth.credentials import AnonymousCredentials
+            logger.info(f"[_get_bigquery_client] Using BigQuery endpoint override: {api_endpoint}")
+            bigquery_client = bigquery.Client(
+                project=project_id,
+                credentials=AnonymousCredentials(),
+                client_options={"api_endpoint": api_endpoint}
+            )
+        elif replay_only():
+            from google.auth.credentials import AnonymousCredentials
+            logger.info("[_get_bigquery_client] Replaying BigQuery from cassettes (no credentials)")
+            bigquery_client = bigquery.Client(project=project_id, credentials=AnonymousCredentials())
+        else:
+            bigquery_client = bigquery.Client(project=project_id)
+        # Record/replay goes through the client's authorized requests session
+        attach_cassettes(bigquery_client._http)
         logger.info("[_get_bigquery_client] BigQuery client created successfully")
-        return client
+        return bigquery_client
     except Exception as e:
         logger.error(f"[_get_bigquery_client] Failed to create BigQuery client: {str(e)}", exc_info=True)
         raise
@@ -33,11 +61,46 @@ def _get_bigquery_client():
 
 # ============ ONGOING STORMS QUERIES ============
 
-def get_ongoing_storms_info(tool_context: ToolContext, lat: float, long: float, radius_miles: float = 25.0) -> dict:
+@traced("bigquery storms", "radius_miles", kind="upstream")
+def query_storm_rows(lat: float, long: float, radius_miles: float = 25.0) -> List[dict]:
+    """Run the storm proximity query and return the matching rows.
+
+    Args:
+        lat: Latitude coordinate in decimal degrees
+        long: Longitude coordinate in decimal degrees
+        radius_miles: Search radius in miles
+
+    Raises:
+        Exception: If the BigQuery client cannot be created or the query fails
+    """
+    client = _get_bigquery_client()
+    # Convert miles to approximate degrees (1 degree ≈ 69 miles)
+    radius_degrees = radius_miles / 69.0
+    lat_min = lat - radius_degrees
+    lat_max = lat + radius_degrees
+    long_min = long - radius_degrees
+    long_max = long + radius_degrees
+
+    query = f"""
+    SELECT YEARMONTH, EPISODE_ID, LOCATION_INDEX, AZIMUTH, LOCATION, LATITUDE, LONGITUDE
+    FROM `{client.project}`.c4datasetnew.StormLocations
+    WHERE LATITUDE BETWEEN {lat_min} AND {lat_max}
+      AND LONGITUDE BETWEEN {long_min} AND {long_max}
+    ORDER BY LATITUDE, LONGITUDE
+    LIMIT 100
+    """
+    logger.info(f"[query_storm_rows] Executing BigQuery proximity search for storms within {radius_miles} miles: {query}")
+    results = client.query(query).result()
+    return [dict(row) for row in results]
+
+
+@traced("tool get_ongoing_storms_info")
+async def get_ongoing_storms_info(tool_context: ToolContext, lat: float, long: float, radius_miles: float = 25.0) -> dict:
     """Query ongoing storm information by latitude and longitude with proximity search.
 
     This function queries BigQuery for storm data within a specified radius of the given coordinates.
     It ALWAYS returns a result, even if no storms are found or if an error occurs.
+    The query runs off the event loop.
 
     Args:
         tool_context: The tool context containing state
@@ -54,43 +117,27 @@ def get_ongoing_storms_info(tool_context: ToolContext, lat: float, long: float,
     """
     from .state_tools import update_agent_activity
 
-    logger.info(f"[get_ongoing_storms_info] Querying storm information for lat={lat}, long={long}, radius={radius_miles} miles")
-
     # Update agent activity
     update_agent_activity(tool_context.state, "bigquery_storms_tool", "running")
+    result = await asyncio.to_thread(fetch_storms_info, tool_context, lat, long, radius_miles)
+    # Mark as completed (also on error)
+    update_agent_activity(tool_context.state, "bigquery_storms_tool", "completed")
+    return result
 
-    try:
-        client = _get_bigquery_client()
-        # Convert miles to approximate degrees (1 degree ≈ 69 miles)
-        radius_degrees = radius_miles / 69.0
-        lat_min = lat - radius_degrees
-        lat_max = lat + radius_degrees
-        long_min = long - radius_degrees
-        long_max = long + radius_degrees
-
-        query = f"""
-        SELECT YEARMONTH, EPISODE_ID, LOCATION_INDEX, AZIMUTH, LOCATION, LATITUDE, LONGITUDE
-        FROM `{client.project}`.c4datasetnew.StormLocations
-        WHERE LATITUDE BETWEEN {lat_min} AND {lat_max}
-          AND LONGITUDE BETWEEN {long_min} AND {long_max}
-        ORDER BY LATITUDE, LONGITUDE
-        LIMIT 100
-        """
-        logger.info(f"[get_ongoing_storms_info] Executing BigQuery proximity search for storms within {radius_miles} miles: {query}")
-        results = client.query(query).result()
-        rows = [dict(row) for row in results]
-        logger.info(f"[get_ongoing_storms_info] Successfully retrieved {len(rows)} storm records for lat={lat}, long={long}")
-
-        # Mark as completed
-        update_agent_activity(tool_context.state, "bigquery_storms_tool", "completed")
 
+def fetch_storms_info(tool_context: ToolContext, lat: float, long: float, radius_miles: float = 25.0) -> dict:
+    """get_ongoing_storms_info without the activity updates; writes no session state, so it can run as a leg."""
+    logger.info(f"[fetch_storms_info] Querying storm information for lat={lat}, long={long}, radius={radius_miles} miles")
+    try:
+        rows = prefetch.fetch(
+            tool_context,
+            prefetch.prefetch_key("bq_storms", lat, long, radius_miles),
+            query_storm_rows, lat, long, radius_miles
+        )
+        logger.info(f"[fetch_storms_info] Successfully retrieved {len(rows)} storm records for lat={lat}, long={long}")
         return {"status": "success", "latitude": lat, "longitude": long, "count": len(rows), "storms": rows}
     except Exception as e:
-        logger.error(f"[get_ongoing_storms_info] Error querying storms for lat={lat}, long={long}: {str(e)}", exc_info=True)
-
-        # Mark as completed even on error
-        update_agent_activity(tool_context.state, "bigquery_storms_tool", "completed")
-
+        logger.error(f"[fetch_storms_info] Error querying storms for lat={lat}, long={long}: {str(e)}", exc_info=True)
         return {
             "status": "info",
             "latitude": lat,
@@ -101,6 +148,49 @@ def get_ongoing_storms_info(tool_context: ToolContext, lat: float, long: float,
 
 # ============ SHELTER QUERIES ============
 
+@traced("bigquery shelters", "min_beds", kind="upstream")
+def query_shelter_rows(lat: float, long: float, min_beds: Optional[int] = 1, onsite_medical_clinic: Optional[str] = None) -> List[dict]:
+    """Run the shelter query and return the matching rows.
+
+    Args:
+        lat: Latitude coordinate in decimal degrees
+        long: Longitude coordinate in decimal degrees
+        min_beds: Minimum number of beds required (optional)
+        onsite_medical_clinic: Filter by onsite medical clinic availability (optional, 'Yes' or 'No')
+
+    Raises:
+        Exception: If the BigQuery client cannot be created or the query fails
+    """
+    client = _get_bigquery_client()
+
+    # Build WHERE clause with required and optional filters
+    where_conditions = [f"LATITUDE = {lat}", f"LONGITUDE = {long}"]
+
+    if min_beds is not None:
+        where_conditions.append(f"NUMBER_OF_BEDS > {min_beds}")
+        logger.info(f"[query_shelter_rows] Added filter: min_beds > {min_beds}")
+
+    if onsite_medical_clinic is not None:
+        where_conditions.append(f"ON_SITE_MEDICAL_CLINIC = '{onsite_medical_clinic}'")
+        logger.info(f"[query_shelter_rows] Added filter: onsite_medical_clinic = {onsite_medical_clinic}")
+
+    where_clause = " AND ".join(where_conditions)
+    logger.info(f"[query_shelter_rows] WHERE clause: {where_clause}")
+
+    query = f"""
+    SELECT
+        NAME, ADDRESS, CITY, STATE, ZIPCODE, WARD, PROVIDER, TYPE, SUBTYPE, STATUS,
+        NUMBER_OF_BEDS, ON_SITE_MEDICAL_CLINIC, AGES_SERVED, HOW_TO_ACCESS, LGBTQ_FOCUSED,
+        LATITUDE, LONGITUDE
+    FROM `{client.project}`.c4datasetnew.Shelter
+    WHERE {where_clause}
+    """
+    logger.info(f"[query_shelter_rows] Executing BigQuery {query} for shelters")
+    results = client.query(query).result()
+    return [dict(row) for row in results]
+
+
+@traced("tool get_available_shelter_info")
 def get_available_shelter_info(tool_context: ToolContext, lat: float, long: float, min_beds: Optional[int] = 1, onsite_medical_clinic: Optional[str] = None) -> dict:
     """Query available shelter information by latitude and longitude.
 
@@ -123,51 +213,27 @@ def get_available_shelter_info(tool_context: ToolContext, lat: float, long: floa
     """
     from .state_tools import update_agent_activity
 
-    logger.info(f"[get_available_shelter_info] Querying shelter information for lat={lat}, long={long}, min_beds={min_beds}, onsite_medical_clinic={onsite_medical_clinic}")
-
     # Update agent activity
     update_agent_activity(tool_context.state, "bigquery_shelter_tool", "running")
+    result = fetch_shelter_info(tool_context, lat, long, min_beds, onsite_medical_clinic)
+    # Mark as completed (also on error)
+    update_agent_activity(tool_context.state, "bigquery_shelter_tool", "completed")
+    return result
 
-    try:
-        client = _get_bigquery_client()
-
-        # Build WHERE clause with required and optional filters
-        where_conditions = [f"LATITUDE = {lat}", f"LONGITUDE = {long}"]
-
-        if min_beds is not None:
-            where_conditions.append(f"NUMBER_OF_BEDS > {min_beds}")
-            logger.info(f"[get_available_shelter_info] Added filter: min_beds > {min_beds}")
-
-        if onsite_medical_clinic is not None:
-            where_conditions.append(f"ON_SITE_MEDICAL_CLINIC = '{onsite_medical_clinic}'")
-            logger.info(f"[get_available_shelter_info] Added filter: onsite_medical_clinic = {onsite_medical_clinic}")
-
-        where_clause = " AND ".join(where_conditions)
-        logger.info(f"[get_available_shelter_info] WHERE clause: {where_clause}")
-
-        query = f"""
-        SELECT
-            NAME, ADDRESS, CITY, STATE, ZIPCODE, WARD, PROVIDER, TYPE, SUBTYPE, STATUS,
-            NUMBER_OF_BEDS, ON_SITE_MEDICAL_CLINIC, AGES_SERVED, HOW_TO_ACCESS, LGBTQ_FOCUSED,
-            LATITUDE, LONGITUDE
-        FROM `{client.project}`.c4datasetnew.Shelter
-        WHERE {where_clause}
-        """
-        logger.info(f"[get_available_shelter_info] Executing BigQuery {query} for shelters")
-        results = client.query(query).result()
-        rows = [dict(row) for row in results]
-        logger.info(f"[get_available_shelter_info] Successfully retrieved {len(rows)} shelter records for lat={lat}, long={long}")
-
-        # Mark as completed
-        update_agent_activity(tool_context.state, "bigquery_shelter_tool", "completed")
 
+def fetch_shelter_info(tool_context: ToolContext, lat: float, long: float, min_beds: Optional[int] = 1, onsite_medical_clinic: Optional[str] = None) -> dict:
+    """get_available_shelter_info without the activity updates; writes no session state, so it can run as a leg."""
+    logger.info(f"[fetch_shelter_info] Querying shelter information for lat={lat}, long={long}, min_beds={min_beds}, onsite_medical_clinic={onsite_medical_clinic}")
+    try:
+        rows = prefetch.fetch(
+            tool_context,
+            prefetch.prefetch_key("bq_shelters", lat, long, min_beds, onsite_medical_clinic),
+            query_shelter_rows, lat, long, min_beds, onsite_medical_clinic
+        )
+        logger.info(f"[fetch_shelter_info] Successfully retrieved {len(rows)} shelter records for lat={lat}, long={long}")
         return {"status": "success", "latitude": lat, "longitude": long, "count": len(rows), "shelters": rows}
     except Exception as e:
-        logger.error(f"[get_available_shelter_info] Error querying shelters for lat={lat}, long={long}: {str(e)}", exc_info=True)
-
-        # Mark as completed even on error
-        update_agent_activity(tool_context.state, "bigquery_shelter_tool", "completed")
-
+        logger.error(f"[fetch_shelter_info] Error querying shelters for lat={lat}, long={long}: {str(e)}", exc_info=True)
         return {
             "status": "info",
             "latitude": lat,
@@ -195,8 +261,7 @@ def check_hospital_capacity(tool_context: ToolContext, hospital_id: str) -> dict
     # Update agent activity
     update_agent_activity(tool_context.state, "bigquery_hospital_tool", "running")
 
-    # Placeholder implementation
-    result = {"status": "info", "message": "No hospital capacity info, continue with other sources"}
+    result = fetch_hospital_capacity(hospital_id)
 
     # Mark as completed
     update_agent_activity(tool_context.state, "bigquery_hospital_tool", "completed")
@@ -204,6 +269,11 @@ def check_hospital_capacity(tool_context: ToolContext, hospital_id: str) -> dict
     return result
 
 
+def fetch_hospital_capacity(hospital_id: str) -> dict:
+    """check_hospital_capacity without the activity updates, so it can run as a leg (placeholder)."""
+    return {"status": "info", "message": "No hospital capacity info, continue with other sources"}
+
+
 # ============ SUPPLY QUERIES ============
 
 def check_supply_inventory(tool_context: ToolContext, supply_id: str) -> dict:
@@ -223,11 +293,14 @@ def check_supply_inventory(tool_context: ToolContext, supply_id: str) -> dict:
     # Update agent activity
     update_agent_activity(tool_context.state, "bigquery_supply_tool", "running")
 
-    # Placeholder implementation
-    result = {"status": "info", "message": "No supply inventory info, continue with other sources"}
+    result = fetch_supply_inventory(supply_id)
 
     # Mark as completed
     update_agent_activity(tool_context.state, "bigquery_supply_tool", "completed")
 
     return result
 
+
+def fetch_supply_inventory(supply_id: str) -> dict:
+    """check_supply_inventory without the activity updates, so it can run as a leg (placeholder)."""
+    return {"status": "info", "message": "No supply inventory info, continue with other sources"}
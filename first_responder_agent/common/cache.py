@@ -0,0 +1,119 @@
+"""In-process TTL + LRU caches shared by the agent tools and the briefing fast path."""
+
+import logging
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Sentinel for cache misses (None is a valid cached value)
+MISSING = object()
+
+# Live caches, for metrics
+_caches: "weakref.WeakSet" = weakref.WeakSet()
+
+
+class TTLCache:
+    """Thread-safe mapping with per-entry expiry and a least-recently-used size bound."""
+
+    def __init__(self, name: str, ttl_seconds: float, max_entries: int = 1024):
+        """Create a cache.
+
+        Args:
+            name: Cache name used in logs and stats
+            ttl_seconds: Seconds an entry stays fresh after it is stored
+            max_entries: Maximum number of entries before the least recently used is evicted
+        """
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        _caches.add(self)
+
+    def get(self, key: Hashable, default: Any = MISSING, record_stats: bool = True) -> Any:
+        """Return the fresh value for key, or default if absent or expired.
+
+        Args:
+            key: Cache key
+            default: Value returned on a miss
+            record_stats: Count this lookup in hits/misses (disable for speculative probes)
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                if record_stats:
+                    self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            if record_stats:
+                self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        """Store value under key, evicting the least recently used entry if full."""
+        expires_at = time.monotonic() + (self.ttl_seconds if ttl_seconds is None else ttl_seconds)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any], cache_if: Callable[[Any], bool] = None) -> Any:
+        """Return the cached value for key, computing and storing it on a miss.
+
+        Args:
+            key: Cache key
+            compute: Zero-argument callable producing the value
+            cache_if: Optional predicate; the computed value is only stored when it returns True
+        """
+        value = self.get(key)
+        if value is not MISSING:
+            return value
+        value = compute()
+        if cache_if is None or cache_if(value):
+            self.set(key, value)
+        return value
+
+    def items(self):
+        """Snapshot of (key, value) pairs for fresh entries."""
+        now = time.monotonic()
+        with self._lock:
+            return [(key, entry[1]) for key, entry in self._entries.items() if entry[0] > now]
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size."""
+        with self._lock:
+            return {
+                "name": self.name,
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
+
+
+def all_cache_stats() -> List[Dict[str, Any]]:
+    """Stats of every live TTLCache."""
+    return [cache.stats() for cache in list(_caches)]
+
+
+def clear_all_caches() -> None:
+    """Empty every live TTLCache (used by benchmarks to start each run cold)."""
+    for cache in list(_caches):
+        cache.clear()
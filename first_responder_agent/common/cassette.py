@@ -0,0 +1,345 @@
+"""Record/replay cassettes for upstream HTTP calls (FEMA, NOAA, Google Maps, BigQuery).
+
+A requests transport adapter is mounted on every upstream session: the shared
+session (FEMA, NOAA, Geocoding), the googlemaps client's session (Places) and
+the BigQuery client's authorized session. UPSTREAM_CASSETTE_MODE selects:
+
+    off     (default) no cassettes
+    record  call the real upstream and append each response to its cassette
+    replay  answer from the cassettes only; unmatched requests raise ConnectionError
+    auto    replay when a matching response was recorded, otherwise record it
+
+Cassettes are gzip JSON Lines files in UPSTREAM_CASSETTE_DIR, one per
+upstream (fema, noaa, geocode, places, bigquery, other). Response bodies are
+stored once per distinct body, so repeated multi-MB NOAA feeds cost one copy.
+API keys and auth headers are never stored.
+
+Requests match on method, URL (without API keys) and JSON body (without the
+random BigQuery request and job ids). Repeated identical requests replay in
+recorded order (e.g. job polling), then repeat the last response. With
+UPSTREAM_CASSETTE_MATCH=nearest (default) an unmatched request falls back
+to the recorded request with the same method and path (numeric segments such
+as NOAA /points/{lat},{lng} wildcarded) that shares the most query
+parameters, so date-stamped filters and other coordinates still replay.
+
+Replayed responses wait UPSTREAM_CASSETTE_TIMING_SCALE times their recorded
+duration (0, the default, answers immediately; 1 keeps the original timing).
+"""
+
+import base64
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+logger = logging.getLogger(__name__)
+
+MODE_OFF = "off"
+MODE_RECORD = "record"
+MODE_REPLAY = "replay"
+MODE_AUTO = "auto"
+MODES = (MODE_OFF, MODE_RECORD, MODE_REPLAY, MODE_AUTO)
+
+MATCH_EXACT = "exact"
+MATCH_NEAREST = "nearest"
+
+DEFAULT_CASSETTE_DIR = "cassettes"
+CASSETTE_SUFFIX = ".jsonl.gz"
+
+# googlemaps.Client rejects keys without this prefix; used when replaying without a key
+REPLAY_MAPS_API_KEY = "AIzaCassetteReplay"
+
+# Query parameters and JSON body keys left out of the match key and the cassette
+SECRET_PARAMS = {"key", "signature", "client", "access_token"}
+VOLATILE_BODY_KEYS = {"requestId", "jobId"}
+# Response headers kept in the cassette
+KEPT_HEADERS = ("Content-Type",)
+# Path segments that carry request values rather than the endpoint, e.g. NOAA /points/{lat},{lng}
+NUMERIC_SEGMENT = re.compile(r"^-?[\d.]+(,-?[\d.]+)*$")
+
+# URL path prefix -> cassette name (paths are the same behind endpoint overrides)
+CASSETTE_ROUTES = [
+    ("/api/open/", "fema"),
+    ("/alerts", "noaa"),
+    ("/points/", "noaa"),
+    ("/maps/api/geocode/", "geocode"),
+    ("/maps/api/place/", "places"),
+    ("/bigquery/", "bigquery"),
+]
+
+_store: Optional["CassetteStore"] = None
+_store_lock = threading.Lock()
+
+
+def cassette_name(url: str) -> str:
+    """The cassette an upstream URL is recorded in."""
+    path = urlsplit(url).path
+    for prefix, name in CASSETTE_ROUTES:
+        if path.startswith(prefix):
+            return name
+    return "other"
+
+
+def _path_template(url: str) -> str:
+    """URL with numeric path segments (coordinates, grid points) wildcarded, for nearest matching."""
+    return "/".join("*" if NUMERIC_SEGMENT.match(segment) else segment for segment in url.split("/"))
+
+
+def _strip_volatile(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {key: _strip_volatile(item) for key, item in value.items() if key not in VOLATILE_BODY_KEYS}
+    if isinstance(value, list):
+        return [_strip_volatile(item) for item in value]
+    return value
+
+
+def _public_url(url: str) -> Tuple[str, List[Tuple[str, str]]]:
+    """URL without query string, and its query parameters minus secrets (sorted)."""
+    parts = urlsplit(url)
+    params = sorted((key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True) if key not in SECRET_PARAMS)
+    return f"{parts.scheme}://{parts.netloc}{parts.path}", params
+
+
+def _body_digest(body: Any) -> str:
+    if not body:
+        return ""
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    try:
+        canonical = json.dumps(_strip_volatile(json.loads(body)), sort_keys=True).encode("utf-8")
+    except ValueError:
+        canonical = body
+    return hashlib.sha256(canonical).hexdigest()[:16]
+
+
+def request_key(request: requests.PreparedRequest) -> Tuple[str, str, List[Tuple[str, str]], str]:
+    """(method, url without query, public query params, body digest) for matching."""
+    url, params = _public_url(request.url)
+    return request.method, url, params, _body_digest(request.body)
+
+
+class Cassette:
+    """One cassette file: recorded interactions plus their deduplicated bodies."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.interactions: List[Dict[str, Any]] = []
+        self.bodies: Dict[str, bytes] = {}
+        self._by_key: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self._by_path: Dict[Tuple[str, str], List[Dict[str, Any]]] = defaultdict(list)
+        self._cursors: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            self._load()
+
+    def _load(self) -> None:
+        with gzip.open(self.path, "rt", encoding="utf-8") as source:
+            for line in source:
+                record = json.loads(line)
+                if "body" in record:
+                    data = record["data"]
+                    self.bodies[record["body"]] = base64.b64decode(data) if record.get("base64") else data.encode("utf-8")
+                else:
+                    self._add(record)
+        logger.info(f"[Cassette._load] Loaded {len(self.interactions)} interactions from {self.path}")
+
+    def _add(self, interaction: Dict[str, Any]) -> None:
+        self.interactions.append(interaction)
+        self._by_key[interaction["key"]].append(interaction)
+        self._by_path[(interaction["method"], _path_template(interaction["url"]))].append(interaction)
+
+    @staticmethod
+    def _match_key(method: str, url: str, params: List[Tuple[str, str]], digest: str) -> str:
+        return f"{method} {url}?{urlencode(params)} {digest}"
+
+    def find(self, key: Tuple[str, str, List[Tuple[str, str]], str], nearest: bool) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """Next recorded interaction for a request, and whether it matched exactly."""
+        method, url, params, digest = key
+        exact_key = self._match_key(method, url, params, digest)
+        with self._lock:
+            matches = self._by_key.get(exact_key)
+            if matches:
+                index = self._cursors[exact_key]
+                self._cursors[exact_key] = index + 1
+                return matches[min(index, len(matches) - 1)], True
+            if not nearest:
+                return None, False
+            candidates = self._by_path.get((method, _path_template(url)))
+            if not candidates:
+                return None, False
+            wanted = set(params)
+            best = max(candidates, key=lambda interaction: len(wanted & {tuple(pair) for pair in interaction["params"]}))
+            return best, False
+
+    def body(self, interaction: Dict[str, Any]) -> bytes:
+        return self.bodies.get(interaction.get("body_sha"), b"")
+
+    def record(self, key: Tuple[str, str, List[Tuple[str, str]], str], response: requests.Response, seconds: float) -> None:
+        """Append one interaction (and its body, unless already stored)."""
+        method, url, params, digest = key
+        content = response.content or b""
+        body_sha = hashlib.sha256(content).hexdigest()
+        interaction = {
+            "key": self._match_key(method, url, params, digest),
+            "method": method,
+            "url": url,
+            "params": params,
+            "status": response.status_code,
+            "reason": response.reason,
+            "headers": {name: response.headers[name] for name in KEPT_HEADERS if name in response.headers},
+            "body_sha": body_sha,
+            "seconds": round(seconds, 4),
+        }
+        lines = []
+        with self._lock:
+            if body_sha not in self.bodies:
+                self.bodies[body_sha] = content
+                try:
+                    lines.append({"body": body_sha, "data": content.decode("utf-8")})
+                except UnicodeDecodeError:
+                    lines.append({"body": body_sha, "base64": True, "data": base64.b64encode(content).decode("ascii")})
+            self._add(interaction)
+            lines.append(interaction)
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            # Appending starts a new gzip member; readers see one continuous stream
+            with gzip.open(self.path, "at", encoding="utf-8") as sink:
+                for line in lines:
+                    sink.write(json.dumps(line, separators=(",", ":")) + "\n")
+
+
+class CassetteStore:
+    """The cassettes in one directory, with the mode and replay settings."""
+
+    def __init__(self, directory: str = DEFAULT_CASSETTE_DIR, mode: str = MODE_REPLAY,
+                 timing_scale: float = 0.0, match: str = MATCH_NEAREST):
+        self.directory = directory
+        self.mode = mode
+        self.timing_scale = timing_scale
+        self.nearest = match == MATCH_NEAREST
+        self.stats: Counter = Counter()
+        self._cassettes: Dict[str, Cassette] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode in (MODE_REPLAY, MODE_AUTO)
+
+    def cassette(self, name: str) -> Cassette:
+        with self._lock:
+            if name not in self._cassettes:
+                self._cassettes[name] = Cassette(os.path.join(self.directory, name + CASSETTE_SUFFIX))
+            return self._cassettes[name]
+
+    def _count(self, name: str, outcome: str) -> None:
+        with self._lock:
+            self.stats[f"{name}:{outcome}"] += 1
+
+    def replay(self, request: requests.PreparedRequest, adapter: HTTPAdapter) -> Optional[requests.Response]:
+        """A response built from the cassettes, or None when nothing matches."""
+        name = cassette_name(request.url)
+        cassette = self.cassette(name)
+        # In auto mode a request without an exact match is recorded, not approximated
+        interaction, exact = cassette.find(request_key(request), self.nearest and self.mode == MODE_REPLAY)
+        if interaction is None:
+            self._count(name, "missed")
+            return None
+        self._count(name, "replayed" if exact else "nearest")
+        if not exact:
+            logger.debug(f"[CassetteStore.replay] Nearest match for {request.method} {_public_url(request.url)[0]}")
+        delay = interaction["seconds"] * self.timing_scale
+        if delay > 0:
+            time.sleep(delay)
+
+        response = requests.Response()
+        response.status_code = interaction["status"]
+        response.reason = interaction.get("reason", "")
+        response.headers = CaseInsensitiveDict(interaction.get("headers") or {})
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = cassette.body(interaction)
+        response.url = request.url
+        response.request = request
+        response.connection = adapter
+        response.elapsed = timedelta(seconds=delay)
+        return response
+
+    def record(self, request: requests.PreparedRequest, response: requests.Response, seconds: float) -> None:
+        name = cassette_name(request.url)
+        self.cassette(name).record(request_key(request), response, seconds)
+        self._count(name, "recorded")
+
+
+class CassetteAdapter(HTTPAdapter):
+    """Transport adapter that records to and replays from a CassetteStore."""
+
+    def __init__(self, store: CassetteStore, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.store = store
+
+    def send(self, request: requests.PreparedRequest, **kwargs: Any) -> requests.Response:
+        if self.store.replaying:
+            response = self.store.replay(request, self)
+            if response is not None:
+                return response
+            if self.store.mode == MODE_REPLAY:
+                raise requests.ConnectionError(
+                    f"No cassette response for {request.method} {_public_url(request.url)[0]}", request=request)
+        started = time.perf_counter()
+        response = super().send(request, **kwargs)
+        # Read the body now so it is recorded (requests keeps it for the caller)
+        response.content
+        self.store.record(request, response, time.perf_counter() - started)
+        return response
+
+
+def get_cassette_store() -> Optional[CassetteStore]:
+    """The cassette store from UPSTREAM_CASSETTE_* settings, or None when cassettes are off."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            mode = os.getenv("UPSTREAM_CASSETTE_MODE", MODE_OFF).lower()
+            if mode not in MODES:
+                logger.warning(f"[get_cassette_store] Unknown UPSTREAM_CASSETTE_MODE={mode}, using {MODE_OFF}")
+                mode = MODE_OFF
+            if mode == MODE_OFF:
+                return None
+            _store = CassetteStore(
+                directory=os.getenv("UPSTREAM_CASSETTE_DIR", DEFAULT_CASSETTE_DIR),
+                mode=mode,
+                timing_scale=float(os.getenv("UPSTREAM_CASSETTE_TIMING_SCALE", "0")),
+                match=os.getenv("UPSTREAM_CASSETTE_MATCH", MATCH_NEAREST).lower(),
+            )
+            logger.info(f"[get_cassette_store] Upstream cassettes: mode={mode}, dir={_store.directory}")
+        return _store
+
+
+def attach_cassettes(session: requests.Session, pool_maxsize: int = 10) -> requests.Session:
+    """Mount the cassette adapter on a session when cassettes are enabled."""
+    store = get_cassette_store()
+    if store is not None:
+        adapter = CassetteAdapter(store, pool_connections=16, pool_maxsize=pool_maxsize)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+    return session
+
+
+def replay_only() -> bool:
+    """True when upstream calls are answered from cassettes only (no credentials needed)."""
+    store = get_cassette_store()
+    return store is not None and store.mode == MODE_REPLAY
+
+
+def replay_maps_api_key() -> Optional[str]:
+    """Placeholder Maps key so Geocoding and Places can replay without credentials."""
+    return REPLAY_MAPS_API_KEY if replay_only() else None
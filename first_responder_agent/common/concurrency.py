@@ -0,0 +1,145 @@
+"""Concurrency helpers for running independent I/O legs side by side.
+
+Legs run on one bounded, process-wide pool and must only fetch data: a leg
+that misses its time budget keeps running after the tool has returned and its
+state delta has been sent, so any session state it wrote would change the live
+session without ever being persisted or synced. Tools build their legs from
+data-only fetch functions and apply the results to state on the calling thread
+once run_legs returns; late results are dropped. Tools that combine several
+finders flatten all their legs into one run_legs call (flatten_legs) instead
+of nesting fan-outs.
+"""
+
+import contextvars
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from .metrics import TIMEOUTS
+
+logger = logging.getLogger(__name__)
+
+# Default budget for a single leg (BigQuery query, Places search, ...)
+DEFAULT_LEG_TIMEOUT_SECONDS = 8.0
+
+# Threads shared by all legs in the process; timed-out legs hold theirs until they finish
+DEFAULT_LEG_WORKERS = 32
+
+# Separator between group and leg names in flattened legs
+LEG_SEPARATOR = "."
+
+
+def get_leg_timeout() -> float:
+    """Get the per-leg timeout in seconds from RELIEF_LEG_TIMEOUT_SECONDS."""
+    value = os.getenv("RELIEF_LEG_TIMEOUT_SECONDS")
+    if not value:
+        return DEFAULT_LEG_TIMEOUT_SECONDS
+    try:
+        return float(value)
+    except ValueError:
+        logger.warning(f"[get_leg_timeout] Invalid RELIEF_LEG_TIMEOUT_SECONDS={value}, using {DEFAULT_LEG_TIMEOUT_SECONDS}")
+        return DEFAULT_LEG_TIMEOUT_SECONDS
+
+
+def get_leg_workers() -> int:
+    """Get the size of the shared leg pool from RELIEF_LEG_WORKERS."""
+    value = os.getenv("RELIEF_LEG_WORKERS")
+    if not value:
+        return DEFAULT_LEG_WORKERS
+    try:
+        return max(int(value), 1)
+    except ValueError:
+        logger.warning(f"[get_leg_workers] Invalid RELIEF_LEG_WORKERS={value}, using {DEFAULT_LEG_WORKERS}")
+        return DEFAULT_LEG_WORKERS
+
+
+_executor = ThreadPoolExecutor(max_workers=get_leg_workers(), thread_name_prefix="a4i-leg")
+_leg_thread = threading.local()
+
+
+def _run_leg(fn: Callable[[], Any]) -> Any:
+    """Run a leg on a pool thread, marked so nested run_legs calls stay on it."""
+    _leg_thread.active = True
+    try:
+        return fn()
+    finally:
+        _leg_thread.active = False
+
+
+def flatten_legs(groups: Dict[str, Dict[str, Callable[[], Any]]]) -> Dict[str, Callable[[], Any]]:
+    """Combine groups of legs (e.g. one per finder) into one mapping for a single run_legs call."""
+    return {
+        f"{group}{LEG_SEPARATOR}{name}": fn
+        for group, legs in groups.items()
+        for name, fn in legs.items()
+    }
+
+
+def group_results(
+    group: str,
+    results: Dict[str, Any],
+    timed_out: List[str]
+) -> Tuple[Dict[str, Any], List[str]]:
+    """One group's results and timed-out leg names from a run_legs call over flatten_legs()."""
+    prefix = f"{group}{LEG_SEPARATOR}"
+    return (
+        {name[len(prefix):]: value for name, value in results.items() if name.startswith(prefix)},
+        [name[len(prefix):] for name in timed_out if name.startswith(prefix)]
+    )
+
+
+def run_legs(
+    legs: Dict[str, Callable[[], Any]],
+    timeout: Optional[float] = None
+) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Run independent callables concurrently and collect whatever finishes in time.
+
+    All legs start together, so the timeout applies to each leg individually and
+    total latency is bounded by the slowest leg (or the timeout), not the sum.
+    Legs that miss the budget keep running in the background but their results
+    are discarded, so legs must not write session state (see module docstring).
+    Legs that raise are logged and left out of the results. Called from inside
+    a leg, the legs run one after another on that leg's thread rather than
+    waiting on the shared pool.
+
+    Args:
+        legs: Mapping of leg name to a zero-argument callable
+        timeout: Per-leg timeout in seconds (default: get_leg_timeout())
+
+    Returns:
+        Tuple of (results by leg name, names of legs that timed out)
+    """
+    if timeout is None:
+        timeout = get_leg_timeout()
+
+    if getattr(_leg_thread, "active", False):
+        logger.warning(f"[run_legs] Nested legs {list(legs)} run on the calling leg's thread")
+        results = {}
+        for name, fn in legs.items():
+            try:
+                results[name] = fn()
+            except Exception as e:
+                logger.error(f"[run_legs] Leg '{name}' failed: {str(e)}", exc_info=True)
+        return results, []
+
+    # Each leg runs in a copy of the caller's context so its spans nest under the caller's
+    futures = {name: _executor.submit(contextvars.copy_context().run, _run_leg, fn) for name, fn in legs.items()}
+    wait(futures.values(), timeout=timeout)
+
+    results = {}
+    timed_out = []
+    for name, future in futures.items():
+        if not future.done():
+            # A leg still queued behind a saturated pool never starts
+            future.cancel()
+            logger.warning(f"[run_legs] Leg '{name}' timed out after {timeout}s")
+            TIMEOUTS.inc(name)
+            timed_out.append(name)
+            continue
+        try:
+            results[name] = future.result()
+        except Exception as e:
+            logger.error(f"[run_legs] Leg '{name}' failed: {str(e)}", exc_info=True)
+    return results, timed_out
@@ -0,0 +1,218 @@
+"""Conversation context compaction for long-running sessions.
+
+Responders keep one session open for a whole incident, and ADK sends every
+agent the session's full event history on every model call, including the
+large FEMA/NOAA tool outputs of earlier turns. Once the events since the last
+compaction pass CONTEXT_COMPACTION_TOKENS (estimated) or
+CONTEXT_COMPACTION_EVENTS, the root agent's after-agent callback attaches an
+ADK EventCompaction to its final event. ADK's contents processor then sends
+the compaction's summary in place of every event it covers, so later turns
+start from the summary instead of the raw history.
+
+The summary is built without a model call. Each compacted turn keeps:
+
+  - the user's request
+  - the agents and tools involved
+  - its final answer, in full for the latest turn and truncated for older ones
+
+It ends with a checkpoint of the state the agents work from: the location,
+the map center and the markers by type. The same checkpoint is kept in
+state["_contextCompaction"]. The raw events stay in the session store until
+agent/session_retention.py compacts them.
+"""
+
+import logging
+import os
+from collections import Counter
+from typing import Any, Dict, List, Tuple
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.events import Event
+from google.adk.events.event_actions import EventCompaction
+from google.genai import types
+
+logger = logging.getLogger(__name__)
+
+# State key with the last compaction's checkpoint and counters
+COMPACTION_STATE_KEY = "_contextCompaction"
+
+DEFAULT_COMPACTION_TOKENS = 30000
+DEFAULT_COMPACTION_EVENTS = 150
+
+# Rough characters per token for the estimate (English text and JSON)
+CHARS_PER_TOKEN = 4
+
+# Characters kept of a turn's final answer: the latest turn's, and older turns'
+LATEST_ANSWER_CHARS = 4000
+OLDER_ANSWER_CHARS = 600
+REQUEST_CHARS = 300
+
+# Hand-offs between agents, not worth listing as tool use
+CONTROL_TOOLS = {"transfer_to_agent"}
+
+
+def _get_threshold(name: str, default: int) -> int:
+    """One compaction threshold from the environment; malformed values use the default, negative ones 0."""
+    value = os.getenv(name)
+    if not value:
+        return default
+    try:
+        return max(int(value), 0)
+    except ValueError:
+        logger.warning(f"[get_compaction_thresholds] Invalid {name}={value}, using {default}")
+        return default
+
+
+def get_compaction_thresholds() -> Tuple[int, int]:
+    """(tokens, events) since the last compaction that trigger one; 0 disables that trigger."""
+    return (
+        _get_threshold("CONTEXT_COMPACTION_TOKENS", DEFAULT_COMPACTION_TOKENS),
+        _get_threshold("CONTEXT_COMPACTION_EVENTS", DEFAULT_COMPACTION_EVENTS),
+    )
+
+
+def estimate_tokens(event: Event) -> int:
+    """Approximate model tokens of an event's content (text, tool calls and tool results)."""
+    if not event.content or not event.content.parts:
+        return 0
+    chars = 0
+    for part in event.content.parts:
+        if part.text:
+            chars += len(part.text)
+        elif part.function_call:
+            chars += len(part.function_call.name or "") + len(str(part.function_call.args or {}))
+        elif part.function_response:
+            chars += len(part.function_response.name or "") + len(str(part.function_response.response or {}))
+    return chars // CHARS_PER_TOKEN
+
+
+def uncompacted_events(events: List[Event]) -> List[Event]:
+    """Events after the last compaction's range (compaction events themselves excluded)."""
+    compacted_until = 0.0
+    for event in reversed(events):
+        if event.actions and event.actions.compaction:
+            compacted_until = event.actions.compaction.end_timestamp
+            break
+    return [
+        event for event in events
+        if event.timestamp > compacted_until and not (event.actions and event.actions.compaction)
+    ]
+
+
+def _clip(text: str, limit: int) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[:limit - 3].rstrip() + "..."
+
+
+def _turns(events: List[Event]) -> List[Dict[str, Any]]:
+    """Events grouped by invocation, in order: request, agents, tool counts and final answer."""
+    turns: Dict[str, Dict[str, Any]] = {}
+    for event in events:
+        if not event.content or not event.content.parts:
+            # State-only events (callbacks finishing after the compaction point) are not sent to models
+            continue
+        turn = turns.setdefault(event.invocation_id, {"request": "", "agents": [], "tools": Counter(), "answer": ""})
+        texts = [part.text for part in event.content.parts if part.text and not part.thought]
+        if event.author == "user":
+            if texts and not turn["request"]:
+                turn["request"] = " ".join(texts)
+            continue
+        if event.author not in turn["agents"]:
+            turn["agents"].append(event.author)
+        for call in event.get_function_calls():
+            if call.name not in CONTROL_TOOLS:
+                turn["tools"][call.name] += 1
+        if texts:
+            turn["answer"] = " ".join(texts)
+    return list(turns.values())
+
+
+def state_checkpoint(state: Any) -> Dict[str, Any]:
+    """The parts of session state later turns build on."""
+    from .state_tools import GEOCODE_KEY
+
+    geocode = state.get(GEOCODE_KEY) or {}
+    locations = state.get("locations") or []
+    markers = Counter(location.get("place_type") or "other" for location in locations)
+    return {
+        "location": geocode.get("formatted_address") or geocode.get("location"),
+        "coordinates": [geocode["lat"], geocode["lng"]] if "lat" in geocode and "lng" in geocode else None,
+        "state": geocode.get("state"),
+        "center": state.get("center"),
+        "markers": len(locations),
+        "markers_by_type": dict(markers),
+    }
+
+
+def build_summary(events: List[Event], checkpoint: Dict[str, Any]) -> str:
+    """Structured text standing in for events in later model calls."""
+    turns = _turns(events)
+    lines = [f"Summary of the conversation so far ({len(turns)} turns, {len(events)} events compacted):"]
+    for number, turn in enumerate(turns, 1):
+        latest = number == len(turns)
+        lines.append("")
+        lines.append(f"Turn {number}: user asked: {_clip(turn['request'], REQUEST_CHARS) or '(no text)'}")
+        if turn["agents"]:
+            lines.append(f"  Agents: {', '.join(turn['agents'])}")
+        if turn["tools"]:
+            lines.append("  Tools: " + ", ".join(f"{name} x{count}" for name, count in turn["tools"].items()))
+        if turn["answer"]:
+            lines.append(f"  Answer: {_clip(turn['answer'], LATEST_ANSWER_CHARS if latest else OLDER_ANSWER_CHARS)}")
+
+    lines.append("")
+    lines.append("State checkpoint:")
+    if checkpoint["location"]:
+        coordinates = checkpoint["coordinates"]
+        where = f" ({coordinates[0]}, {coordinates[1]})" if coordinates else ""
+        lines.append(f"  Location: {checkpoint['location']}{where}")
+    if checkpoint["center"]:
+        lines.append(f"  Map center: {checkpoint['center']}")
+    by_type = ", ".join(f"{place_type} {count}" for place_type, count in checkpoint["markers_by_type"].items())
+    lines.append(f"  Map markers: {checkpoint['markers']}" + (f" ({by_type})" if by_type else ""))
+    return "\n".join(lines)
+
+
+def compact_context(callback_context: CallbackContext) -> bool:
+    """Compact the session's history into a summary once it passes the thresholds.
+
+    Call from the root agent's after-agent callback: the compaction is
+    attached to the event that callback produces, so it covers every turn up
+    to and including the one that just finished.
+
+    Returns:
+        True if the history was compacted
+    """
+    from .metrics import CONTEXT_COMPACTIONS
+
+    token_limit, event_limit = get_compaction_thresholds()
+    if not token_limit and not event_limit:
+        return False
+    try:
+        events = uncompacted_events(callback_context.session.events)
+        tokens = sum(estimate_tokens(event) for event in events)
+        if not events or not ((token_limit and tokens >= token_limit) or (event_limit and len(events) >= event_limit)):
+            return False
+
+        state = callback_context.state
+        checkpoint = state_checkpoint(state)
+        summary = build_summary(events, checkpoint)
+        # ADK sends this content in place of every event between the two timestamps
+        callback_context._event_actions.compaction = EventCompaction(
+            start_timestamp=events[0].timestamp,
+            end_timestamp=events[-1].timestamp,
+            compacted_content=types.Content(role="model", parts=[types.Part(text=summary)]),
+        )
+        previous = state.get(COMPACTION_STATE_KEY) or {}
+        state[COMPACTION_STATE_KEY] = {
+            "compactions": previous.get("compactions", 0) + 1,
+            "events": previous.get("events", 0) + len(events),
+            "end_timestamp": events[-1].timestamp,
+            "checkpoint": checkpoint,
+        }
+        CONTEXT_COMPACTIONS.inc()
+        logger.info(f"[compact_context] Compacted {len(events)} events (~{tokens} tokens) "
+                    f"into a {len(summary) // CHARS_PER_TOKEN}-token summary")
+        return True
+    except Exception as e:
+        logger.error(f"[compact_context] Error compacting context: {str(e)}")
+        return False
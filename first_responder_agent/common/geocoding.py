@@ -1,50 +1,154 @@
 """Geocoding utility for converting location strings to coordinates."""
 
 import logging
+import math
 import os
-from typing import Optional, Tuple
-import requests
+from typing import Any, Dict, Optional, Tuple
+from google.adk.tools import ToolContext
+from .cache import TTLCache
+from .cassette import replay_maps_api_key
+from .http import http_get
+from .tracing import traced
 
 logger = logging.getLogger(__name__)
 
+# Google Maps API base URL (GOOGLE_MAPS_BASE_URL overrides it, e.g. for a local fixture server)
+GOOGLE_MAPS_BASE_URL = os.getenv("GOOGLE_MAPS_BASE_URL", "https://maps.googleapis.com").rstrip("/")
 
-def geocode_location(location: str) -> Optional[Tuple[float, float]]:
+# Google Maps Geocoding API endpoint
+GEOCODE_API_URL = f"{GOOGLE_MAPS_BASE_URL}/maps/api/geocode/json"
+
+# Geocoding results rarely change; shared by the agent tools and the briefing fast path
+_geocode_cache = TTLCache("geocode", ttl_seconds=24 * 3600, max_entries=2048)
+
+# Mean Earth radius in meters
+EARTH_RADIUS_METERS = 6371008.8
+
+
+def _request_geocode(params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Call the Geocoding API and return the first result, or None.
+
+    Successful results are cached, so repeat lookups skip the network.
+
+    Args:
+        params: Query parameters ("address" or "latlng"); the API key is added here
+
+    Returns:
+        The first geocoding result dict or None if the request fails
+    """
+    cache_key = tuple(sorted(params.items()))
+    return _geocode_cache.get_or_compute(
+        cache_key,
+        lambda: _fetch_geocode(params),
+        cache_if=lambda result: result is not None
+    )
+
+
+def _fetch_geocode(params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Uncached Geocoding API request (see _request_geocode)."""
+    google_maps_api_key = os.getenv("GOOGLE_MAPS_API_KEY") or replay_maps_api_key()
+    if not google_maps_api_key:
+        logger.error("[_fetch_geocode] GOOGLE_MAPS_API_KEY not set in environment")
+        return None
+
+    response = http_get(GEOCODE_API_URL, params={**params, "key": google_maps_api_key}, timeout=10)
+    response.raise_for_status()
+    data = response.json()
+
+    if data.get("status") == "OK" and data.get("results"):
+        return data["results"][0]
+    logger.warning(f"[_fetch_geocode] Geocoding failed for {params}: {data.get('status')}")
+    return None
+
+
+def _state_code(result: Dict[str, Any]) -> Optional[str]:
+    """Extract the two-letter state code from a geocoding result."""
+    for component in result.get("address_components", []):
+        if "administrative_area_level_1" in component.get("types", []):
+            return component.get("short_name")
+    return None
+
+
+@traced("tool geocode_location", "location")
+def geocode_location(tool_context: ToolContext, location: str) -> Optional[Tuple[float, float]]:
     """Convert a location string to latitude and longitude coordinates.
-    
+
+    The structured result (coordinates, state code, formatted address) is also
+    saved to state["geocode"] so downstream tools can use it without asking the model,
+    and the fetches those tools will make are prefetched in the background.
+
     Args:
+        tool_context: The tool context containing state
         location: Location string (e.g., "Sunnyvale, CA", "San Francisco, California")
-    
+
     Returns:
         Tuple of (latitude, longitude) or None if geocoding fails
     """
+    from .prefetch import prefetch_for_location
+    from .state_tools import GEOCODE_KEY
+
     try:
-        google_maps_api_key = os.getenv("GOOGLE_MAPS_API_KEY")
-        if not google_maps_api_key:
-            logger.error("[geocode_location] GOOGLE_MAPS_API_KEY not set in environment")
-            return None
-        
-        # Use Google Maps Geocoding API
-        url = "https://maps.googleapis.com/maps/api/geocode/json"
-        params = {
-            "address": location,
-            "key": google_maps_api_key
-        }
-        
         logger.info(f"[geocode_location] Geocoding location: {location}")
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        
-        if data.get("status") == "OK" and data.get("results"):
-            result = data["results"][0]
-            lat = result["geometry"]["location"]["lat"]
-            lng = result["geometry"]["location"]["lng"]
-            logger.info(f"[geocode_location] Successfully geocoded '{location}' to ({lat}, {lng})")
-            return (lat, lng)
-        else:
-            logger.warning(f"[geocode_location] Geocoding failed for '{location}': {data.get('status')}")
+        result = _request_geocode({"address": location})
+        if not result:
             return None
+
+        lat = result["geometry"]["location"]["lat"]
+        lng = result["geometry"]["location"]["lng"]
+        state_code = _state_code(result)
+        tool_context.state[GEOCODE_KEY] = {
+            "location": location,
+            "lat": lat,
+            "lng": lng,
+            "state": state_code,
+            "formatted_address": result.get("formatted_address", location)
+        }
+
+        # Start the downstream fetches now so they overlap with the model's next turns
+        prefetch_for_location(tool_context, lat, lng, state_code)
+        logger.info(f"[geocode_location] Successfully geocoded '{location}' to ({lat}, {lng})")
+        return (lat, lng)
     except Exception as e:
         logger.error(f"[geocode_location] Error geocoding location '{location}': {str(e)}", exc_info=True)
         return None
 
+
+def reverse_geocode_state(latitude: float, longitude: float) -> Optional[str]:
+    """Look up the two-letter state code for a coordinate.
+
+    Args:
+        latitude: Latitude coordinate
+        longitude: Longitude coordinate
+
+    Returns:
+        State code (e.g., "CA") or None if it cannot be determined
+    """
+    try:
+        logger.info(f"[reverse_geocode_state] Reverse geocoding ({latitude}, {longitude})")
+        # Round to ~100m so nearby points share a cache entry
+        latlng = f"{round(latitude, 3)},{round(longitude, 3)}"
+        result = _request_geocode({"latlng": latlng, "result_type": "administrative_area_level_1"})
+        return _state_code(result) if result else None
+    except Exception as e:
+        logger.error(f"[reverse_geocode_state] Error reverse geocoding ({latitude}, {longitude}): {str(e)}", exc_info=True)
+        return None
+
+
+def distance_meters(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Great-circle (haversine) distance between two coordinates.
+
+    Args:
+        lat1: Latitude of the first point in decimal degrees
+        lng1: Longitude of the first point in decimal degrees
+        lat2: Latitude of the second point in decimal degrees
+        lng2: Longitude of the second point in decimal degrees
+
+    Returns:
+        Distance in meters
+    """
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    d_phi = math.radians(lat2 - lat1)
+    d_lambda = math.radians(lng2 - lng1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_METERS * math.asin(math.sqrt(a))
@@ -0,0 +1,67 @@
+"""Shared HTTP client for upstream APIs (FEMA, NOAA, Google Geocoding).
+
+All upstream GETs go through one pooled requests.Session, so connections are
+reused across tools and every request is recorded as a client span. With
+UPSTREAM_CASSETTE_MODE set, the session records to or replays from cassettes
+(see cassette.py).
+"""
+
+import logging
+import threading
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from opentelemetry.trace import SpanKind, Status, StatusCode
+from .cassette import attach_cassettes
+from .tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+# Connection pool size per upstream host
+POOL_MAXSIZE = 32
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """Get or create the shared requests session."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=16, pool_maxsize=POOL_MAXSIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = attach_cassettes(session, pool_maxsize=POOL_MAXSIZE)
+        return _session
+
+
+def http_get(url: str, params: Optional[Dict[str, Any]] = None, timeout: float = 10, **kwargs: Any) -> requests.Response:
+    """GET an upstream URL through the shared session inside a client span.
+
+    Query parameters are not recorded on the span (they may carry API keys).
+
+    Args:
+        url: Request URL
+        params: Query parameters
+        timeout: Request timeout in seconds
+        **kwargs: Passed to requests.Session.get
+
+    Returns:
+        The response (status is not checked here)
+    """
+    parts = urlsplit(url)
+    attributes = {
+        "a4i.kind": "upstream",
+        "http.request.method": "GET",
+        "server.address": parts.hostname or "",
+        "url.path": parts.path,
+    }
+    with tracer.start_as_current_span(f"GET {parts.hostname}", kind=SpanKind.CLIENT, attributes=attributes) as span:
+        response = get_session().get(url, params=params, timeout=timeout, **kwargs)
+        span.set_attribute("http.response.status_code", response.status_code)
+        if response.status_code >= 400:
+            span.set_status(Status(StatusCode.ERROR))
+        return response
@@ -0,0 +1,292 @@
+"""Indexed, deduplicated store for the map locations kept in session state.
+
+The UI reads state["locations"] as a list of markers. Rebuilding that list on
+every search copied it each time and let repeat searches add duplicate
+markers. Instead, each session keeps an in-process index keyed by place_id
+(or a coordinate hash for rows without one), so upserts are O(1) and repeat
+finds merge into the existing marker. The list view is kept up to date by
+appending new markers and replacing changed ones in place, never rebuilt.
+
+Upserts only touch the index. The list is written to state lazily, by
+publish_locations from the agents' before-model and after-agent callbacks,
+so a run's tool calls cost one state write per callback rather than one per
+upsert. The list is copied only when it changes after being written, so
+earlier state deltas keep the markers they were written with. Outside a
+session (no session id) every upsert is written straight away.
+
+State carries a version token for the list it holds. If the token is not
+one this process loaded or published for the session (another worker wrote
+the session, or this process restarted) the index is rebuilt from state
+first. An older token this process knows means the index is ahead of that
+copy of state, e.g. a streamed Places page was written to the stored session
+while a run held an older copy; the index is kept and republished.
+"""
+
+import logging
+import uuid
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+from .session_scope import SessionTable, session_id_of
+
+logger = logging.getLogger(__name__)
+
+# State key holding the map markers read by the UI
+LOCATIONS_KEY = "locations"
+
+# State key holding the version token of the markers list
+LOCATIONS_VERSION_KEY = "_locations_version"
+
+# Decimal places of the coordinate hash for locations without a place_id (~1m)
+COORDINATE_PRECISION = 5
+
+# Versions published per session that still count as this process's own
+MAX_KNOWN_VERSIONS = 16
+
+# Attribute values that never overwrite a known value when merging
+EMPTY_VALUES = (None, "", "N/A", "Unknown", "Address not available")
+
+
+def location_key(location: Dict[str, Any]) -> Optional[str]:
+    """Identity of a location: its place_id, or a hash of its coordinates."""
+    place_id = location.get("place_id")
+    if place_id:
+        return f"place:{place_id}"
+    lat = location.get("lat", location.get("LATITUDE"))
+    lng = location.get("lng", location.get("LONGITUDE"))
+    try:
+        return f"coord:{round(float(lat), COORDINATE_PRECISION)},{round(float(lng), COORDINATE_PRECISION)}"
+    except (TypeError, ValueError):
+        return None
+
+
+def merge_location(existing: Dict[str, Any], incoming: Dict[str, Any]) -> Dict[str, Any]:
+    """Merge a repeat find into a known location.
+
+    Known attributes are only overwritten by non-empty values, list attributes
+    are unioned, and every place_type the location was found as is kept in
+    "place_types". Returns a new dict (existing is not modified).
+    """
+    merged = dict(existing)
+    for attribute, value in incoming.items():
+        if value in EMPTY_VALUES and attribute in merged:
+            continue
+        if isinstance(value, list) and isinstance(merged.get(attribute), list):
+            merged[attribute] = merged[attribute] + [item for item in value if item not in merged[attribute]]
+        elif attribute != "place_type":
+            merged[attribute] = value
+
+    place_types = list(existing.get("place_types") or [existing.get("place_type")])
+    if incoming.get("place_type") and incoming["place_type"] not in place_types:
+        merged["place_types"] = [place_type for place_type in place_types if place_type] + [incoming["place_type"]]
+    return merged
+
+
+class LocationStore:
+    """Insertion-ordered index of map locations with an incrementally kept list view."""
+
+    def __init__(self):
+        # Position of each keyed location in the view
+        self._positions: Dict[str, int] = {}
+        self._view: List[Dict[str, Any]] = []
+        # The view was written to state; copy it before the next change
+        self._shared = False
+        # Changed since last written to state
+        self.dirty = False
+        # Loaded from state at least once
+        self.loaded = False
+        self.version: Optional[str] = None
+        # Versions loaded into or published from this store, newest last
+        self.published = deque(maxlen=MAX_KNOWN_VERSIONS)
+        # Length of the markers list last read from or written to state
+        self.state_length = 0
+
+    def __len__(self) -> int:
+        return len(self._view)
+
+    def load(self, locations: List[Dict[str, Any]]) -> None:
+        """Rebuild the index from a markers list (duplicates in it are merged)."""
+        self._positions = {}
+        self._view = []
+        self._shared = False
+        self.upsert_many(locations)
+        self.dirty = False
+
+    def _writable_view(self) -> List[Dict[str, Any]]:
+        """The view, copied first if the current one was written to state."""
+        if self._shared:
+            self._view = list(self._view)
+            self._shared = False
+        return self._view
+
+    def upsert(self, location: Dict[str, Any]) -> str:
+        """Insert a location or merge it into the known one.
+
+        Returns:
+            "added", "updated" or "unchanged"
+        """
+        key = location_key(location)
+        position = self._positions.get(key) if key is not None else None
+        if position is None:
+            view = self._writable_view()
+            if key is not None:
+                self._positions[key] = len(view)
+            view.append(location)
+            self.dirty = True
+            return "added"
+        existing = self._view[position]
+        merged = merge_location(existing, location)
+        if merged == existing:
+            return "unchanged"
+        self._writable_view()[position] = merged
+        self.dirty = True
+        return "updated"
+
+    def upsert_many(self, locations: List[Dict[str, Any]]) -> Tuple[int, int]:
+        """Upsert several locations.
+
+        Returns:
+            (added, updated) counts
+        """
+        added = updated = 0
+        for location in locations:
+            outcome = self.upsert(location)
+            if outcome == "added":
+                added += 1
+            elif outcome == "updated":
+                updated += 1
+        return added, updated
+
+    def as_list(self) -> List[Dict[str, Any]]:
+        """Markers list for the UI, to be written to state (not modified afterwards)."""
+        self._shared = True
+        return self._view
+
+
+_stores = SessionTable("locations", factory=LocationStore, idle_ttl_seconds=3600)
+
+
+def _store_for(session_id: Optional[str], state: Any) -> LocationStore:
+    """Get the session's store, rebuilding it if state holds a markers list it did not publish."""
+    store = _stores.get(session_id) if session_id else LocationStore()
+    current = state.get(LOCATIONS_KEY) or []
+    version = state.get(LOCATIONS_VERSION_KEY)
+    if store.loaded and version != store.version and version in store.published:
+        # State holds an older list published from this store; the store is current
+        return store
+    if not store.loaded or store.version != version or store.state_length != len(current):
+        if session_id and store.loaded:
+            logger.info(f"[location_store] Rebuilding location index for session {session_id} from state")
+        store.load(current)
+        store.loaded = True
+        store.version = version
+        store.published.clear()
+        store.published.append(version)
+        store.state_length = len(current)
+    return store
+
+
+def _publish(state: Any, store: LocationStore) -> None:
+    """Write the store's list view and a new version token to state (or a state delta)."""
+    store.version = uuid.uuid4().hex[:12]
+    store.published.append(store.version)
+    state[LOCATIONS_KEY] = store.as_list()
+    state[LOCATIONS_VERSION_KEY] = store.version
+    store.state_length = len(store)
+    store.dirty = False
+
+
+def upsert_locations(
+    context: Any,
+    locations: List[Dict[str, Any]],
+    center: Optional[Dict[str, float]] = None
+) -> Tuple[int, int, int]:
+    """Add locations to the map, merging repeat finds into the existing markers.
+
+    Only the session's index is updated; publish_locations writes the list to
+    state (straight away when the context has no session).
+
+    Args:
+        context: ToolContext or CallbackContext of the session
+        locations: Location dicts with name, address, lat, lng, place_id, place_type
+        center: Optional map center {lat, lng}
+
+    Returns:
+        (added, updated, total) marker counts
+    """
+    from .state_tools import state_lock
+
+    session_id = session_id_of(context)
+    with state_lock:
+        store = _store_for(session_id, context.state)
+        added, updated = store.upsert_many(locations)
+        if session_id is None and (store.dirty or LOCATIONS_KEY not in context.state):
+            _publish(context.state, store)
+        if center:
+            context.state["center"] = center
+        return added, updated, len(store)
+
+
+def publish_locations(context: Any) -> bool:
+    """Write the session's markers to state if they changed since they were last written.
+
+    Args:
+        context: ToolContext or CallbackContext of the session
+
+    Returns:
+        True if the list was written
+    """
+    from .state_tools import state_lock
+
+    session_id = session_id_of(context)
+    if session_id is None or _stores.get(session_id, create=False) is None:
+        return False
+    with state_lock:
+        store = _store_for(session_id, context.state)
+        if not store.dirty and context.state.get(LOCATIONS_VERSION_KEY) == store.version:
+            return False
+        _publish(context.state, store)
+    logger.info(f"[publish_locations] ✅ MAP UPDATE: Published {len(store)} locations for session {session_id}")
+    return True
+
+
+def publish_locations_callback(callback_context: Any, llm_request: Any = None) -> None:
+    """before_model_callback that writes the markers found since the last model call to state."""
+    publish_locations(callback_context)
+    return None
+
+
+def replace_locations(context: Any, locations: List[Dict[str, Any]]) -> int:
+    """Replace all map markers (duplicates in locations are merged).
+
+    Returns:
+        Number of markers on the map
+    """
+    from .state_tools import state_lock
+
+    with state_lock:
+        store = _store_for(session_id_of(context), context.state)
+        store.load(locations)
+        _publish(context.state, store)
+        return len(store)
+
+
+def session_locations_delta(session: Any, locations: List[Dict[str, Any]]) -> Tuple[int, Dict[str, Any]]:
+    """Merge locations into a stored session's markers outside a tool call or callback.
+
+    Args:
+        session: Session as read from the session service
+        locations: Location dicts, as for upsert_locations
+
+    Returns:
+        (added count, state delta to append to the session; empty if nothing changed)
+    """
+    from .state_tools import state_lock
+
+    with state_lock:
+        store = _store_for(session.id, session.state)
+        added, _ = store.upsert_many(locations)
+        delta: Dict[str, Any] = {}
+        if store.dirty:
+            _publish(delta, store)
+        return added, delta
+
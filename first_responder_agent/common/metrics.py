@@ -0,0 +1,310 @@
+"""Prometheus metrics for the agent API server.
+
+Latencies are recorded from finished spans (see common/tracing.py) by a span
+processor, so the hot path only pays for a bisect and a counter increment
+under a lock. Model latency is the exception: ADK's call_llm span stays open
+while the tools and agent transfers of a response run, so Gemini models are
+resolved to TimedGemini, which times the model call itself. Cache counters and session gauges are read when /metrics is
+scraped. Rendering uses the Prometheus text exposition format directly; no
+client library is needed.
+"""
+
+import abc
+import bisect
+import logging
+import threading
+import time
+from typing import AsyncGenerator, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from google.adk.models.google_llm import Gemini
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.models.registry import LLMRegistry
+from opentelemetry.sdk.trace import ReadableSpan, SpanProcessor
+from opentelemetry.trace import StatusCode
+
+logger = logging.getLogger(__name__)
+
+# Latency buckets in seconds, from cache hits to slow model calls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value: str) -> str:
+    """Escape a label value for the text exposition format."""
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    """Format a label set, e.g. {tool="find_shelters",le="0.5"}."""
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    """Format a sample value."""
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric(abc.ABC):
+    """Base for labelled metrics."""
+
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._function: Optional[Callable[[], Iterable[Tuple[Tuple[str, ...], float]]]] = None
+
+    def set_function(self, function: Callable[[], Iterable[Tuple[Tuple[str, ...], float]]]) -> None:
+        """Read the values from function() at scrape time; it yields (labelvalues, value) pairs."""
+        self._function = function
+
+    def _current_values(self) -> List[Tuple[Tuple[str, ...], float]]:
+        """Values from the scrape-time function if set, otherwise the recorded ones."""
+        if self._function is not None:
+            try:
+                return list(self._function())
+            except Exception as e:
+                logger.warning(f"[_Metric] Could not read {self.name}: {str(e)}")
+                return []
+        with self._lock:
+            return list(self._values.items())
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+
+    @abc.abstractmethod
+    def samples(self) -> List[str]:
+        """Sample lines of the metric in the text exposition format."""
+
+
+class _ValueMetric(_Metric):
+    """Base for metrics with one value per label set (counters and gauges)."""
+
+    def inc(self, *labelvalues: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def samples(self) -> List[str]:
+        return [f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}" for labels, value in self._current_values()]
+
+
+class Counter(_ValueMetric):
+    """Monotonic counter per label set, incremented directly or read from a callback at scrape time."""
+
+    type_name = "counter"
+
+
+class Gauge(_ValueMetric):
+    """Gauge per label set, set directly or read from a callback at scrape time."""
+
+    type_name = "gauge"
+
+    def set(self, value: float, *labelvalues: str) -> None:
+        with self._lock:
+            self._values[labelvalues] = value
+
+    def dec(self, *labelvalues: str, amount: float = 1) -> None:
+        self.inc(*labelvalues, amount=-amount)
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram per label set."""
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labelvalues)
+            if entry is None:
+                entry = self._values[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = [(labels, (list(entry[0]), entry[1], entry[2])) for labels, entry in self._values.items()]
+        lines = []
+        for labels, (counts, total, count) in values:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+class Registry:
+    """Ordered collection of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.header())
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+TOOL_DURATION = REGISTRY.register(Histogram("a4i_tool_duration_seconds", "Tool call latency", ["tool"]))
+UPSTREAM_DURATION = REGISTRY.register(Histogram("a4i_upstream_duration_seconds", "Upstream call latency (HTTP host, Places, BigQuery)", ["upstream"]))
+AGENT_DURATION = REGISTRY.register(Histogram("a4i_agent_duration_seconds", "Agent run latency", ["agent"]))
+LLM_DURATION = REGISTRY.register(Histogram("a4i_llm_call_duration_seconds", "Model call latency", ["model"]))
+INVOCATION_DURATION = REGISTRY.register(Histogram("a4i_invocation_duration_seconds", "End-to-end workflow invocation latency"))
+ERRORS = REGISTRY.register(Counter("a4i_errors_total", "Failed spans by kind (tool, upstream, agent, llm) and name", ["kind", "name"]))
+TIMEOUTS = REGISTRY.register(Counter("a4i_timeouts_total", "Concurrent legs that missed their time budget", ["leg"]))
+CACHE_HITS = REGISTRY.register(Counter("a4i_cache_hits_total", "Cache hits by cache", ["cache"]))
+CACHE_MISSES = REGISTRY.register(Counter("a4i_cache_misses_total", "Cache misses by cache", ["cache"]))
+CONTEXT_COMPACTIONS = REGISTRY.register(Counter("a4i_context_compactions_total", "Conversation histories compacted into a summary"))
+ACTIVE_SESSIONS = REGISTRY.register(Gauge("a4i_active_sessions", "Sessions currently held by the server"))
+SESSIONS_IN_MEMORY = REGISTRY.register(Gauge("a4i_sessions_in_memory", "Sessions held in process memory (SESSION_STORE=memory)"))
+SESSION_MEMORY_BYTES = REGISTRY.register(Gauge("a4i_session_memory_bytes", "Estimated JSON bytes of the sessions held in process memory"))
+SESSION_EVICTIONS = REGISTRY.register(Counter("a4i_session_evictions_total", "Sessions evicted from memory over the byte budget, by outcome (spilled, dropped)", ["outcome"]))
+INFLIGHT_WORKFLOWS = REGISTRY.register(Gauge("a4i_inflight_workflows", "Workflow invocations and briefings currently running", ["kind"]))
+
+
+def _cache_samples(field: str) -> Iterable[Tuple[Tuple[str, ...], float]]:
+    """Per-cache samples ("hits" or "misses") for the cache counters."""
+    from .cache import all_cache_stats
+    from . import places_cache
+
+    samples = {stats["name"]: stats[field] for stats in all_cache_stats()}
+    # The Places cache counts its own lookups
+    samples["places"] = places_cache.stats()[field]
+    return [((name,), value) for name, value in samples.items()]
+
+
+CACHE_HITS.set_function(lambda: _cache_samples("hits"))
+CACHE_MISSES.set_function(lambda: _cache_samples("misses"))
+
+
+def _tool_name(span: ReadableSpan) -> Optional[str]:
+    """Tool name for ADK tool spans and @traced tool spans (each call counted once)."""
+    from .tracing import traced_tool_names
+
+    if span.name.startswith("execute_tool "):
+        name = span.name[len("execute_tool "):]
+        # Tools wrapped with @traced are counted from their own span
+        return None if name in traced_tool_names else name
+    if span.name.startswith("tool "):
+        return span.name[len("tool "):]
+    return None
+
+
+class MetricsSpanProcessor(SpanProcessor):
+    """Records span durations and failures into the Prometheus metrics."""
+
+    def on_start(self, span, parent_context=None) -> None:
+        if span.name == "invocation":
+            INFLIGHT_WORKFLOWS.inc("invocation")
+
+    def on_end(self, span: ReadableSpan) -> None:
+        if span.end_time is None or span.start_time is None:
+            return
+        seconds = (span.end_time - span.start_time) / 1e9
+        failed = span.status.status_code == StatusCode.ERROR
+        attributes = span.attributes or {}
+        name = span.name
+
+        if name == "invocation":
+            INFLIGHT_WORKFLOWS.dec("invocation")
+            INVOCATION_DURATION.observe(seconds)
+            return
+        if name.startswith("invoke_agent "):
+            kind, label, histogram = "agent", name[len("invoke_agent "):], AGENT_DURATION
+        elif attributes.get("a4i.kind") == "upstream":
+            kind, label, histogram = "upstream", str(attributes.get("server.address") or name.split(" ")[0]), UPSTREAM_DURATION
+        else:
+            tool = _tool_name(span)
+            if tool is None:
+                return
+            kind, label, histogram = "tool", tool, TOOL_DURATION
+            failed = failed or attributes.get("a4i.status") == "error"
+
+        histogram.observe(seconds, label)
+        if failed:
+            ERRORS.inc(kind, label)
+
+    def shutdown(self) -> None:
+        pass
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return True
+
+
+class TimedGemini(Gemini):
+    """Gemini model that records the latency of each model call in a4i_llm_call_duration_seconds.
+
+    Only the time spent awaiting the model's responses is counted, not what the
+    caller does between them (running a response's tools, streaming partials).
+    """
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        responses = super().generate_content_async(llm_request, stream)
+        seconds = 0.0
+        failed = False
+        try:
+            while True:
+                started = time.perf_counter()
+                try:
+                    response = await responses.__anext__()
+                except StopAsyncIteration:
+                    break
+                except Exception:
+                    failed = True
+                    raise
+                finally:
+                    seconds += time.perf_counter() - started
+                yield response
+        finally:
+            await responses.aclose()
+            LLM_DURATION.observe(seconds, self.model)
+            if failed:
+                ERRORS.inc("llm", self.model)
+
+
+_setup_done = False
+
+
+def setup_metrics() -> None:
+    """Start recording span metrics. Call once at startup."""
+    global _setup_done
+    from .tracing import add_span_processor
+
+    if _setup_done:
+        return
+    add_span_processor(MetricsSpanProcessor())
+    # Model names ADK resolves to Gemini now resolve to TimedGemini
+    LLMRegistry.register(TimedGemini)
+    LLMRegistry.resolve.cache_clear()
+    _setup_done = True
+
+
+def render_metrics() -> str:
+    """Current metrics in the Prometheus text format."""
+    return REGISTRY.render()
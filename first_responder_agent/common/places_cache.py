@@ -0,0 +1,200 @@
+"""Spatially snapped cache for Google Places nearby searches.
+
+Searches are keyed by the exact query: the point snapped to a ~110 m grid,
+the Places type and the radius. A miss issues that query once, from the
+snapped point, and later queries snapping to the same key are served its
+response unchanged. Results are never reused across radii or from a wider
+search: Places returns at most 20 results per page ranked by prominence, so
+a wider circle's first page is not the first page of a smaller one.
+
+A cached search keeps its next_page_token only while the token is still
+usable (PAGE_TOKEN_TTL_SECONDS); later hits get the first page without it.
+"""
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Tuple
+from .cache import TTLCache, MISSING
+from .geocoding import distance_meters
+
+logger = logging.getLogger(__name__)
+
+# Coordinates are rounded to this many decimals before searching (~110 m of latitude)
+SNAP_PRECISION = 3
+
+# Larger searches bypass the cache (the Places API maximum is 50 km)
+MAX_CACHED_RADIUS_METERS = 20000
+
+# Places page tokens expire shortly after they are issued; cached ones are only handed out for this long
+PAGE_TOKEN_TTL_SECONDS = 60
+
+DEFAULT_CACHE_TTL_SECONDS = 900.0
+DEFAULT_CACHE_MAX_ENTRIES = 2048
+
+
+def get_cache_ttl() -> float:
+    """Get the Places cache TTL in seconds from PLACES_CACHE_TTL_SECONDS."""
+    value = os.getenv("PLACES_CACHE_TTL_SECONDS")
+    if not value:
+        return DEFAULT_CACHE_TTL_SECONDS
+    try:
+        return float(value)
+    except ValueError:
+        logger.warning(f"[get_cache_ttl] Invalid PLACES_CACHE_TTL_SECONDS={value}, using {DEFAULT_CACHE_TTL_SECONDS}")
+        return DEFAULT_CACHE_TTL_SECONDS
+
+
+def get_cache_max_entries() -> int:
+    """Get the Places cache size bound from PLACES_CACHE_MAX_ENTRIES."""
+    value = os.getenv("PLACES_CACHE_MAX_ENTRIES")
+    if not value:
+        return DEFAULT_CACHE_MAX_ENTRIES
+    try:
+        return int(value)
+    except ValueError:
+        logger.warning(f"[get_cache_max_entries] Invalid PLACES_CACHE_MAX_ENTRIES={value}, using {DEFAULT_CACHE_MAX_ENTRIES}")
+        return DEFAULT_CACHE_MAX_ENTRIES
+
+
+_cache = TTLCache("places", ttl_seconds=get_cache_ttl(), max_entries=get_cache_max_entries())
+# Follow-up pages keyed by next_page_token, so sessions sharing a cached search share its pages
+_page_cache = TTLCache("places_pages", ttl_seconds=PAGE_TOKEN_TTL_SECONDS, max_entries=512)
+_metrics: Dict[str, Dict[str, int]] = {}
+_inflight: Dict[Tuple, Future] = {}
+_lock = threading.Lock()
+
+
+def places_cache_enabled() -> bool:
+    """Whether the Places cache is enabled (PLACES_CACHE_ENABLED, default true)."""
+    return os.getenv("PLACES_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+
+
+def snap_point(latitude: float, longitude: float) -> Tuple[float, float]:
+    """Grid point a coordinate is searched from."""
+    return (round(latitude, SNAP_PRECISION), round(longitude, SNAP_PRECISION))
+
+
+def _record(search_type: str, outcome: str) -> None:
+    """Count a lookup outcome ("hits" or "misses") for a Places type."""
+    with _lock:
+        counters = _metrics.setdefault(search_type, {"hits": 0, "misses": 0})
+        counters[outcome] += 1
+
+
+def within_radius(places: List[Dict[str, Any]], latitude: float, longitude: float, radius: float) -> List[Dict[str, Any]]:
+    """Places that fall within radius of a point, in original order."""
+    results = []
+    for place in places:
+        location = place.get("geometry", {}).get("location", {})
+        if "lat" not in location or "lng" not in location:
+            continue
+        if distance_meters(latitude, longitude, location["lat"], location["lng"]) <= radius:
+            results.append(place)
+    return results
+
+
+def _response(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """Places API style response for a query served from a cached search."""
+    response = {"status": entry["status"], "results": list(entry["results"])}
+    if entry.get("next_page_token") and time.monotonic() - entry["fetched_at"] < PAGE_TOKEN_TTL_SECONDS:
+        response["next_page_token"] = entry["next_page_token"]
+    return response
+
+
+def cached_places_nearby(
+    latitude: float,
+    longitude: float,
+    search_type: str,
+    radius: float,
+    fetch: Callable[[float, float, str, int], Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Serve a Places nearby search from the cache, fetching it from the snapped point on a miss.
+
+    Concurrent misses for the same query share one in-flight request.
+
+    Args:
+        latitude: Latitude coordinate
+        longitude: Longitude coordinate
+        search_type: Google Places API type (e.g., "lodging", "hospital")
+        radius: Search radius in meters
+        fetch: Uncached search, called as fetch(latitude, longitude, search_type, radius)
+
+    Returns:
+        Places API response dict for the search from the snapped point (with
+        its next_page_token only while the token is still usable)
+    """
+    if radius > MAX_CACHED_RADIUS_METERS or not places_cache_enabled():
+        return fetch(latitude, longitude, search_type, radius)
+
+    point = snap_point(latitude, longitude)
+    key = (point, search_type, int(radius))
+    entry = _cache.get(key)
+    if entry is not MISSING:
+        _record(search_type, "hits")
+        logger.info(f"[cached_places_nearby] Cache hit for {search_type} near ({latitude}, {longitude})")
+        return _response(entry)
+
+    _record(search_type, "misses")
+    with _lock:
+        future = _inflight.get(key)
+        owner = future is None
+        if owner:
+            future = Future()
+            _inflight[key] = future
+
+    if owner:
+        try:
+            response = fetch(point[0], point[1], search_type, int(radius))
+            entry = {
+                "status": response.get("status", "OK"),
+                "results": response.get("results", []),
+                "next_page_token": response.get("next_page_token"),
+                "fetched_at": time.monotonic()
+            }
+            if entry["status"] in ("OK", "ZERO_RESULTS"):
+                _cache.set(key, entry)
+            future.set_result(entry)
+        except Exception as e:
+            future.set_exception(e)
+        finally:
+            with _lock:
+                _inflight.pop(key, None)
+
+    entry = future.result()
+    return _response(entry)
+
+
+def cached_places_page(page_token: str, fetch: Callable[[str], Dict[str, Any]]) -> Dict[str, Any]:
+    """Serve a follow-up Places page by token, fetching it once on a miss.
+
+    Args:
+        page_token: next_page_token of an earlier response
+        fetch: Uncached page request, called as fetch(page_token)
+    """
+    if not places_cache_enabled():
+        return fetch(page_token)
+    return _page_cache.get_or_compute(
+        page_token,
+        lambda: fetch(page_token),
+        cache_if=lambda response: response.get("status", "OK") in ("OK", "ZERO_RESULTS")
+    )
+
+
+def stats() -> Dict[str, Any]:
+    """Cache size/eviction counters and per-type hit and miss counts."""
+    with _lock:
+        by_type = {search_type: dict(counters) for search_type, counters in _metrics.items()}
+    totals = {
+        outcome: sum(counters[outcome] for counters in by_type.values())
+        for outcome in ("hits", "misses")
+    }
+    return {**_cache.stats(), **totals, "by_type": by_type}
+
+
+def clear() -> None:
+    """Drop all cached searches and pages (metrics are kept)."""
+    _cache.clear()
+    _page_cache.clear()
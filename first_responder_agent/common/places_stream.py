@@ -0,0 +1,188 @@
+"""Background pagination of Google Places results onto the map.
+
+A nearby search returns up to 20 places per page and a next_page_token for
+up to two more pages. In streaming mode, search_nearby_places puts the first
+page on the map immediately and follows the remaining pages in the
+background. Each page is merged into the session's map locations
+(deduplicated by place_id) as soon as it lands, with a state-delta event
+appended through the session service on the event loop the search ran on.
+So a page is persisted and part of the next state snapshot even when it
+lands after the run's last callback or the session has gone idle.
+"""
+
+import asyncio
+import contextvars
+import logging
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, NamedTuple, Optional, Set
+from google.adk.events import Event, EventActions
+from .places_cache import within_radius
+
+logger = logging.getLogger(__name__)
+
+# A next_page_token becomes valid a short time after it is issued
+PAGE_TOKEN_DELAY_SECONDS = 2.0
+
+# The Places API returns at most 3 pages per search
+MAX_PAGES = 3
+
+# Longest wait for a page's state-delta event to be appended
+PAGE_WRITE_TIMEOUT_SECONDS = 10.0
+
+# Author of the state-delta events carrying streamed pages
+STREAM_EVENT_AUTHOR = "places_stream"
+
+DEFAULT_STREAM_MAX_RESULTS = 60
+
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="a4i-places-stream")
+
+
+class SessionTarget(NamedTuple):
+    """Session a stream writes its pages to, and the event loop its session service runs on."""
+    loop: asyncio.AbstractEventLoop
+    session_service: Any
+    app_name: str
+    user_id: str
+    session_id: str
+
+
+def streaming_enabled() -> bool:
+    """Whether Places pages are streamed to the map (PLACES_STREAM_PAGES, default false)."""
+    return os.getenv("PLACES_STREAM_PAGES", "false").lower() in ("1", "true", "yes")
+
+
+def get_stream_max_results() -> int:
+    """Maximum places streamed to the map per search (PLACES_STREAM_MAX_RESULTS, default 60, at least 1)."""
+    value = os.getenv("PLACES_STREAM_MAX_RESULTS")
+    if not value:
+        return DEFAULT_STREAM_MAX_RESULTS
+    try:
+        return max(int(value), 1)
+    except ValueError:
+        logger.warning(f"[get_stream_max_results] Invalid PLACES_STREAM_MAX_RESULTS={value}, using {DEFAULT_STREAM_MAX_RESULTS}")
+        return DEFAULT_STREAM_MAX_RESULTS
+
+
+def _session_target(context: Any) -> Optional[SessionTarget]:
+    """Where a tool call's streamed pages are written, or None outside an ADK invocation's event loop."""
+    invocation = getattr(context, "_invocation_context", None)
+    session = getattr(context, "session", None)
+    if invocation is None or session is None:
+        return None
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+    return SessionTarget(loop, invocation.session_service, session.app_name, session.user_id, session.id)
+
+
+def stream_remaining_pages(
+    context: Any,
+    next_page_token: Optional[str],
+    latitude: float,
+    longitude: float,
+    place_type: str,
+    radius: int,
+    seen_place_ids: Set[str],
+    remaining: int
+) -> bool:
+    """Follow next_page_token in the background, adding each page to the session's map as it lands.
+
+    Call from the tool's thread (the invocation's event loop).
+
+    Args:
+        context: ToolContext of the search (its session receives the pages)
+        next_page_token: Token from the first page, or None
+        latitude: Latitude of the search
+        longitude: Longitude of the search
+        place_type: Place type as requested by the agent (e.g., "shelter")
+        radius: Search radius in meters; places outside it are dropped
+        seen_place_ids: Place ids already on the map from the first page
+        remaining: Number of additional places allowed
+
+    Returns:
+        True if a background stream was started
+    """
+    if not next_page_token or remaining <= 0:
+        return False
+    target = _session_target(context)
+    if target is None:
+        return False
+    _executor.submit(
+        contextvars.copy_context().run, _follow_pages, target, next_page_token, latitude, longitude,
+        place_type, radius, set(seen_place_ids), remaining
+    )
+    logger.info(f"[stream_remaining_pages] Streaming up to {remaining} more {place_type} places for session {target.session_id}")
+    return True
+
+
+def _follow_pages(
+    target: SessionTarget,
+    page_token: str,
+    latitude: float,
+    longitude: float,
+    place_type: str,
+    radius: int,
+    seen_place_ids: Set[str],
+    remaining: int
+) -> None:
+    """Fetch pages until the token runs out, the page limit is hit or enough places were added."""
+    from .search_places_tool import places_page, place_to_location
+
+    pages = 1
+    while page_token and pages < MAX_PAGES and remaining > 0:
+        time.sleep(PAGE_TOKEN_DELAY_SECONDS)
+        try:
+            response = places_page(page_token)
+        except Exception as e:
+            logger.warning(f"[_follow_pages] Stopping {place_type} stream after page {pages}: {str(e)}")
+            return
+        pages += 1
+
+        new_locations = []
+        for place in within_radius(response.get("results", []), latitude, longitude, radius):
+            location = place_to_location(place, place_type)
+            if location["place_id"] and location["place_id"] in seen_place_ids:
+                continue
+            seen_place_ids.add(location["place_id"])
+            new_locations.append(location)
+            if len(new_locations) >= remaining:
+                break
+
+        if new_locations:
+            try:
+                added = asyncio.run_coroutine_threadsafe(
+                    _append_page(target, new_locations), target.loop
+                ).result(timeout=PAGE_WRITE_TIMEOUT_SECONDS)
+            except Exception as e:
+                logger.warning(f"[_follow_pages] Stopping {place_type} stream, writing page {pages} failed: {str(e)}")
+                return
+            remaining -= len(new_locations)
+            logger.info(f"[_follow_pages] ✅ MAP UPDATE: Added {added} {place_type} locations from page {pages} for session {target.session_id}")
+        page_token = response.get("next_page_token")
+
+
+async def _append_page(target: SessionTarget, locations: List[Dict[str, Any]]) -> int:
+    """Merge a page into the stored session's markers with a state-delta event (on the session service's loop).
+
+    Returns:
+        Number of locations added to the map
+    """
+    from .location_store import session_locations_delta
+
+    session = await target.session_service.get_session(
+        app_name=target.app_name, user_id=target.user_id, session_id=target.session_id
+    )
+    if session is None:
+        return 0
+    added, delta = session_locations_delta(session, locations)
+    if delta:
+        await target.session_service.append_event(session, Event(
+            invocation_id=f"places_stream_{uuid.uuid4().hex[:12]}",
+            author=STREAM_EVENT_AUTHOR,
+            actions=EventActions(state_delta=delta)
+        ))
+    return added
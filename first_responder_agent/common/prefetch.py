@@ -0,0 +1,133 @@
+"""Speculative prefetch of downstream data as soon as coordinates are known.
+
+Once geocode_location resolves a location, the NOAA point, FEMA state, Places
+searches and BigQuery lookups that follow are predictable. They are started
+in the background and kept as futures in a session-scoped table; the tools
+then claim the warm future instead of issuing a new call, so model "thinking"
+time overlaps with I/O.
+"""
+
+import contextvars
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+from .concurrency import get_leg_timeout
+from .session_scope import SessionTable, session_id_of
+
+logger = logging.getLogger(__name__)
+
+# Prefetched results are reused for this long before a tool issues a fresh call
+PREFETCH_TTL_SECONDS = 120
+
+# Coordinates in keys are rounded so the model re-typing them still matches (~11m)
+KEY_PRECISION = 4
+
+_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="a4i-prefetch")
+_tables = SessionTable("prefetch", factory=dict, idle_ttl_seconds=600)
+_lock = threading.Lock()
+
+
+def prefetch_enabled() -> bool:
+    """Whether speculative prefetch is enabled (PREFETCH_ENABLED, default true)."""
+    return os.getenv("PREFETCH_ENABLED", "true").lower() in ("1", "true", "yes")
+
+
+def prefetch_key(kind: str, *args: Any) -> Tuple:
+    """Build a prefetch key, rounding float arguments so equivalent calls match."""
+    return (kind,) + tuple(round(arg, KEY_PRECISION) if isinstance(arg, float) else arg for arg in args)
+
+
+def schedule(session_id: str, key: Hashable, fn: Callable[..., Any], *args: Any) -> Optional[Future]:
+    """Start fn(*args) in the background for a session unless a fresh future already exists."""
+    table = _tables.get(session_id)
+    with _lock:
+        entry = table.get(key)
+        if entry and time.monotonic() - entry[0] < PREFETCH_TTL_SECONDS:
+            return entry[1]
+        future = _executor.submit(contextvars.copy_context().run, fn, *args)
+        table[key] = (time.monotonic(), future)
+    logger.info(f"[prefetch.schedule] Prefetching {key} for session {session_id}")
+    return future
+
+
+def fetch(context: Any, key: Hashable, fn: Callable[..., Any], *args: Any) -> Any:
+    """Return the prefetched result for key if one is warm, otherwise call fn(*args).
+
+    A prefetch still running is waited on for at most the leg timeout, the
+    same budget as the live call it replaces; past that fn(*args) is called.
+
+    Args:
+        context: ToolContext (or any object with a session) used to find the session table
+        key: Prefetch key, see prefetch_key()
+        fn: Fetch function to call on a miss
+        *args: Arguments for fn
+
+    Returns:
+        The result of fn(*args), possibly computed ahead of time
+    """
+    session_id = session_id_of(context)
+    if session_id is None:
+        return fn(*args)
+
+    table = _tables.get(session_id, create=False)
+    entry = None
+    if table is not None:
+        with _lock:
+            entry = table.get(key)
+    if entry is None or time.monotonic() - entry[0] >= PREFETCH_TTL_SECONDS:
+        return fn(*args)
+
+    try:
+        result = entry[1].result(timeout=get_leg_timeout())
+        logger.info(f"[prefetch.fetch] Served {key} from prefetch for session {session_id}")
+        return result
+    except FutureTimeoutError:
+        logger.warning(f"[prefetch.fetch] Prefetch of {key} still running after {get_leg_timeout()}s, fetching directly")
+        return fn(*args)
+    except Exception as e:
+        logger.warning(f"[prefetch.fetch] Prefetch of {key} failed ({str(e)}), fetching directly")
+        return fn(*args)
+
+
+def prefetch_for_location(context: Any, latitude: float, longitude: float, state_code: Optional[str] = None) -> None:
+    """Start the fetches that follow a resolved location in the background.
+
+    Covers NOAA point alerts, FEMA state disasters, BigQuery storms and shelters,
+    and the Places searches made by the relief finder tools with default arguments.
+
+    Args:
+        context: ToolContext of the geocode call (its session scopes the prefetch)
+        latitude: Latitude coordinate
+        longitude: Longitude coordinate
+        state_code: Optional two-letter state code
+    """
+    from .bigquery_tools import query_storm_rows, query_shelter_rows
+    from .search_places_tool import places_nearby, PLACE_TYPE_MAPPING
+    from ..disaster_discovery_agent.live_discovery_tool import fetch_fema_disasters, fetch_point_alerts
+
+    session_id = session_id_of(context)
+    if session_id is None or not prefetch_enabled():
+        return
+
+    try:
+        jobs: Dict[Tuple, Tuple[Callable[..., Any], tuple]] = {
+            prefetch_key("noaa_alerts", latitude, longitude): (fetch_point_alerts, (latitude, longitude)),
+            prefetch_key("bq_storms", latitude, longitude, 25.0): (query_storm_rows, (latitude, longitude, 25.0)),
+            prefetch_key("bq_shelters", latitude, longitude, 1, None): (query_shelter_rows, (latitude, longitude, 1, None)),
+        }
+        if state_code:
+            jobs[prefetch_key("fema_disasters", state_code)] = (fetch_fema_disasters, (state_code,))
+        for place_type in ("shelter", "hospital", "pharmacy"):
+            search_type = PLACE_TYPE_MAPPING[place_type]
+            jobs[prefetch_key("places", latitude, longitude, search_type, 5000)] = (
+                places_nearby, (latitude, longitude, search_type, 5000)
+            )
+
+        for key, (fn, args) in jobs.items():
+            schedule(session_id, key, fn, *args)
+        logger.info(f"[prefetch_for_location] Started {len(jobs)} prefetches for ({latitude}, {longitude})")
+    except Exception as e:
+        logger.error(f"[prefetch_for_location] Error scheduling prefetch: {str(e)}", exc_info=True)
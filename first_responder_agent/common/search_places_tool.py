@@ -3,27 +3,240 @@
 import logging
 import os
 import googlemaps
-from typing import Dict, Any
+import requests
+from typing import Dict, Any, List, Optional, Tuple
 from google.adk.tools import ToolContext
+from . import prefetch
+from . import places_stream
+from .cassette import attach_cassettes, replay_maps_api_key
+from .concurrency import run_legs
+from .places_cache import cached_places_nearby, cached_places_page
+from .session_scope import session_id_of
+from .location_store import upsert_locations
+from .tracing import traced
 
 logger = logging.getLogger(__name__)
 
 # Initialize Google Maps client
 gmaps_client = None
 
+# Map place types to Google Places API types
+PLACE_TYPE_MAPPING = {
+    "hospital": "hospital",
+    "shelter": "lodging",
+    "emergency": "hospital",
+    "medical": "hospital",
+    "police": "police",
+    "fire_station": "fire_station",
+    "pharmacy": "pharmacy",
+    "food": "restaurant",
+    "supplies": "store"
+}
+
 
 def get_gmaps_client():
     """Get or create Google Maps client."""
     global gmaps_client
     if gmaps_client is None:
-        api_key = os.getenv("GOOGLE_MAPS_API_KEY")
+        api_key = os.getenv("GOOGLE_MAPS_API_KEY") or replay_maps_api_key()
         if not api_key:
             logger.warning("[get_gmaps_client] GOOGLE_MAPS_API_KEY not set")
             return None
-        gmaps_client = googlemaps.Client(key=api_key)
+        # GOOGLE_MAPS_BASE_URL points Places at another host (e.g. a local fixture server)
+        base_url = os.getenv("GOOGLE_MAPS_BASE_URL")
+        options = {"base_url": base_url.rstrip("/")} if base_url else {}
+        gmaps_client = googlemaps.Client(key=api_key, requests_session=attach_cassettes(requests.Session()), **options)
     return gmaps_client
 
 
+def places_nearby(latitude: float, longitude: float, search_type: str, radius: int) -> Dict[str, Any]:
+    """Run a Google Places nearby search, served from the shared Places cache when possible.
+
+    Args:
+        latitude: Latitude coordinate
+        longitude: Longitude coordinate
+        search_type: Google Places API type (e.g., "lodging", "hospital")
+        radius: Search radius in meters
+
+    Raises:
+        ValueError: If the Google Maps API key is not configured
+    """
+    return cached_places_nearby(latitude, longitude, search_type, radius, _fetch_places_nearby)
+
+
+@traced("places nearby", "search_type", "radius", kind="upstream")
+def _fetch_places_nearby(latitude: float, longitude: float, search_type: str, radius: int) -> Dict[str, Any]:
+    """Uncached Google Places nearby search returning the raw API response.
+
+    Args:
+        latitude: Latitude coordinate
+        longitude: Longitude coordinate
+        search_type: Google Places API type (e.g., "lodging", "hospital")
+        radius: Search radius in meters
+
+    Raises:
+        ValueError: If the Google Maps API key is not configured
+    """
+    gmaps = get_gmaps_client()
+    if not gmaps:
+        raise ValueError("Google Maps API key not configured")
+    return gmaps.places_nearby(
+        location={"lat": latitude, "lng": longitude},
+        radius=radius,
+        type=search_type
+    )
+
+
+def places_page(page_token: str) -> Dict[str, Any]:
+    """Fetch a follow-up page of a Places nearby search by its next_page_token.
+
+    Raises:
+        ValueError: If the Google Maps API key is not configured
+    """
+    return cached_places_page(page_token, _fetch_places_page)
+
+
+@traced("places page", kind="upstream")
+def _fetch_places_page(page_token: str) -> Dict[str, Any]:
+    """Uncached request for a follow-up Places page (see places_page)."""
+    gmaps = get_gmaps_client()
+    if not gmaps:
+        raise ValueError("Google Maps API key not configured")
+    return gmaps.places_nearby(page_token=page_token)
+
+
+def place_to_location(place: Dict[str, Any], place_type: str) -> Dict[str, Any]:
+    """Convert a Places API result into a map location."""
+    return {
+        "name": place.get('name', 'Unknown'),
+        "address": place.get('vicinity', 'Address not available'),
+        "lat": place['geometry']['location']['lat'],
+        "lng": place['geometry']['location']['lng'],
+        "place_id": place.get('place_id', ''),
+        "place_type": place_type,
+        "rating": place.get('rating', 'N/A'),
+        "is_open": place.get('opening_hours', {}).get('open_now', None)
+    }
+
+
+def _search_locations(
+    tool_context: ToolContext,
+    latitude: float,
+    longitude: float,
+    search_type: str,
+    place_type: str,
+    radius: int,
+    max_results: int
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Run one Places search and convert the first page to map locations.
+
+    Returns:
+        (locations, next_page_token)
+    """
+    # Search for nearby places (served from a warm prefetch when available)
+    places_result = prefetch.fetch(
+        tool_context,
+        prefetch.prefetch_key("places", latitude, longitude, search_type, radius),
+        places_nearby, latitude, longitude, search_type, radius
+    )
+    locations = [place_to_location(place, place_type) for place in places_result.get('results', [])[:max_results]]
+    return locations, places_result.get('next_page_token')
+
+
+def _add_to_map(tool_context: ToolContext, latitude: float, longitude: float, locations: List[Dict[str, Any]]) -> Tuple[int, int, int]:
+    """Upsert locations into the map state and center it on the search point.
+
+    Returns:
+        (added, updated, total) marker counts
+    """
+    return upsert_locations(tool_context, locations, center={"lat": latitude, "lng": longitude})
+
+
+def _result_limit(tool_context: ToolContext) -> Tuple[bool, int]:
+    """Whether to stream later pages for this call, and how many places go on the map per search."""
+    # In streaming mode the whole first page goes on the map and later pages follow in the background
+    streaming = places_stream.streaming_enabled() and session_id_of(tool_context) is not None
+    return streaming, places_stream.get_stream_max_results() if streaming else 10  # Limit to 10 results
+
+
+def fetch_nearby_places(
+    tool_context: ToolContext,
+    latitude: float,
+    longitude: float,
+    place_type: str,
+    radius: int = 5000
+) -> Dict[str, Any]:
+    """Run the Places search behind search_nearby_places without writing session state.
+
+    Safe to run as a leg (see common/concurrency.py); publish_nearby_places
+    puts the result on the map from the calling thread.
+
+    Returns:
+        Dict with the place type, map locations, next_page_token and the streaming settings used
+
+    Raises:
+        ValueError: If the Google Maps API key is not configured
+    """
+    search_type = PLACE_TYPE_MAPPING.get(place_type.lower(), "hospital")
+    logger.info(f"[fetch_nearby_places] 🗺️  Mapped {place_type} -> {search_type} for Google Places API")
+
+    streaming, max_results = _result_limit(tool_context)
+    locations, next_page_token = _search_locations(
+        tool_context, latitude, longitude, search_type, place_type, radius, max_results
+    )
+    logger.info(f"[fetch_nearby_places] 📍 Found {len(locations)} {place_type} locations from Google Maps API")
+    return {
+        "place_type": place_type,
+        "locations": locations,
+        "next_page_token": next_page_token,
+        "streaming": streaming,
+        "max_results": max_results
+    }
+
+
+def publish_nearby_places(
+    tool_context: ToolContext,
+    search: Dict[str, Any],
+    latitude: float,
+    longitude: float,
+    radius: int = 5000
+) -> Dict[str, Any]:
+    """Put a fetch_nearby_places result on the map and stream its later pages (calling thread only).
+
+    Returns:
+        Dict with search results, as returned by search_nearby_places
+    """
+    place_type = search["place_type"]
+    locations = search["locations"]
+
+    added, updated, total = _add_to_map(tool_context, latitude, longitude, locations)
+
+    logger.info(f"[publish_nearby_places] ✅ MAP UPDATE for {place_type}: Added {added}, merged {updated} of {len(locations)} locations (on map: {total})")
+
+    more_streaming = search["streaming"] and places_stream.stream_remaining_pages(
+        tool_context,
+        search["next_page_token"],
+        latitude,
+        longitude,
+        place_type,
+        radius,
+        {location["place_id"] for location in locations},
+        search["max_results"] - len(locations)
+    )
+
+    result = {
+        "status": "success",
+        "message": f"Found {len(locations)} {place_type}(s)",
+        "locations": locations[:10],
+        "total_on_map": total
+    }
+    if more_streaming:
+        result["more_results_streaming"] = True
+        result["message"] += "; more are being added to the map in the background"
+    return result
+
+
+@traced("tool search_nearby_places", "place_type", "radius")
 def search_nearby_places(
     tool_context: ToolContext,
     latitude: float,
@@ -55,84 +268,137 @@ def search_nearby_places(
         gmaps = get_gmaps_client()
         if not gmaps:
             logger.error(f"[search_nearby_places] ❌ Google Maps API key not configured for {place_type}")
+            update_agent_activity(tool_context.state, "maps_search_tool", "completed")
             return {
                 "status": "error",
                 "message": "Google Maps API key not configured"
             }
 
-        # Map place types to Google Places API types
-        type_mapping = {
-            "hospital": "hospital",
-            "shelter": "lodging",
-            "emergency": "hospital",
-            "medical": "hospital",
-            "police": "police",
-            "fire_station": "fire_station",
-            "pharmacy": "pharmacy",
-            "food": "restaurant",
-            "supplies": "store"
+        search = fetch_nearby_places(tool_context, latitude, longitude, place_type, radius)
+        result = publish_nearby_places(tool_context, search, latitude, longitude, radius)
+
+        # Mark as completed
+        update_agent_activity(tool_context.state, "maps_search_tool", "completed")
+        return result
+
+    except Exception as e:
+        logger.error(f"[search_nearby_places] Error: {str(e)}")
+
+        # Mark as completed even on error
+        update_agent_activity(tool_context.state, "maps_search_tool", "completed")
+
+        return {
+            "status": "error",
+            "message": f"Error searching places: {str(e)}"
         }
 
-        search_type = type_mapping.get(place_type.lower(), "hospital")
-        logger.info(f"[search_nearby_places] 🗺️  Mapped {place_type} -> {search_type} for Google Places API")
-
-        # Search for nearby places
-        places_result = gmaps.places_nearby(
-            location={"lat": latitude, "lng": longitude},
-            radius=radius,
-            type=search_type
-        )
-
-        locations = []
-        for place in places_result.get('results', [])[:10]:  # Limit to 10 results
-            location_data = {
-                "name": place.get('name', 'Unknown'),
-                "address": place.get('vicinity', 'Address not available'),
-                "lat": place['geometry']['location']['lat'],
-                "lng": place['geometry']['location']['lng'],
-                "place_id": place.get('place_id', ''),
-                "place_type": place_type,
-                "rating": place.get('rating', 'N/A'),
-                "is_open": place.get('opening_hours', {}).get('open_now', None)
-            }
-            locations.append(location_data)
 
-        logger.info(f"[search_nearby_places] 📍 Found {len(locations)} {place_type} locations from Google Maps API")
+@traced("tool search_nearby_places_multi", "radius")
+def search_nearby_places_multi(
+    tool_context: ToolContext,
+    latitude: float,
+    longitude: float,
+    types: List[str],
+    radius: int = 5000
+) -> Dict[str, Any]:
+    """
+    Search for several place types at once and automatically update the map state.
+
+    Types that map to the same Google Places type (e.g., hospital, emergency and
+    medical) share one search, and the distinct searches run concurrently.
+
+    Args:
+        tool_context: The tool context containing state
+        latitude: Latitude coordinate
+        longitude: Longitude coordinate
+        types: Types of place (hospital, shelter, pharmacy, police, etc.)
+        radius: Search radius in meters (default: 5000)
+
+    Returns:
+        Dict with search results grouped by requested type
+    """
+    from .state_tools import update_agent_activity
 
-        # Update map state automatically - APPEND, don't overwrite
-        if "locations" not in tool_context.state:
-            tool_context.state["locations"] = []
-            logger.info(f"[search_nearby_places] 🆕 Initialized locations array in state")
+    try:
+        requested = list(dict.fromkeys(place_type.lower() for place_type in types))
+        logger.info(f"[search_nearby_places_multi] 🔍 CALLED by agent - Searching for {requested} near ({latitude}, {longitude})")
 
-        # Get current count before appending
-        before_count = len(tool_context.state["locations"])
+        # Update agent activity
+        update_agent_activity(tool_context.state, "maps_search_tool", "running")
 
-        # Append new locations to existing ones (NOT overwriting)
-        existing_locations = tool_context.state["locations"]
-        tool_context.state["locations"] = existing_locations + locations
+        gmaps = get_gmaps_client()
+        if not gmaps:
+            logger.error(f"[search_nearby_places_multi] ❌ Google Maps API key not configured for {requested}")
+            update_agent_activity(tool_context.state, "maps_search_tool", "completed")
+            return {
+                "status": "error",
+                "message": "Google Maps API key not configured"
+            }
 
-        after_count = len(tool_context.state["locations"])
+        # Collapse requested types onto distinct Google Places types
+        groups: Dict[str, List[str]] = {}
+        for place_type in requested:
+            groups.setdefault(PLACE_TYPE_MAPPING.get(place_type, "hospital"), []).append(place_type)
+        logger.info(f"[search_nearby_places_multi] 🗺️  Running {len(groups)} Google Places searches for {len(requested)} types: {groups}")
 
-        # Update center
-        tool_context.state["center"] = {
-            "lat": latitude,
-            "lng": longitude
+        streaming, max_results = _result_limit(tool_context)
+        legs = {
+            search_type: (
+                lambda search_type=search_type, place_type=place_types[0]: _search_locations(
+                    tool_context, latitude, longitude, search_type, place_type, radius, max_results
+                )
+            )
+            for search_type, place_types in groups.items()
         }
+        searches, timed_out = run_legs(legs)
+
+        # One marker per place; the first requested type of each group labels it
+        locations = [location for search_locations, _ in searches.values() for location in search_locations]
+        added, updated, total = _add_to_map(tool_context, latitude, longitude, locations)
+        logger.info(f"[search_nearby_places_multi] ✅ MAP UPDATE: Added {added}, merged {updated} of {len(locations)} locations (on map: {total})")
 
-        logger.info(f"[search_nearby_places] ✅ MAP UPDATE for {place_type}: Added {len(locations)} locations (before: {before_count}, after: {after_count})")
+        results: Dict[str, Any] = {}
+        more_streaming = False
+        for search_type, place_types in groups.items():
+            if search_type not in searches:
+                for place_type in place_types:
+                    results[place_type] = {"status": "error", "message": "Search did not complete", "locations": []}
+                continue
+            search_locations, next_page_token = searches[search_type]
+            for place_type in place_types:
+                results[place_type] = {
+                    "status": "success",
+                    "message": f"Found {len(search_locations)} {place_type}(s)",
+                    "locations": [{**location, "place_type": place_type} for location in search_locations[:10]]
+                }
+            if streaming and places_stream.stream_remaining_pages(
+                tool_context,
+                next_page_token,
+                latitude,
+                longitude,
+                place_types[0],
+                radius,
+                {location["place_id"] for location in search_locations},
+                max_results - len(search_locations)
+            ):
+                more_streaming = True
 
         # Mark as completed
         update_agent_activity(tool_context.state, "maps_search_tool", "completed")
 
-        return {
+        result = {
             "status": "success",
-            "message": f"Found {len(locations)} {place_type}(s)",
-            "locations": locations,
-            "total_on_map": len(tool_context.state["locations"])
+            "message": f"Found {len(locations)} places for {len(requested)} type(s) with {len(groups)} search(es)",
+            "results": results,
+            "partial": bool(timed_out),
+            "total_on_map": total
         }
+        if more_streaming:
+            result["more_results_streaming"] = True
+        return result
 
     except Exception as e:
-        logger.error(f"[search_nearby_places] Error: {str(e)}")
+        logger.error(f"[search_nearby_places_multi] Error: {str(e)}")
 
         # Mark as completed even on error
         update_agent_activity(tool_context.state, "maps_search_tool", "completed")
@@ -141,4 +407,3 @@ def search_nearby_places(
             "status": "error",
             "message": f"Error searching places: {str(e)}"
         }
-
@@ -0,0 +1,77 @@
+"""Session-scoped in-process tables for data that should not live in session state."""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def session_id_of(context: Any) -> Optional[str]:
+    """Get the ADK session id from a ToolContext/CallbackContext, or None outside a session."""
+    session = getattr(context, "session", None)
+    return getattr(session, "id", None)
+
+
+class SessionTable:
+    """Thread-safe map of session id -> per-session value with idle expiry and an LRU bound."""
+
+    def __init__(
+        self,
+        name: str,
+        factory: Callable[[], Any],
+        idle_ttl_seconds: float = 3600,
+        max_sessions: int = 1000
+    ):
+        """Create a table.
+
+        Args:
+            name: Table name used in logs
+            factory: Creates the value for a session on first access
+            idle_ttl_seconds: Sessions not accessed for this long are dropped
+            max_sessions: Maximum number of sessions before the least recently used is dropped
+        """
+        self.name = name
+        self.factory = factory
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.max_sessions = max_sessions
+        self._entries: "OrderedDict[str, list]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str, create: bool = True) -> Any:
+        """Return the value for session_id, creating it with the factory if needed."""
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            entry = self._entries.get(session_id)
+            if entry is None:
+                if not create:
+                    return None
+                entry = [now, self.factory()]
+                self._entries[session_id] = entry
+                while len(self._entries) > self.max_sessions:
+                    evicted, _ = self._entries.popitem(last=False)
+                    logger.info(f"[SessionTable] {self.name}: evicted session {evicted}")
+            entry[0] = now
+            self._entries.move_to_end(session_id)
+            return entry[1]
+
+    def pop(self, session_id: str) -> Any:
+        """Remove and return the value for session_id (None if absent)."""
+        with self._lock:
+            entry = self._entries.pop(session_id, None)
+            return entry[1] if entry else None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _expire(self, now: float) -> None:
+        """Drop idle sessions from the least recently used end (caller holds the lock)."""
+        while self._entries:
+            session_id, entry = next(iter(self._entries.items()))
+            if now - entry[0] < self.idle_ttl_seconds:
+                break
+            del self._entries[session_id]
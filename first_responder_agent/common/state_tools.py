@@ -1,12 +1,30 @@
 """State management tools for updating UI state."""
 
 import logging
+import os
+import threading
 from typing import List, Dict, Any, Optional
 from google.adk.tools import ToolContext
 from google.adk.agents.callback_context import CallbackContext
+from opentelemetry import trace
 
 logger = logging.getLogger(__name__)
 
+# State key holding the structured result of the last geocode_location call
+GEOCODE_KEY = "geocode"
+
+# State keys written by the parallel briefing workflow for the insights agent
+DISASTER_REPORT_KEY = "disaster_report"
+RELIEF_REPORT_KEY = "relief_report"
+
+# Activity history ring buffer: bounded entries, open-entry index and rolled-up counters
+ACTIVITY_INDEX_KEY = "_activityIndex"
+ACTIVITY_ROLLUP_KEY = "activityRollup"
+DEFAULT_ACTIVITY_HISTORY_LIMIT = 100
+
+# Guards read-modify-write updates of shared state when tools fan out to threads
+state_lock = threading.RLock()
+
 
 def update_map_state(
     tool_context: ToolContext,
@@ -25,8 +43,10 @@ def update_map_state(
         Dict indicating success status
     """
     try:
+        from .location_store import replace_locations
+
         logger.info(f"[update_map_state] Updating map with {len(locations)} locations")
-        tool_context.state["locations"] = locations
+        total = replace_locations(tool_context, locations)
         
         if center:
             tool_context.state["center"] = center
@@ -34,7 +54,7 @@ def update_map_state(
         
         return {
             "status": "success",
-            "message": f"Updated map with {len(locations)} locations"
+            "message": f"Updated map with {total} locations"
         }
     except Exception as e:
         logger.error(f"[update_map_state] Error updating map: {str(e)}")
@@ -44,6 +64,62 @@ def update_map_state(
         }
 
 
+def get_activity_history_limit() -> int:
+    """Maximum entries kept in activityHistory (ACTIVITY_HISTORY_LIMIT, default 100, at least 1)."""
+    value = os.getenv("ACTIVITY_HISTORY_LIMIT")
+    if not value:
+        return DEFAULT_ACTIVITY_HISTORY_LIMIT
+    try:
+        return max(int(value), 1)
+    except ValueError:
+        logger.warning(f"[get_activity_history_limit] Invalid ACTIVITY_HISTORY_LIMIT={value}, using {DEFAULT_ACTIVITY_HISTORY_LIMIT}")
+        return DEFAULT_ACTIVITY_HISTORY_LIMIT
+
+
+def _activity_index(state: Dict[str, Any], history: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Get the activity index, rebuilding it if it does not describe the history.
+
+    The index tracks the sequence number of the first history entry, the next
+    sequence number, and a stack of open (running) entry sequence numbers per
+    agent, so an entry's position is seq - first_seq.
+    """
+    index = state.get(ACTIVITY_INDEX_KEY)
+    if index and index.get("first_seq", 0) + len(history) == index.get("next_seq", 0):
+        return index
+
+    # Sessions from before the index (or edited elsewhere): number entries in order
+    index = {"first_seq": 0, "next_seq": len(history), "open": {}}
+    for seq, entry in enumerate(history):
+        history[seq] = {**entry, "seq": seq}
+        if entry.get("status") == "running":
+            index["open"].setdefault(entry["agent"], []).append(seq)
+    return index
+
+
+def _roll_up(state: Dict[str, Any], history: List[Dict[str, Any]], index: Dict[str, Any], limit: int) -> None:
+    """Drop the oldest entries beyond limit, folding them into per-agent counters."""
+    excess = len(history) - limit
+    if excess <= 0:
+        return
+
+    rollup = state.get(ACTIVITY_ROLLUP_KEY) or {}
+    for entry in history[:excess]:
+        agent = entry["agent"]
+        counters = rollup.setdefault(agent, {"runs": 0, "completed": 0, "total_duration_ms": 0})
+        counters["runs"] += 1
+        if entry.get("status") == "completed":
+            counters["completed"] += 1
+            counters["total_duration_ms"] += entry.get("duration_ms", 0)
+        else:
+            # Evicted while still running; its completion will be appended as a new entry
+            open_seqs = index["open"].get(agent, [])
+            if entry.get("seq") in open_seqs:
+                open_seqs.remove(entry["seq"])
+    del history[:excess]
+    index["first_seq"] += excess
+    state[ACTIVITY_ROLLUP_KEY] = rollup
+
+
 def update_agent_activity(
     state: Dict[str, Any],
     current_agent: str,
@@ -52,6 +128,11 @@ def update_agent_activity(
     """
     Update the current agent activity status.
 
+    History is a bounded ring buffer (see ACTIVITY_HISTORY_LIMIT): completions
+    are matched to their running entry through a per-agent index instead of a
+    scan, and entries that fall out of the buffer are rolled up into
+    per-agent counters in state["activityRollup"].
+
     Args:
         state: The state dictionary (from callback_context.state)
         current_agent: Name of the currently active agent
@@ -62,44 +143,56 @@ def update_agent_activity(
     try:
         logger.info(f"[update_agent_activity] Agent: {current_agent}, Status: {status}")
 
-        # Initialize activity history if it doesn't exist
-        if "activityHistory" not in state:
-            state["activityHistory"] = []
-
-        # Update current agent
-        state["currentAgent"] = current_agent if status == "running" else None
-
-        # Add to activity history with proper timestamp
-        timestamp = int(time.time() * 1000)  # milliseconds
-        activity_entry = {
-            "agent": current_agent,
-            "timestamp": timestamp,
-            "status": status
-        }
-
-        # Update or add activity in history
-        history = state["activityHistory"]
-
-        if status == "completed":
-            # Find the most recent running entry for this agent and update it
-            for i in range(len(history) - 1, -1, -1):
-                if history[i]["agent"] == current_agent:
-                    history[i] = activity_entry
-                    break
+        # Mark the activity on the enclosing agent/tool span
+        trace.get_current_span().add_event("agent_activity", {"a4i.agent": current_agent, "a4i.status": status})
+
+        with state_lock:
+            # Initialize activity history if it doesn't exist
+            if "activityHistory" not in state:
+                state["activityHistory"] = []
+
+            # Update current agent
+            state["currentAgent"] = current_agent if status == "running" else None
+
+            # Add to activity history with proper timestamp
+            timestamp = int(time.time() * 1000)  # milliseconds
+            activity_entry = {
+                "agent": current_agent,
+                "timestamp": timestamp,
+                "status": status
+            }
+
+            # Update or add activity in history
+            history = state["activityHistory"]
+            index = _activity_index(state, history)
+            open_seqs = index["open"].setdefault(current_agent, [])
+
+            if status == "completed" and open_seqs:
+                # Replace the most recent running entry for this agent in place
+                seq = open_seqs.pop()
+                running_entry = history[seq - index["first_seq"]]
+                activity_entry["seq"] = seq
+                activity_entry["duration_ms"] = timestamp - running_entry["timestamp"]
+                history[seq - index["first_seq"]] = activity_entry
             else:
-                # If not found, add new entry
+                # Running entries (and completions without a running entry) are appended
+                activity_entry["seq"] = index["next_seq"]
+                index["next_seq"] += 1
                 history.append(activity_entry)
-        else:
-            # For running status, just append
-            history.append(activity_entry)
+                if status == "running":
+                    open_seqs.append(activity_entry["seq"])
+
+            if not open_seqs:
+                del index["open"][current_agent]
 
-        # Keep all activities (no limit)
-        state["activityHistory"] = history
+            _roll_up(state, history, index, get_activity_history_limit())
 
-        # Force state update by creating a new dict reference
-        # This ensures the AG-UI ADK detects the change
-        state["_update_trigger"] = timestamp
+            state["activityHistory"] = history
+            state[ACTIVITY_INDEX_KEY] = index
+
+            # Force state update by creating a new dict reference
+            # This ensures the AG-UI ADK detects the change
+            state["_update_trigger"] = timestamp
 
     except Exception as e:
         logger.error(f"[update_agent_activity] Error: {str(e)}")
-
@@ -0,0 +1,180 @@
+"""Span tracing for agent runs, tool calls and upstream calls.
+
+ADK already opens OpenTelemetry spans for each invocation, agent run
+(invoke_agent), model call (call_llm) and ADK tool call (execute_tool). This
+module installs a tracer provider so those spans are exported, and adds spans
+for the work ADK does not see: the finder tools that tool calls fan out to,
+Places/BigQuery queries and HTTP requests. Context is carried into worker
+threads by run_legs and the prefetch executor, so everything nests under the
+invocation that caused it.
+
+Exporters are chosen with TRACE_EXPORTERS (comma-separated): "jsonl" writes
+one span per line to TRACE_JSONL_PATH (view with `python -m perf.waterfall`),
+"otlp" sends to an OTLP/HTTP collector (OTEL_EXPORTER_OTLP_ENDPOINT).
+"""
+
+import functools
+import inspect
+import json
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+from opentelemetry import trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import ReadableSpan, SpanProcessor, TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, SpanExporter, SpanExportResult
+
+logger = logging.getLogger(__name__)
+
+TRACER_NAME = "first_responder_agent"
+SERVICE_NAME = "first-responder-agent"
+DEFAULT_JSONL_PATH = "traces.jsonl"
+
+tracer = trace.get_tracer(TRACER_NAME)
+
+_setup_lock = threading.Lock()
+_provider: Optional[TracerProvider] = None
+
+# Tool names wrapped with @traced (their ADK execute_tool spans are not counted twice in metrics)
+traced_tool_names = set()
+
+
+def span_to_dict(span: ReadableSpan) -> Dict[str, Any]:
+    """Flatten a finished span into a JSON-serializable record."""
+    context = span.get_span_context()
+    return {
+        "name": span.name,
+        "trace_id": format(context.trace_id, "032x"),
+        "span_id": format(context.span_id, "016x"),
+        "parent_id": format(span.parent.span_id, "016x") if span.parent else None,
+        "start_ns": span.start_time,
+        "end_ns": span.end_time,
+        "duration_ms": (span.end_time - span.start_time) / 1e6 if span.end_time else None,
+        "status": span.status.status_code.name,
+        "attributes": {key: value if isinstance(value, (str, int, float, bool)) else list(value)
+                       for key, value in (span.attributes or {}).items()},
+    }
+
+
+class JsonlSpanExporter(SpanExporter):
+    """Appends finished spans to a local JSON Lines file."""
+
+    def __init__(self, path: str = DEFAULT_JSONL_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        lines = "".join(json.dumps(span_to_dict(span), default=str) + "\n" for span in spans)
+        try:
+            with self._lock, open(self.path, "a", encoding="utf-8") as sink:
+                sink.write(lines)
+            return SpanExportResult.SUCCESS
+        except OSError as e:
+            logger.error(f"[JsonlSpanExporter.export] Could not write spans to {self.path}: {str(e)}")
+            return SpanExportResult.FAILURE
+
+    def shutdown(self) -> None:
+        pass
+
+
+def _create_exporter(name: str) -> Optional[SpanExporter]:
+    """Create the exporter for one TRACE_EXPORTERS entry."""
+    if name == "jsonl":
+        return JsonlSpanExporter(os.getenv("TRACE_JSONL_PATH", DEFAULT_JSONL_PATH))
+    if name == "otlp":
+        try:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        except ImportError:
+            logger.warning("[setup_tracing] opentelemetry-exporter-otlp-proto-http not installed, skipping OTLP export")
+            return None
+        return OTLPSpanExporter()
+    logger.warning(f"[setup_tracing] Unknown trace exporter: {name}")
+    return None
+
+
+def get_tracer_provider() -> TracerProvider:
+    """Get the SDK tracer provider, installing one globally if none is set."""
+    global _provider
+    with _setup_lock:
+        if _provider is None:
+            current = trace.get_tracer_provider()
+            if isinstance(current, TracerProvider):
+                _provider = current
+            else:
+                _provider = TracerProvider(resource=Resource.create({"service.name": SERVICE_NAME}))
+                trace.set_tracer_provider(_provider)
+        return _provider
+
+
+def add_span_processor(processor: SpanProcessor) -> None:
+    """Register a span processor (e.g., metrics) on the tracer provider."""
+    get_tracer_provider().add_span_processor(processor)
+
+
+def setup_tracing() -> bool:
+    """Install span exporters from TRACE_EXPORTERS. Call once at startup, before agents run.
+
+    Returns:
+        True if at least one exporter was installed
+    """
+    names = [name.strip().lower() for name in os.getenv("TRACE_EXPORTERS", "").split(",") if name.strip()]
+    installed = []
+    for name in names:
+        exporter = _create_exporter(name)
+        if exporter is not None:
+            add_span_processor(BatchSpanProcessor(exporter))
+            installed.append(name)
+    if installed:
+        logger.info(f"[setup_tracing] Exporting spans to: {', '.join(installed)}")
+    return bool(installed)
+
+
+def traced(name: str, *arg_names: str, kind: str = "tool") -> Callable:
+    """Decorator that runs a function inside a span.
+
+    Args:
+        name: Span name
+        *arg_names: Parameters recorded as "a4i.<param>" span attributes
+        kind: Recorded as "a4i.kind" ("tool", "upstream", ...)
+
+    A dict result with a "status" is recorded as "a4i.status"; exceptions are
+    recorded on the span and re-raised. Coroutine functions stay coroutine
+    functions, with the span open until they finish.
+    """
+    def decorator(fn: Callable) -> Callable:
+        signature = inspect.signature(fn)
+        if kind == "tool":
+            traced_tool_names.add(fn.__name__)
+
+        def span_attributes(args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Dict[str, Any]:
+            attributes = {"a4i.kind": kind}
+            if arg_names:
+                bound = signature.bind_partial(*args, **kwargs).arguments
+                for arg_name in arg_names:
+                    value = bound.get(arg_name)
+                    if isinstance(value, (str, int, float, bool)):
+                        attributes[f"a4i.{arg_name}"] = value
+            return attributes
+
+        def record_status(span: Any, result: Any) -> None:
+            if isinstance(result, dict) and "status" in result:
+                span.set_attribute("a4i.status", str(result["status"]))
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                with tracer.start_as_current_span(name, attributes=span_attributes(args, kwargs)) as span:
+                    result = await fn(*args, **kwargs)
+                    record_status(span, result)
+                    return result
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with tracer.start_as_current_span(name, attributes=span_attributes(args, kwargs)) as span:
+                result = fn(*args, **kwargs)
+                record_status(span, result)
+                return result
+        return wrapper
+    return decorator
@@ -1,47 +1,39 @@
 """Disaster Discovery Agent - Discovers and locates disasters using BigQuery, FEMA Live, and NOAA Live data."""
 
 import logging
+import os
+from typing import Optional
 from google.adk.agents import Agent
 from google.adk.agents.callback_context import CallbackContext
 from ..common.bigquery_tools import get_ongoing_storms_info
 from ..common.state_tools import update_agent_activity
 from .fema_live_agent.agent import create_fema_live_agent
 from .noaa_live_agent.agent import create_noaa_live_agent
+from .live_discovery_tool import discover_live_disasters
 
 logger = logging.getLogger(__name__)
 
+# Discovery modes (DISASTER_DISCOVERY_MODE)
+DISCOVERY_DIRECT = "direct"
+DISCOVERY_AGENTS = "agents"
 
-def on_before_disaster_agent(callback_context: CallbackContext):
-    """Update agent activity when disaster discovery starts."""
-    update_agent_activity(callback_context.state, "disaster_discovery_agent", "running")
-    logger.info("[on_before_disaster_agent] Disaster discovery agent started")
-    return None
-
-
-def on_after_disaster_agent(callback_context: CallbackContext):
-    """Update agent activity when disaster discovery completes."""
-    update_agent_activity(callback_context.state, "disaster_discovery_agent", "completed")
-    logger.info("[on_after_disaster_agent] Disaster discovery agent completed")
-    return None
-
-
-def create_disaster_discovery_agent():
-    """Create and return the Disaster Discovery agent."""
-    logger.info("[create_disaster_discovery_agent] Creating Disaster Discovery agent")
-
-    # Create sub-agents
-    fema_live_agent = create_fema_live_agent()
-    noaa_live_agent = create_noaa_live_agent()
+# Steps when FEMA/NOAA data is fetched by a single deterministic tool call
+DIRECT_WORKFLOW = """WORKFLOW - EXECUTE ALL STEPS SEQUENTIALLY, NO EXCEPTIONS:
+Step 1:
+Call BOTH tools with the coordinates, in the same turn:
+- get_ongoing_storms_info to query ongoing storm data from BigQuery
+- discover_live_disasters to fetch FEMA disaster declarations and NOAA weather alerts concurrently
+⚠️ CRITICAL: After receiving the results, IMMEDIATELY proceed to Step 2. DO NOT STOP.
 
-    disaster_discovery = Agent(
-        name="disaster_discovery_agent",
-        model="gemini-2.5-pro",
-        description="Sub-agent for discovering and locating disasters",
-        instruction="""You are the Disaster Discovery Sub-Agent responsible for finding and locating disasters.
+Step 2:
+Synthesize ALL disaster data collected in Step 1 into a comprehensive report.
+Even if some sources returned no data, create a report with what you have.
+After synthesizing, IMMEDIATELY proceed to the final step. DO NOT STOP.
 
-You will receive coordinates (latitude, longitude) from the first_responder_agent.
+"""
 
-WORKFLOW - EXECUTE ALL 5 STEPS SEQUENTIALLY, NO EXCEPTIONS:
+# Steps when FEMA/NOAA data is fetched by the LLM live sub-agents
+AGENTS_WORKFLOW = """WORKFLOW - EXECUTE ALL STEPS SEQUENTIALLY, NO EXCEPTIONS:
 Step 1:
 Use the get_ongoing_storms_info TOOL with the coordinates to query ongoing storm data from BigQuery.
 ⚠️ CRITICAL: After receiving the result, IMMEDIATELY proceed to Step 2. DO NOT STOP.
@@ -57,28 +49,98 @@ Handoff to noaa_live_agent sub-agent with the coordinates to query NOAA weather
 Step 4:
 Synthesize ALL disaster data collected from Steps 1-3 into a comprehensive report.
 Even if some steps returned no data, create a report with what you have.
-After synthesizing, IMMEDIATELY proceed to Step 5. DO NOT STOP.
+After synthesizing, IMMEDIATELY proceed to the final step. DO NOT STOP.
+
+"""
 
-Step 5:
+# Final step when running as a transfer target of the root agent
+TRANSFER_RETURN = """Final Step:
 Return the synthesized disaster information and transfer control back to the calling agent using the transfer_to_agent tool.
 
 EXECUTION RULES:
-- Execute all 5 steps in sequence without stopping between steps
+- Execute all steps in sequence without stopping between steps
 - DO NOT STOP after receiving any tool or agent result - continue to the next step
 - DO NOT wait for user input between steps
 - If any step returns an error or no data, acknowledge it and continue to the next step
 - Never ask for clarification
 
 ## ⚠️ CRITICAL: Control Transfer
-**ALWAYS** after completing Step 5, transfer control to the
+**ALWAYS** after completing the final step, transfer control to the
 calling agent using the transfer_to_agent tool.
 Never stop to ask for clarification or additional input.
-""",
-        tools=[get_ongoing_storms_info],
-        sub_agents=[fema_live_agent, noaa_live_agent],
+"""
+
+# Final step when running inside the parallel briefing workflow
+WORKFLOW_STEP_RETURN = """Final Step:
+Respond with the synthesized disaster report as your final answer. It is saved for the insights agent.
+
+EXECUTION RULES:
+- Execute all steps in sequence without stopping between steps
+- DO NOT STOP after receiving any tool or agent result - continue to the next step
+- DO NOT wait for user input between steps
+- If any step returns an error or no data, acknowledge it and continue to the next step
+- Never ask for clarification
+- Do NOT transfer to the calling agent - the workflow continues automatically after your report
+"""
+
+
+def on_before_disaster_agent(callback_context: CallbackContext):
+    """Update agent activity when disaster discovery starts."""
+    update_agent_activity(callback_context.state, "disaster_discovery_agent", "running")
+    logger.info("[on_before_disaster_agent] Disaster discovery agent started")
+    return None
+
+
+def on_after_disaster_agent(callback_context: CallbackContext):
+    """Update agent activity when disaster discovery completes."""
+    update_agent_activity(callback_context.state, "disaster_discovery_agent", "completed")
+    logger.info("[on_after_disaster_agent] Disaster discovery agent completed")
+    return None
+
+
+def create_disaster_discovery_agent(output_key: Optional[str] = None):
+    """Create and return the Disaster Discovery agent.
+
+    The DISASTER_DISCOVERY_MODE environment variable selects how live data is
+    fetched: "direct" (default) calls the FEMA and NOAA functions concurrently
+    from one tool, while "agents" delegates to the FEMA/NOAA LLM sub-agents.
+
+    Args:
+        output_key: When set, the agent runs as a workflow step: its final report
+            is saved to this state key and it does not transfer back to a parent.
+    """
+    mode = os.getenv("DISASTER_DISCOVERY_MODE", DISCOVERY_DIRECT).lower()
+    if mode not in (DISCOVERY_DIRECT, DISCOVERY_AGENTS):
+        logger.warning(f"[create_disaster_discovery_agent] Unknown DISASTER_DISCOVERY_MODE={mode}, using {DISCOVERY_DIRECT}")
+        mode = DISCOVERY_DIRECT
+    logger.info(f"[create_disaster_discovery_agent] Creating Disaster Discovery agent (mode={mode})")
+
+    if mode == DISCOVERY_AGENTS:
+        # Create sub-agents
+        workflow = AGENTS_WORKFLOW
+        tools = [get_ongoing_storms_info]
+        sub_agents = [create_fema_live_agent(), create_noaa_live_agent()]
+    else:
+        workflow = DIRECT_WORKFLOW
+        tools = [get_ongoing_storms_info, discover_live_disasters]
+        sub_agents = []
+
+    disaster_discovery = Agent(
+        name="disaster_discovery_agent",
+        model="gemini-2.5-pro",
+        description="Sub-agent for discovering and locating disasters",
+        instruction="""You are the Disaster Discovery Sub-Agent responsible for finding and locating disasters.
+
+You will receive coordinates (latitude, longitude) from the first_responder_agent.
+
+""" + workflow + (WORKFLOW_STEP_RETURN if output_key else TRANSFER_RETURN),
+        tools=tools,
+        sub_agents=sub_agents,
+        output_key=output_key,
+        disallow_transfer_to_parent=bool(output_key),
+        disallow_transfer_to_peers=bool(output_key),
         before_agent_callback=on_before_disaster_agent,
         after_agent_callback=on_after_disaster_agent,
     )
     logger.info("[create_disaster_discovery_agent] Disaster Discovery agent created successfully")
     return disaster_discovery
-
@@ -1,17 +1,18 @@
 """FEMA Live Agent - Queries live FEMA data from OpenFEMA API."""
 
 from typing import Optional
-import requests
 import logging
+import os
 from google.adk.agents import Agent
 from google.adk.agents.callback_context import CallbackContext
+from ...common.http import http_get
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
 
-# FEMA OpenFEMA API base URL
-FEMA_API_BASE = "https://www.fema.gov/api/open"
+# FEMA OpenFEMA API base URL (FEMA_API_BASE overrides it, e.g. for a local fixture server)
+FEMA_API_BASE = os.getenv("FEMA_API_BASE", "https://www.fema.gov/api/open").rstrip("/")
 
 
 def query_disasters(state: Optional[str] = None, limit: int = 10) -> dict:
@@ -35,7 +36,7 @@ def query_disasters(state: Optional[str] = None, limit: int = 10) -> dict:
             params["$filter"] = f"state eq '{state.upper()}'"
 
         logger.debug(f"[query_disasters] API URL: {url}, params: {params}")
-        response = requests.get(url, params=params, timeout=10)
+        response = http_get(url, params=params, timeout=10)
         logger.debug(f"[query_disasters] Response status code: {response.status_code}")
         response.raise_for_status()
         data = response.json()
@@ -77,7 +78,7 @@ def query_disaster_declarations(disaster_type: Optional[str] = None, limit: int
             params["$filter"] = f"incidentType eq '{disaster_type}'"
 
         logger.debug(f"[query_disaster_declarations] API URL: {url}, params: {params}")
-        response = requests.get(url, params=params, timeout=10)
+        response = http_get(url, params=params, timeout=10)
         logger.debug(f"[query_disaster_declarations] Response status code: {response.status_code}")
         response.raise_for_status()
         data = response.json()
@@ -119,7 +120,7 @@ def query_fema_assistance(state: Optional[str] = None, limit: int = 20) -> dict:
             params["$filter"] = f"state eq '{state.upper()}'"
 
         logger.debug(f"[query_fema_assistance] API URL: {url}, params: {params}")
-        response = requests.get(url, params=params, timeout=10)
+        response = http_get(url, params=params, timeout=10)
         logger.debug(f"[query_fema_assistance] Response status code: {response.status_code}")
         response.raise_for_status()
         data = response.json()
@@ -157,7 +158,7 @@ def query_disaster_summary(disaster_number: int) -> dict:
         }
 
         logger.debug(f"[query_disaster_summary] API URL: {url}, params: {params}")
-        response = requests.get(url, params=params, timeout=10)
+        response = http_get(url, params=params, timeout=10)
         logger.debug(f"[query_disaster_summary] Response status code: {response.status_code}")
         response.raise_for_status()
         data = response.json()
@@ -0,0 +1,254 @@
+"""Live Discovery Tool - Fetches FEMA and NOAA live data directly, without LLM sub-agents."""
+
+import asyncio
+import logging
+from typing import Dict, Any, Callable, List, Optional
+from google.adk.tools import ToolContext
+from ..common import prefetch
+from ..common.cache import TTLCache
+from ..common.concurrency import run_legs
+from ..common.geocoding import distance_meters, reverse_geocode_state
+from ..common.tracing import traced
+from ..common.state_tools import update_agent_activity, GEOCODE_KEY
+from .fema_live_agent.agent import query_disasters
+from .noaa_live_agent.agent import query_active_alerts_for_point
+
+logger = logging.getLogger(__name__)
+
+# Reuse the geocoded state code when the requested point is this close to it
+GEOCODE_REUSE_RADIUS_METERS = 50000
+
+# FEMA declarations change slowly; NOAA alerts are refreshed more often
+_fema_cache = TTLCache("fema_disasters", ttl_seconds=600, max_entries=64)
+_noaa_cache = TTLCache("noaa_point_alerts", ttl_seconds=120, max_entries=1024)
+
+# Caps on the number of records kept in the compact summary
+MAX_FEMA_DISASTERS = 10
+MAX_NOAA_ALERTS = 10
+MAX_DESIGNATED_AREAS = 5
+
+
+def fetch_fema_disasters(state_code: str) -> Dict[str, Any]:
+    """Fetch FEMA disaster declarations for a state, using the shared cache."""
+    return _fema_cache.get_or_compute(
+        state_code,
+        lambda: query_disasters(state=state_code, limit=50),
+        cache_if=lambda result: result.get("status") == "success"
+    )
+
+
+def fetch_point_alerts(latitude: float, longitude: float) -> Dict[str, Any]:
+    """Fetch active NOAA alerts for a point, using the shared cache."""
+    # Round to ~100m so nearby points share a cache entry
+    point = (round(latitude, 3), round(longitude, 3))
+    return _noaa_cache.get_or_compute(
+        point,
+        lambda: query_active_alerts_for_point(*point, limit=MAX_NOAA_ALERTS),
+        cache_if=lambda result: result.get("status") == "success"
+    )
+
+
+def _known_state_code(tool_context: ToolContext, latitude: float, longitude: float) -> Optional[str]:
+    """State code of the last geocode result if it is close enough to the point, else None."""
+    geocode = tool_context.state.get(GEOCODE_KEY) or {}
+    if geocode.get("state") and geocode.get("lat") is not None and geocode.get("lng") is not None:
+        if distance_meters(latitude, longitude, geocode["lat"], geocode["lng"]) <= GEOCODE_REUSE_RADIUS_METERS:
+            return geocode["state"]
+    return None
+
+
+def _compact_fema(disasters: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Collapse per-county FEMA declaration rows into one entry per disaster."""
+    by_number = {}
+    for row in disasters:
+        number = row.get("disasterNumber")
+        entry = by_number.get(number)
+        if entry is None:
+            if len(by_number) >= MAX_FEMA_DISASTERS:
+                continue
+            entry = {
+                "disaster_number": number,
+                "title": row.get("declarationTitle"),
+                "incident_type": row.get("incidentType"),
+                "declaration_type": row.get("declarationType"),
+                "declaration_date": row.get("declarationDate"),
+                "incident_begin": row.get("incidentBeginDate"),
+                "incident_end": row.get("incidentEndDate"),
+                "designated_areas": []
+            }
+            by_number[number] = entry
+        area = row.get("designatedArea")
+        if area and area not in entry["designated_areas"] and len(entry["designated_areas"]) < MAX_DESIGNATED_AREAS:
+            entry["designated_areas"].append(area)
+    return list(by_number.values())
+
+
+def _compact_noaa(alerts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Keep only the fields of NOAA alert features needed for a briefing."""
+    compact = []
+    for feature in alerts[:MAX_NOAA_ALERTS]:
+        properties = feature.get("properties", {})
+        compact.append({
+            "event": properties.get("event"),
+            "severity": properties.get("severity"),
+            "urgency": properties.get("urgency"),
+            "headline": properties.get("headline"),
+            "area": properties.get("areaDesc"),
+            "effective": properties.get("effective"),
+            "expires": properties.get("expires")
+        })
+    return compact
+
+
+def live_disaster_legs(
+    tool_context: ToolContext,
+    latitude: float,
+    longitude: float,
+    state_code: Optional[str] = None
+) -> Dict[str, Callable[[], Any]]:
+    """
+    Build the data-only FEMA and NOAA legs for a location and mark both sources running.
+
+    The state code is taken from the last geocode result when not provided;
+    otherwise the FEMA leg reverse geocodes it. The FEMA leg's result carries
+    the code it used under "state".
+
+    Args:
+        tool_context: The tool context containing state
+        latitude: Latitude coordinate
+        longitude: Longitude coordinate
+        state_code: Optional two-letter state code (e.g., 'TX', 'CA')
+
+    Returns:
+        Legs for run_legs: "fema" and "noaa"
+    """
+    known_state = state_code or _known_state_code(tool_context, latitude, longitude)
+
+    def query_fema():
+        code = known_state or reverse_geocode_state(latitude, longitude)
+        logger.info(f"[live_disaster_legs] Using state={code}")
+        if not code:
+            return {"status": "info", "message": "State unknown, skipped FEMA query", "state": None}
+        result = prefetch.fetch(
+            tool_context, prefetch.prefetch_key("fema_disasters", code),
+            fetch_fema_disasters, code
+        )
+        return {**result, "state": code}
+
+    def query_noaa():
+        return prefetch.fetch(
+            tool_context, prefetch.prefetch_key("noaa_alerts", latitude, longitude),
+            fetch_point_alerts, latitude, longitude
+        )
+
+    update_agent_activity(tool_context.state, "fema_live_agent", "running")
+    update_agent_activity(tool_context.state, "noaa_live_agent", "running")
+    return {"fema": query_fema, "noaa": query_noaa}
+
+
+def publish_live_disasters(
+    tool_context: ToolContext,
+    legs: Dict[str, Any],
+    timed_out: List[str],
+    latitude: float,
+    longitude: float,
+    state_code: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Mark the FEMA and NOAA sources completed and build the compact live disaster summary.
+
+    Call on the tool's thread once run_legs has returned over live_disaster_legs().
+
+    Args:
+        tool_context: The tool context containing state
+        legs: Results of the legs that finished in time
+        timed_out: Names of the legs that timed out
+        latitude: Latitude coordinate
+        longitude: Longitude coordinate
+        state_code: State code passed to live_disaster_legs, if any
+
+    Returns:
+        Dict with compact FEMA disasters, NOAA alerts and a summary
+    """
+    update_agent_activity(tool_context.state, "fema_live_agent", "completed")
+    update_agent_activity(tool_context.state, "noaa_live_agent", "completed")
+
+    fema_result = legs.get("fema") or {}
+    noaa_result = legs.get("noaa") or {}
+    state_code = fema_result.get("state", state_code)
+    fema_disasters = _compact_fema(fema_result.get("disasters", []))
+    noaa_alerts = _compact_noaa(noaa_result.get("alerts", []))
+
+    summary = (
+        f"{len(fema_disasters)} FEMA disaster declaration(s) for {state_code or 'unknown state'} "
+        f"and {len(noaa_alerts)} active NOAA alert(s) at the location."
+    )
+    if timed_out:
+        summary += f" Partial results: {', '.join(timed_out)} query timed out."
+
+    return {
+        "status": "success",
+        "latitude": latitude,
+        "longitude": longitude,
+        "state": state_code,
+        "partial": bool(timed_out),
+        "timed_out_sources": timed_out,
+        "fema_status": fema_result.get("status", "timeout" if "fema" in timed_out else "error"),
+        "noaa_status": noaa_result.get("status", "timeout" if "noaa" in timed_out else "error"),
+        "fema_disasters": fema_disasters,
+        "noaa_alerts": noaa_alerts,
+        "summary": summary
+    }
+
+
+@traced("tool discover_live_disasters", "state_code")
+async def discover_live_disasters(
+    tool_context: ToolContext,
+    latitude: float,
+    longitude: float,
+    state_code: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Fetch FEMA disaster declarations and NOAA weather alerts for a location.
+
+    Both sources are queried concurrently and returned as a compact summary.
+    The state code is taken from the last geocode result when not provided.
+    The queries run off the event loop, so other agents and sessions keep
+    running while they wait.
+
+    Args:
+        tool_context: The tool context containing state
+        latitude: Latitude coordinate
+        longitude: Longitude coordinate
+        state_code: Optional two-letter state code (e.g., 'TX', 'CA')
+
+    Returns:
+        Dict with compact FEMA disasters, NOAA alerts and a summary
+    """
+    try:
+        logger.info(f"[discover_live_disasters] 🌪️ Starting live discovery near ({latitude}, {longitude})")
+
+        # Update agent activity to running
+        update_agent_activity(tool_context.state, "live_discovery_tool", "running")
+
+        legs, timed_out = await asyncio.to_thread(
+            run_legs, live_disaster_legs(tool_context, latitude, longitude, state_code)
+        )
+        result = publish_live_disasters(tool_context, legs, timed_out, latitude, longitude, state_code)
+
+        logger.info(f"[discover_live_disasters] ✅ Live discovery completed: {result['summary']}")
+
+        # Update agent activity to completed
+        update_agent_activity(tool_context.state, "live_discovery_tool", "completed")
+
+        return result
+
+    except Exception as e:
+        logger.error(f"[discover_live_disasters] Error in live discovery: {str(e)}")
+        update_agent_activity(tool_context.state, "live_discovery_tool", "completed")
+        return {
+            "status": "error",
+            "message": f"Error discovering live disasters: {str(e)}",
+            "latitude": latitude,
+            "longitude": longitude
+        }
@@ -1,16 +1,17 @@
 """NOAA Live Agent - Queries live NOAA weather and disaster data from NOAA API."""
 
 from typing import Optional
-import requests
 import logging
+import os
 from google.adk.agents import Agent
 from google.adk.agents.callback_context import CallbackContext
+from ...common.http import http_get
 
 logger = logging.getLogger(__name__)
 
-# NOAA API base URLs
-NOAA_WEATHER_API = "https://api.weather.gov"
-NOAA_ALERTS_API = "https://api.weather.gov/alerts/active"
+# NOAA API base URLs (NOAA_API_BASE overrides the host, e.g. for a local fixture server)
+NOAA_WEATHER_API = os.getenv("NOAA_API_BASE", "https://api.weather.gov").rstrip("/")
+NOAA_ALERTS_API = f"{NOAA_WEATHER_API}/alerts/active"
 
 
 def query_active_alerts(state: Optional[str] = None, limit: int = 20) -> dict:
@@ -32,7 +33,7 @@ def query_active_alerts(state: Optional[str] = None, limit: int = 20) -> dict:
             params["point"] = f"state={state.upper()}"
         
         logger.debug(f"[query_active_alerts] API URL: {url}, params: {params}")
-        response = requests.get(url, params=params, timeout=10)
+        response = http_get(url, params=params, timeout=10)
         logger.debug(f"[query_active_alerts] Response status code: {response.status_code}")
         response.raise_for_status()
         data = response.json()
@@ -53,6 +54,45 @@ def query_active_alerts(state: Optional[str] = None, limit: int = 20) -> dict:
         }
 
 
+def query_active_alerts_for_point(latitude: float, longitude: float, limit: int = 20) -> dict:
+    """Query active weather alerts affecting a specific point.
+
+    Args:
+        latitude: Latitude coordinate
+        longitude: Longitude coordinate
+        limit: Maximum number of results to return
+
+    Returns:
+        Dictionary with status and results
+    """
+    logger.info(f"[query_active_alerts_for_point] Starting query for lat={latitude}, lon={longitude}, limit={limit}")
+    try:
+        url = NOAA_ALERTS_API
+        params = {"point": f"{latitude},{longitude}"}
+
+        logger.debug(f"[query_active_alerts_for_point] API URL: {url}, params: {params}")
+        response = http_get(url, params=params, timeout=10)
+        logger.debug(f"[query_active_alerts_for_point] Response status code: {response.status_code}")
+        response.raise_for_status()
+        data = response.json()
+
+        alerts = data.get("features", [])[:limit]
+        logger.info(f"[query_active_alerts_for_point] Successfully retrieved {len(alerts)} alerts for point=({latitude}, {longitude})")
+        return {
+            "status": "success",
+            "latitude": latitude,
+            "longitude": longitude,
+            "count": len(alerts),
+            "alerts": alerts
+        }
+    except Exception as e:
+        logger.error(f"[query_active_alerts_for_point] Error querying alerts: {str(e)}", exc_info=True)
+        return {
+            "status": "error",
+            "error_message": f"Failed to query active alerts for point: {str(e)}"
+        }
+
+
 def query_weather_alerts_by_type(alert_type: Optional[str] = None, limit: int = 15) -> dict:
     """Query weather alerts by type (e.g., 'Tornado Warning', 'Flood Warning').
 
@@ -72,7 +112,7 @@ def query_weather_alerts_by_type(alert_type: Optional[str] = None, limit: int =
             params["event"] = alert_type
         
         logger.debug(f"[query_weather_alerts_by_type] API URL: {url}, params: {params}")
-        response = requests.get(url, params=params, timeout=10)
+        response = http_get(url, params=params, timeout=10)
         logger.debug(f"[query_weather_alerts_by_type] Response status code: {response.status_code}")
         response.raise_for_status()
         data = response.json()
@@ -108,7 +148,7 @@ def query_severe_weather_outlook(limit: int = 10) -> dict:
         params = {"limit": limit}
         
         logger.debug(f"[query_severe_weather_outlook] API URL: {url}, params: {params}")
-        response = requests.get(url, params=params, timeout=10)
+        response = http_get(url, params=params, timeout=10)
         logger.debug(f"[query_severe_weather_outlook] Response status code: {response.status_code}")
         response.raise_for_status()
         data = response.json()
@@ -143,7 +183,7 @@ def query_weather_by_location(latitude: float, longitude: float) -> dict:
         url = f"{NOAA_WEATHER_API}/points/{latitude},{longitude}"
         
         logger.debug(f"[query_weather_by_location] API URL: {url}")
-        response = requests.get(url, timeout=10)
+        response = http_get(url, timeout=10)
         logger.debug(f"[query_weather_by_location] Response status code: {response.status_code}")
         response.raise_for_status()
         data = response.json()
@@ -8,30 +8,7 @@ from ..common.state_tools import update_agent_activity
 
 logger = logging.getLogger(__name__)
 
-
-def on_before_insights_agent(callback_context: CallbackContext):
-    """Update agent activity when insights agent starts."""
-    update_agent_activity(callback_context.state, "insights_agent", "running")
-    logger.info("[on_before_insights_agent] Insights agent started")
-    return None
-
-
-def on_after_insights_agent(callback_context: CallbackContext):
-    """Update agent activity when insights agent completes."""
-    update_agent_activity(callback_context.state, "insights_agent", "completed")
-    logger.info("[on_after_insights_agent] Insights agent completed")
-    return None
-
-
-def _create_insights_agent_internal():
-    """Create and return the internal Insights agent (wrapped by AgentTool)."""
-    logger.info("[_create_insights_agent_internal] Creating internal Insights agent")
-
-    insights_agent = Agent(
-        name="insights_agent",
-        model="gemini-2.5-flash",
-        description="Synthesizes disaster and relief data into comprehensive insights and action plans",
-        instruction="""You are the Insights Agent responsible for synthesizing disaster and relief data into comprehensive analysis and actionable intelligence.
+INSIGHTS_INSTRUCTION = """You are the Insights Agent responsible for synthesizing disaster and relief data into comprehensive analysis and actionable intelligence.
 
 Your role:
 1. Analyze disaster information provided by the first_responder_agent
@@ -91,11 +68,75 @@ Structure your analysis as follows:
 ## 📞 NEXT STEPS
 - Immediate actions for first responders
 - Coordination requirements
-- Follow-up monitoring needs""",
+- Follow-up monitoring needs"""
+
+
+def on_before_insights_agent(callback_context: CallbackContext):
+    """Update agent activity when insights agent starts."""
+    update_agent_activity(callback_context.state, "insights_agent", "running")
+    logger.info("[on_before_insights_agent] Insights agent started")
+    return None
+
+
+def on_after_insights_agent(callback_context: CallbackContext):
+    """Update agent activity when insights agent completes."""
+    update_agent_activity(callback_context.state, "insights_agent", "completed")
+    logger.info("[on_after_insights_agent] Insights agent completed")
+    return None
+
+
+def create_insights_agent():
+    """Create and return the Insights agent.
+
+    Used wrapped by AgentTool in the agentic workflow and run directly by the
+    briefing fast path, which makes this agent its only model call.
+    """
+    logger.info("[create_insights_agent] Creating Insights agent")
+
+    insights_agent = Agent(
+        name="insights_agent",
+        model="gemini-2.5-flash",
+        description="Synthesizes disaster and relief data into comprehensive insights and action plans",
+        instruction=INSIGHTS_INSTRUCTION,
+        before_agent_callback=on_before_insights_agent,
+        after_agent_callback=on_after_insights_agent,
+    )
+    logger.info("[create_insights_agent] Insights agent created successfully")
+    return insights_agent
+
+
+def create_insights_workflow_agent(disaster_key: str, relief_key: str):
+    """Create the Insights agent as the final step of the parallel briefing workflow.
+
+    Unlike the AgentTool variant, this agent reads the disaster and relief reports
+    from session state and its analysis is shown directly to the user.
+
+    Args:
+        disaster_key: State key holding the disaster discovery report
+        relief_key: State key holding the relief finder summary
+    """
+    logger.info("[create_insights_workflow_agent] Creating workflow Insights agent")
+
+    insights_agent = Agent(
+        name="insights_agent",
+        model="gemini-2.5-flash",
+        description="Synthesizes disaster and relief data into comprehensive insights and action plans",
+        instruction=INSIGHTS_INSTRUCTION + f"""
+
+## INPUT DATA
+The disaster and relief data were collected in parallel and are provided below.
+
+### Disaster Discovery Report
+{{{disaster_key}?}}
+
+### Relief Resources Report
+{{{relief_key}?}}""",
+        disallow_transfer_to_parent=True,
+        disallow_transfer_to_peers=True,
         before_agent_callback=on_before_insights_agent,
         after_agent_callback=on_after_insights_agent,
     )
-    logger.info("[_create_insights_agent_internal] Internal Insights agent created successfully")
+    logger.info("[create_insights_workflow_agent] Workflow Insights agent created successfully")
     return insights_agent
 
 
@@ -108,7 +149,7 @@ def create_insights_tool():
     """
     logger.info("[create_insights_tool] Creating Insights AgentTool")
 
-    insights_agent = _create_insights_agent_internal()
+    insights_agent = create_insights_agent()
     insights_tool = AgentTool(agent=insights_agent)
 
     logger.info("[create_insights_tool] Insights AgentTool created successfully")
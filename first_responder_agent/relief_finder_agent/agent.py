@@ -1,15 +1,30 @@
 """Relief Finder Agent - Finds relief resources including shelters, hospitals, and supplies."""
 
 import logging
+from typing import Optional
 from google.adk.agents import Agent
 from google.adk.agents.callback_context import CallbackContext
 from ..common.state_tools import update_agent_activity
+from ..common.search_places_tool import search_nearby_places_multi
+from ..common.location_store import publish_locations, publish_locations_callback
 from .shelter_finder_tool import find_shelters
 from .hospital_finder_tool import find_hospitals
 from .supply_finder_tool import find_supplies
+from .all_relief_tool import find_all_relief
 
 logger = logging.getLogger(__name__)
 
+# Final step when running as a transfer target of the root agent
+TRANSFER_RETURN = """STEP 3: RETURN (REQUIRED)
+Call transfer_to_agent to return to the calling agent.
+"""
+
+# Final step when running inside the parallel briefing workflow
+WORKFLOW_STEP_RETURN = """STEP 3: RETURN (REQUIRED)
+Respond with the summary from Step 2 as your final answer. It is saved for the insights agent.
+Do NOT call transfer_to_agent - the workflow continues automatically after your summary.
+"""
+
 
 def on_before_relief_agent(callback_context: CallbackContext):
     """Update agent activity when relief finder starts."""
@@ -20,13 +35,19 @@ def on_before_relief_agent(callback_context: CallbackContext):
 
 def on_after_relief_agent(callback_context: CallbackContext):
     """Update agent activity when relief finder completes."""
+    publish_locations(callback_context)
     update_agent_activity(callback_context.state, "relief_finder_agent", "completed")
     logger.info("[on_after_relief_agent] Relief finder agent completed")
     return None
 
 
-def create_relief_finder_agent():
-    """Create and return the Relief Finder agent."""
+def create_relief_finder_agent(output_key: Optional[str] = None):
+    """Create and return the Relief Finder agent.
+
+    Args:
+        output_key: When set, the agent runs as a workflow step: its final summary
+            is saved to this state key and it does not transfer back to a parent.
+    """
     logger.info("[create_relief_finder_agent] Creating Relief Finder agent")
 
     relief_finder = Agent(
@@ -37,49 +58,47 @@ def create_relief_finder_agent():
 
 You will receive coordinates (latitude, longitude) from the first_responder_agent.
 
-🚨 MANDATORY WORKFLOW - YOU MUST CALL ALL 3 TOOLS IN SEQUENCE 🚨
-
-You have access to THREE TOOLS:
-- find_shelters: Finds emergency shelters and lodging facilities
-- find_hospitals: Finds hospitals and medical facilities
-- find_supplies: Finds pharmacies and supply locations
-
-STEP 1: SHELTERS (REQUIRED)
-Call the find_shelters tool with the provided latitude and longitude coordinates.
+🚨 MANDATORY WORKFLOW 🚨
+
+You have access to these TOOLS:
+- find_all_relief: Finds shelters, hospitals AND supplies in ONE call (searches run in parallel)
+- find_shelters: Finds emergency shelters and lodging facilities only
+- find_hospitals: Finds hospitals and medical facilities only
+- find_supplies: Finds pharmacies and supply locations only
+- search_nearby_places_multi: Finds any mix of place types (police, fire_station, food, ...) in ONE call
+
+STEP 1: SEARCH (REQUIRED)
+Call the find_all_relief tool ONCE with the provided latitude and longitude coordinates.
+It returns all three resource types, ranked by distance.
+Only use find_shelters, find_hospitals or find_supplies if the user explicitly asks
+for a single resource type. If the user asks for other place types, call
+search_nearby_places_multi once with all of them.
 Wait for result, then IMMEDIATELY go to Step 2. DO NOT STOP.
 
-STEP 2: HOSPITALS (REQUIRED)
-Call the find_hospitals tool with the provided latitude and longitude coordinates.
-Wait for result, then IMMEDIATELY go to Step 3. DO NOT STOP.
-
-STEP 3: SUPPLIES (REQUIRED)
-Call the find_supplies tool with the provided latitude and longitude coordinates.
-Wait for result, then IMMEDIATELY go to Step 4. DO NOT STOP.
-
-STEP 4: SYNTHESIZE (REQUIRED)
+STEP 2: SYNTHESIZE (REQUIRED)
 Create a comprehensive summary of ALL THREE resource types (shelters, hospitals, supplies).
-Include results even if some tools found nothing.
+Include results even if some types found nothing or were marked partial.
 Format the results in natural language.
-Then IMMEDIATELY go to Step 5. DO NOT STOP.
-
-STEP 5: RETURN (REQUIRED)
-Call transfer_to_agent to return to the calling agent.
+Then IMMEDIATELY go to Step 3. DO NOT STOP.
 
+""" + (WORKFLOW_STEP_RETURN if output_key else TRANSFER_RETURN) + """
 ⚠️ CRITICAL RULES ⚠️
-- YOU MUST COMPLETE ALL 5 STEPS - NO EXCEPTIONS
-- DO NOT STOP after Step 1 (shelters) - you MUST continue to hospitals and supplies
-- DO NOT STOP after Step 2 (hospitals) - you MUST continue to supplies
-- DO NOT STOP after Step 3 (supplies) - you MUST synthesize and return
-- Empty results from any tool DO NOT mean you should stop
+- YOU MUST COMPLETE ALL 3 STEPS - NO EXCEPTIONS
+- Do NOT call find_shelters, find_hospitals and find_supplies one after another - use find_all_relief
+- Empty results from any resource type DO NOT mean you should stop
 - NEVER ask for user input or clarification
-- NEVER stop before completing all 5 steps
+- NEVER stop before completing all 3 steps
 - All tools automatically update the map with their findings
 
-If you stop before Step 5, you have FAILED your task.
+If you stop before Step 3, you have FAILED your task.
 """,
-        tools=[find_shelters, find_hospitals, find_supplies],
+        tools=[find_all_relief, find_shelters, find_hospitals, find_supplies, search_nearby_places_multi],
+        output_key=output_key,
+        disallow_transfer_to_parent=bool(output_key),
+        disallow_transfer_to_peers=bool(output_key),
         before_agent_callback=on_before_relief_agent,
         after_agent_callback=on_after_relief_agent,
+        before_model_callback=publish_locations_callback,
     )
     logger.info("[create_relief_finder_agent] Relief Finder agent created successfully")
     return relief_finder
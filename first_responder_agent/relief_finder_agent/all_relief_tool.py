@@ -0,0 +1,207 @@
+"""All Relief Finder Tool - Finds shelters, hospitals and supplies in one concurrent call."""
+
+import asyncio
+import logging
+from typing import Dict, Any, Callable, List, Optional
+from google.adk.tools import ToolContext
+from ..common.concurrency import run_legs, flatten_legs, group_results
+from ..common.geocoding import distance_meters
+from ..common.tracing import traced
+from ..common.state_tools import update_agent_activity
+from .shelter_finder_tool import shelter_legs, publish_shelters
+from .hospital_finder_tool import hospital_legs, publish_hospitals
+from .supply_finder_tool import supply_legs, publish_supplies
+
+logger = logging.getLogger(__name__)
+
+# Resource type -> (finder legs, finder publish, finder activity, BigQuery result key, Google Maps result key)
+RELIEF_FINDERS = {
+    "shelters": (shelter_legs, publish_shelters, "shelter_finder_agent", "bigquery_shelters", "maps_shelters"),
+    "hospitals": (hospital_legs, publish_hospitals, "hospital_finder_agent", "bigquery_hospitals", "maps_hospitals"),
+    "supplies": (supply_legs, publish_supplies, "supply_finder_agent", "bigquery_supplies", "maps_supplies"),
+}
+
+
+def _resource_coordinates(resource: Dict[str, Any]) -> Optional[tuple]:
+    """Extract (lat, lng) from a Google Maps location or a BigQuery row."""
+    lat = resource.get("lat", resource.get("LATITUDE"))
+    lng = resource.get("lng", resource.get("LONGITUDE"))
+    if lat is None or lng is None:
+        return None
+    try:
+        return float(lat), float(lng)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_relief_types(types: Optional[List[str]]) -> List[str]:
+    """Requested resource types in RELIEF_FINDERS (default: all); unknown ones are logged and dropped."""
+    requested = [t.lower() for t in types] if types else list(RELIEF_FINDERS)
+    unknown = [t for t in requested if t not in RELIEF_FINDERS]
+    if unknown:
+        logger.warning(f"[parse_relief_types] Ignoring unknown resource types: {unknown}")
+    return [t for t in requested if t in RELIEF_FINDERS]
+
+
+def relief_legs(
+    tool_context: ToolContext,
+    latitude: float,
+    longitude: float,
+    radius: int,
+    requested: List[str]
+) -> Dict[str, Callable[[], Any]]:
+    """
+    Build the data-only legs of every requested finder as one flat set and mark the finders running.
+
+    All BigQuery and Google Maps legs then run side by side in a single
+    run_legs call instead of one nested fan-out per finder.
+
+    Args:
+        tool_context: The tool context containing state
+        latitude: Latitude coordinate
+        longitude: Longitude coordinate
+        radius: Search radius in meters
+        requested: Resource types from RELIEF_FINDERS
+
+    Returns:
+        Legs for run_legs, named "<resource type>.<leg>"
+    """
+    groups = {}
+    for resource_type in requested:
+        legs_fn, _, activity, _, _ = RELIEF_FINDERS[resource_type]
+        update_agent_activity(tool_context.state, activity, "running")
+        groups[resource_type] = legs_fn(tool_context, latitude, longitude, radius)
+    return flatten_legs(groups)
+
+
+def publish_relief(
+    tool_context: ToolContext,
+    legs: Dict[str, Any],
+    timed_out: List[str],
+    latitude: float,
+    longitude: float,
+    radius: int,
+    requested: List[str]
+) -> Dict[str, Any]:
+    """
+    Apply each finder's finished legs to state and merge them into one distance-ranked result.
+
+    Call on the tool's thread once run_legs has returned over relief_legs().
+
+    Args:
+        tool_context: The tool context containing state
+        legs: Results of the legs that finished in time
+        timed_out: Names of the legs that timed out
+        latitude: Latitude coordinate
+        longitude: Longitude coordinate
+        radius: Search radius in meters
+        requested: Resource types passed to relief_legs
+
+    Returns:
+        Dict with per-type summaries and a distance-ranked list of resources
+    """
+    resources = []
+    summaries = {}
+    timed_out_types = []
+    for resource_type in requested:
+        _, publish_fn, activity, bq_key, maps_key = RELIEF_FINDERS[resource_type]
+        finder_legs, finder_timed_out = group_results(resource_type, legs, timed_out)
+        result = publish_fn(tool_context, finder_legs, finder_timed_out, latitude, longitude, radius)
+        update_agent_activity(tool_context.state, activity, "completed")
+        if finder_timed_out:
+            timed_out_types.append(resource_type)
+        summaries[resource_type] = result.get("summary", "")
+
+        for source, key in (("bigquery", bq_key), ("google_maps", maps_key)):
+            for resource in result.get(key, []):
+                entry = dict(resource)
+                entry["resource_type"] = resource_type
+                entry["source"] = source
+                coordinates = _resource_coordinates(resource)
+                entry["distance_m"] = (
+                    round(distance_meters(latitude, longitude, *coordinates))
+                    if coordinates else None
+                )
+                resources.append(entry)
+
+    # Rank by distance; resources without coordinates go last
+    resources.sort(key=lambda r: (r["distance_m"] is None, r["distance_m"] or 0))
+
+    counts = {t: sum(1 for r in resources if r["resource_type"] == t) for t in requested}
+    summary = f"Found {len(resources)} relief resource(s) within {radius/1000}km: " + ", ".join(
+        f"{counts[t]} {t}" for t in requested
+    ) + "."
+    if timed_out_types:
+        summary += " Some searches timed out; results are partial."
+
+    return {
+        "status": "success",
+        "latitude": latitude,
+        "longitude": longitude,
+        "radius": radius,
+        "types": requested,
+        "partial": bool(timed_out_types),
+        "timed_out_types": timed_out_types,
+        "counts": counts,
+        "summaries": summaries,
+        "resources": resources,
+        "summary": summary
+    }
+
+
+@traced("tool find_all_relief", "radius")
+async def find_all_relief(
+    tool_context: ToolContext,
+    latitude: float,
+    longitude: float,
+    radius: int = 5000,
+    types: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """
+    Find shelters, hospitals and supplies near the given coordinates in one call.
+
+    Runs the BigQuery and Google Maps legs of every requested finder
+    concurrently and returns a single merged list of resources ranked by
+    distance from the coordinates. All findings are added to the map, just
+    like the individual finder tools. The searches run off the event loop, so
+    other agents and sessions keep running while they wait.
+
+    Args:
+        tool_context: The tool context containing state
+        latitude: Latitude coordinate
+        longitude: Longitude coordinate
+        radius: Search radius in meters (default: 5000)
+        types: Resource types to search: "shelters", "hospitals", "supplies" (default: all)
+
+    Returns:
+        Dict with per-type summaries and a distance-ranked list of resources
+    """
+    try:
+        requested = parse_relief_types(types)
+
+        logger.info(f"[find_all_relief] 🧭 Starting relief search for {requested} near ({latitude}, {longitude})")
+
+        # Update agent activity to running
+        update_agent_activity(tool_context.state, "all_relief_finder_agent", "running")
+
+        legs, timed_out = await asyncio.to_thread(
+            run_legs, relief_legs(tool_context, latitude, longitude, radius, requested)
+        )
+        result = publish_relief(tool_context, legs, timed_out, latitude, longitude, radius, requested)
+
+        logger.info(f"[find_all_relief] ✅ Relief search completed: {result['summary']}")
+
+        # Update agent activity to completed
+        update_agent_activity(tool_context.state, "all_relief_finder_agent", "completed")
+
+        return result
+
+    except Exception as e:
+        logger.error(f"[find_all_relief] Error in relief search: {str(e)}")
+        update_agent_activity(tool_context.state, "all_relief_finder_agent", "completed")
+        return {
+            "status": "error",
+            "message": f"Error searching for relief resources: {str(e)}",
+            "latitude": latitude,
+            "longitude": longitude
+        }
@@ -1,15 +1,124 @@
 """Hospital Finder Tool - Finds available hospitals and medical facilities."""
 
 import logging
-from typing import Dict, Any
+from typing import Any, Callable, Dict, List
 from google.adk.tools import ToolContext
-from ..common.search_places_tool import search_nearby_places
+from ..common.concurrency import run_legs
+from ..common.search_places_tool import fetch_nearby_places, publish_nearby_places
+from ..common.tracing import traced
 from ..common.state_tools import update_agent_activity
-from ..common.bigquery_tools import check_hospital_capacity
+from ..common.bigquery_tools import fetch_hospital_capacity
 
 logger = logging.getLogger(__name__)
 
+# Activity entry of each leg, recorded on the calling thread around run_legs
+LEG_ACTIVITY = {"bigquery": "bigquery_hospital_tool", "maps": "maps_search_tool"}
 
+
+def hospital_legs(
+    tool_context: ToolContext,
+    latitude: float,
+    longitude: float,
+    radius: int = 5000
+) -> Dict[str, Callable[[], Any]]:
+    """
+    Build the data-only legs of a hospital search and mark them running.
+
+    Call on the tool's thread; the legs themselves write no session state.
+
+    Args:
+        tool_context: The tool context containing state
+        latitude: Latitude coordinate
+        longitude: Longitude coordinate
+        radius: Search radius in meters (default: 5000)
+
+    Returns:
+        Legs for run_legs: "bigquery" (hospital capacity) and "maps" (hospitals from Google Maps)
+    """
+    for activity in LEG_ACTIVITY.values():
+        update_agent_activity(tool_context.state, activity, "running")
+    return {
+        "bigquery": lambda: fetch_hospital_capacity(f"hospital_{latitude}_{longitude}"),
+        "maps": lambda: fetch_nearby_places(tool_context, latitude, longitude, "hospital", radius)
+    }
+
+
+def publish_hospitals(
+    tool_context: ToolContext,
+    legs: Dict[str, Any],
+    timed_out: List[str],
+    latitude: float,
+    longitude: float,
+    radius: int = 5000
+) -> Dict[str, Any]:
+    """
+    Apply the finished legs of a hospital search to state and build the tool result.
+
+    Call on the tool's thread once run_legs has returned; results of legs
+    that timed out are never applied.
+
+    Args:
+        tool_context: The tool context containing state
+        legs: Results of the legs from hospital_legs that finished in time
+        timed_out: Names of the legs that timed out
+        latitude: Latitude coordinate
+        longitude: Longitude coordinate
+        radius: Search radius in meters (default: 5000)
+
+    Returns:
+        Dict with hospital search results and summary
+    """
+    results = {
+        "status": "success",
+        "latitude": latitude,
+        "longitude": longitude,
+        "bigquery_hospitals": [],
+        "maps_hospitals": [],
+        "partial": bool(timed_out),
+        "timed_out_legs": timed_out,
+        "summary": ""
+    }
+
+    bq_result = legs.get("bigquery")
+    if bq_result is not None:
+        if bq_result.get("status") == "success":
+            results["bigquery_hospitals"] = bq_result.get("hospitals", [])
+            logger.info(f"[publish_hospitals] Found {len(results['bigquery_hospitals'])} hospitals from BigQuery")
+        else:
+            logger.info(f"[publish_hospitals] BigQuery hospital query: {bq_result.get('message', 'No data')}")
+
+    search = legs.get("maps")
+    if search is not None:
+        maps_result = publish_nearby_places(tool_context, search, latitude, longitude, radius)
+        if maps_result.get("status") == "success":
+            results["maps_hospitals"] = maps_result.get("locations", [])
+            logger.info(f"[publish_hospitals] Found {len(results['maps_hospitals'])} hospitals from Google Maps")
+        else:
+            logger.warning(f"[publish_hospitals] Google Maps search returned: {maps_result.get('message', 'Unknown error')}")
+
+    for activity in LEG_ACTIVITY.values():
+        update_agent_activity(tool_context.state, activity, "completed")
+
+    # Generate summary
+    total_hospitals = len(results["bigquery_hospitals"]) + len(results["maps_hospitals"])
+
+    if total_hospitals == 0:
+        results["summary"] = f"No hospitals found within {radius/1000}km of the location."
+    else:
+        summary_parts = []
+        if results["bigquery_hospitals"]:
+            summary_parts.append(f"{len(results['bigquery_hospitals'])} hospitals from emergency database")
+        if results["maps_hospitals"]:
+            summary_parts.append(f"{len(results['maps_hospitals'])} hospitals from Google Maps")
+
+        results["summary"] = f"Found {total_hospitals} total hospital(s): {' and '.join(summary_parts)}."
+
+    if timed_out:
+        results["summary"] += f" Partial results: {', '.join(timed_out)} search timed out."
+    return results
+
+
+@traced("tool find_hospitals", "radius")
 def find_hospitals(
     tool_context: ToolContext,
     latitude: float,
@@ -20,7 +129,9 @@ def find_hospitals(
     Find available hospitals and medical facilities near the given coordinates.
 
     This tool combines BigQuery hospital data with Google Maps Places API
-    to provide comprehensive medical facility information.
+    to provide comprehensive medical facility information. Both sources are
+    queried concurrently; if one misses its time budget the other's data is
+    still returned and "partial" is set.
 
     Args:
         tool_context: The tool context containing state
@@ -37,58 +148,10 @@ def find_hospitals(
         # Update agent activity to running
         update_agent_activity(tool_context.state, "hospital_finder_agent", "running")
 
-        results = {
-            "status": "success",
-            "latitude": latitude,
-            "longitude": longitude,
-            "bigquery_hospitals": [],
-            "maps_hospitals": [],
-            "summary": ""
-        }
-
-        # Step 1: Query BigQuery for hospital capacity data
-        logger.info(f"[find_hospitals] Step 1: Querying BigQuery for hospital data")
-        try:
-            bq_result = check_hospital_capacity(tool_context, f"hospital_{latitude}_{longitude}")
-            if bq_result.get("status") == "success":
-                results["bigquery_hospitals"] = bq_result.get("hospitals", [])
-                logger.info(f"[find_hospitals] Found {len(results['bigquery_hospitals'])} hospitals from BigQuery")
-            else:
-                logger.info(f"[find_hospitals] BigQuery hospital query: {bq_result.get('message', 'No data')}")
-        except Exception as e:
-            logger.error(f"[find_hospitals] Error querying BigQuery: {str(e)}")
-
-        # Step 2: Search Google Maps for hospitals
-        logger.info(f"[find_hospitals] Step 2: Searching Google Maps for hospitals")
-        try:
-            maps_result = search_nearby_places(
-                tool_context=tool_context,
-                latitude=latitude,
-                longitude=longitude,
-                place_type="hospital",
-                radius=radius
-            )
-            if maps_result.get("status") == "success":
-                results["maps_hospitals"] = maps_result.get("locations", [])
-                logger.info(f"[find_hospitals] Found {len(results['maps_hospitals'])} hospitals from Google Maps")
-            else:
-                logger.warning(f"[find_hospitals] Google Maps search returned: {maps_result.get('message', 'Unknown error')}")
-        except Exception as e:
-            logger.error(f"[find_hospitals] Error searching Google Maps: {str(e)}")
-
-        # Step 3: Generate summary
-        total_hospitals = len(results["bigquery_hospitals"]) + len(results["maps_hospitals"])
-
-        if total_hospitals == 0:
-            results["summary"] = f"No hospitals found within {radius/1000}km of the location."
-        else:
-            summary_parts = []
-            if results["bigquery_hospitals"]:
-                summary_parts.append(f"{len(results['bigquery_hospitals'])} hospitals from emergency database")
-            if results["maps_hospitals"]:
-                summary_parts.append(f"{len(results['maps_hospitals'])} hospitals from Google Maps")
-
-            results["summary"] = f"Found {total_hospitals} total hospital(s): {' and '.join(summary_parts)}."
+        # Run both legs concurrently; latency is max(BigQuery, Maps) instead of the sum
+        logger.info(f"[find_hospitals] Querying BigQuery and Google Maps concurrently")
+        legs, timed_out = run_legs(hospital_legs(tool_context, latitude, longitude, radius))
+        results = publish_hospitals(tool_context, legs, timed_out, latitude, longitude, radius)
 
         logger.info(f"[find_hospitals] ✅ Hospital search completed: {results['summary']}")
 
@@ -1,15 +1,124 @@
 """Shelter Finder Tool - Finds available shelters."""
 
 import logging
-from typing import Dict, Any
+from typing import Any, Callable, Dict, List
 from google.adk.tools import ToolContext
-from ..common.search_places_tool import search_nearby_places
+from ..common.concurrency import run_legs
+from ..common.search_places_tool import fetch_nearby_places, publish_nearby_places
+from ..common.tracing import traced
 from ..common.state_tools import update_agent_activity
-from ..common.bigquery_tools import get_available_shelter_info as bq_get_shelter_info
+from ..common.bigquery_tools import fetch_shelter_info
 
 logger = logging.getLogger(__name__)
 
+# Activity entry of each leg, recorded on the calling thread around run_legs
+LEG_ACTIVITY = {"bigquery": "bigquery_shelter_tool", "maps": "maps_search_tool"}
 
+
+def shelter_legs(
+    tool_context: ToolContext,
+    latitude: float,
+    longitude: float,
+    radius: int = 5000
+) -> Dict[str, Callable[[], Any]]:
+    """
+    Build the data-only legs of a shelter search and mark them running.
+
+    Call on the tool's thread; the legs themselves write no session state.
+
+    Args:
+        tool_context: The tool context containing state
+        latitude: Latitude coordinate
+        longitude: Longitude coordinate
+        radius: Search radius in meters (default: 5000)
+
+    Returns:
+        Legs for run_legs: "bigquery" (shelter database) and "maps" (lodging from Google Maps)
+    """
+    for activity in LEG_ACTIVITY.values():
+        update_agent_activity(tool_context.state, activity, "running")
+    return {
+        "bigquery": lambda: fetch_shelter_info(tool_context, latitude, longitude),
+        "maps": lambda: fetch_nearby_places(tool_context, latitude, longitude, "shelter", radius)
+    }
+
+
+def publish_shelters(
+    tool_context: ToolContext,
+    legs: Dict[str, Any],
+    timed_out: List[str],
+    latitude: float,
+    longitude: float,
+    radius: int = 5000
+) -> Dict[str, Any]:
+    """
+    Apply the finished legs of a shelter search to state and build the tool result.
+
+    Call on the tool's thread once run_legs has returned; results of legs
+    that timed out are never applied.
+
+    Args:
+        tool_context: The tool context containing state
+        legs: Results of the legs from shelter_legs that finished in time
+        timed_out: Names of the legs that timed out
+        latitude: Latitude coordinate
+        longitude: Longitude coordinate
+        radius: Search radius in meters (default: 5000)
+
+    Returns:
+        Dict with shelter search results and summary
+    """
+    results = {
+        "status": "success",
+        "latitude": latitude,
+        "longitude": longitude,
+        "bigquery_shelters": [],
+        "maps_shelters": [],
+        "partial": bool(timed_out),
+        "timed_out_legs": timed_out,
+        "summary": ""
+    }
+
+    bq_result = legs.get("bigquery")
+    if bq_result is not None:
+        if bq_result.get("status") == "success":
+            results["bigquery_shelters"] = bq_result.get("shelters", [])
+            logger.info(f"[publish_shelters] Found {len(results['bigquery_shelters'])} shelters from BigQuery")
+        else:
+            logger.info(f"[publish_shelters] BigQuery shelter query: {bq_result.get('message', 'No data')}")
+
+    search = legs.get("maps")
+    if search is not None:
+        maps_result = publish_nearby_places(tool_context, search, latitude, longitude, radius)
+        if maps_result.get("status") == "success":
+            results["maps_shelters"] = maps_result.get("locations", [])
+            logger.info(f"[publish_shelters] Found {len(results['maps_shelters'])} shelters from Google Maps")
+        else:
+            logger.warning(f"[publish_shelters] Google Maps search returned: {maps_result.get('message', 'Unknown error')}")
+
+    for activity in LEG_ACTIVITY.values():
+        update_agent_activity(tool_context.state, activity, "completed")
+
+    # Generate summary
+    total_shelters = len(results["bigquery_shelters"]) + len(results["maps_shelters"])
+
+    if total_shelters == 0:
+        results["summary"] = f"No shelters found within {radius/1000}km of the location."
+    else:
+        summary_parts = []
+        if results["bigquery_shelters"]:
+            summary_parts.append(f"{len(results['bigquery_shelters'])} shelters from emergency database")
+        if results["maps_shelters"]:
+            summary_parts.append(f"{len(results['maps_shelters'])} lodging facilities from Google Maps")
+
+        results["summary"] = f"Found {total_shelters} total shelter options: {' and '.join(summary_parts)}."
+
+    if timed_out:
+        results["summary"] += f" Partial results: {', '.join(timed_out)} search timed out."
+    return results
+
+
+@traced("tool find_shelters", "radius")
 def find_shelters(
     tool_context: ToolContext,
     latitude: float,
@@ -20,7 +129,9 @@ def find_shelters(
     Find available shelters near the given coordinates.
 
     This tool combines BigQuery shelter data with Google Maps Places API
-    to provide comprehensive shelter information.
+    to provide comprehensive shelter information. Both sources are queried
+    concurrently; if one misses its time budget the other's data is still
+    returned and "partial" is set.
 
     Args:
         tool_context: The tool context containing state
@@ -37,58 +148,10 @@ def find_shelters(
         # Update agent activity to running
         update_agent_activity(tool_context.state, "shelter_finder_agent", "running")
 
-        results = {
-            "status": "success",
-            "latitude": latitude,
-            "longitude": longitude,
-            "bigquery_shelters": [],
-            "maps_shelters": [],
-            "summary": ""
-        }
-
-        # Step 1: Query BigQuery for shelter data
-        logger.info(f"[find_shelters] Step 1: Querying BigQuery for shelter data")
-        try:
-            bq_result = bq_get_shelter_info(tool_context, latitude, longitude)
-            if bq_result.get("status") == "success":
-                results["bigquery_shelters"] = bq_result.get("shelters", [])
-                logger.info(f"[find_shelters] Found {len(results['bigquery_shelters'])} shelters from BigQuery")
-            else:
-                logger.warning(f"[find_shelters] BigQuery shelter query returned: {bq_result.get('message', 'Unknown error')}")
-        except Exception as e:
-            logger.error(f"[find_shelters] Error querying BigQuery: {str(e)}")
-
-        # Step 2: Search Google Maps for shelters
-        logger.info(f"[find_shelters] Step 2: Searching Google Maps for shelters")
-        try:
-            maps_result = search_nearby_places(
-                tool_context=tool_context,
-                latitude=latitude,
-                longitude=longitude,
-                place_type="shelter",
-                radius=radius
-            )
-            if maps_result.get("status") == "success":
-                results["maps_shelters"] = maps_result.get("locations", [])
-                logger.info(f"[find_shelters] Found {len(results['maps_shelters'])} shelters from Google Maps")
-            else:
-                logger.warning(f"[find_shelters] Google Maps search returned: {maps_result.get('message', 'Unknown error')}")
-        except Exception as e:
-            logger.error(f"[find_shelters] Error searching Google Maps: {str(e)}")
-
-        # Step 3: Generate summary
-        total_shelters = len(results["bigquery_shelters"]) + len(results["maps_shelters"])
-
-        if total_shelters == 0:
-            results["summary"] = f"No shelters found within {radius/1000}km of the location."
-        else:
-            summary_parts = []
-            if results["bigquery_shelters"]:
-                summary_parts.append(f"{len(results['bigquery_shelters'])} shelters from emergency database")
-            if results["maps_shelters"]:
-                summary_parts.append(f"{len(results['maps_shelters'])} lodging facilities from Google Maps")
-
-            results["summary"] = f"Found {total_shelters} total shelter options: {' and '.join(summary_parts)}."
+        # Run both legs concurrently; latency is max(BigQuery, Maps) instead of the sum
+        logger.info(f"[find_shelters] Querying BigQuery and Google Maps concurrently")
+        legs, timed_out = run_legs(shelter_legs(tool_context, latitude, longitude, radius))
+        results = publish_shelters(tool_context, legs, timed_out, latitude, longitude, radius)
 
         logger.info(f"[find_shelters] ✅ Shelter search completed: {results['summary']}")
 
@@ -106,4 +169,3 @@ def find_shelters(
             "latitude": latitude,
             "longitude": longitude
         }
-
@@ -1,15 +1,125 @@
 """Supply Finder Tool - Finds available relief supplies."""
 
 import logging
-from typing import Dict, Any
+from typing import Any, Callable, Dict, List
 from google.adk.tools import ToolContext
-from ..common.search_places_tool import search_nearby_places
+from ..common.concurrency import run_legs
+from ..common.search_places_tool import fetch_nearby_places, publish_nearby_places
+from ..common.tracing import traced
 from ..common.state_tools import update_agent_activity
-from ..common.bigquery_tools import check_supply_inventory
+from ..common.bigquery_tools import fetch_supply_inventory
 
 logger = logging.getLogger(__name__)
 
+# Activity entry of each leg, recorded on the calling thread around run_legs
+LEG_ACTIVITY = {"bigquery": "bigquery_supply_tool", "maps": "maps_search_tool"}
 
+
+def supply_legs(
+    tool_context: ToolContext,
+    latitude: float,
+    longitude: float,
+    radius: int = 5000
+) -> Dict[str, Callable[[], Any]]:
+    """
+    Build the data-only legs of a supply search and mark them running.
+
+    Call on the tool's thread; the legs themselves write no session state.
+
+    Args:
+        tool_context: The tool context containing state
+        latitude: Latitude coordinate
+        longitude: Longitude coordinate
+        radius: Search radius in meters (default: 5000)
+
+    Returns:
+        Legs for run_legs: "bigquery" (supply inventory) and "maps" (pharmacies
+        from Google Maps, which often have emergency supplies)
+    """
+    for activity in LEG_ACTIVITY.values():
+        update_agent_activity(tool_context.state, activity, "running")
+    return {
+        "bigquery": lambda: fetch_supply_inventory(f"supply_{latitude}_{longitude}"),
+        "maps": lambda: fetch_nearby_places(tool_context, latitude, longitude, "pharmacy", radius)
+    }
+
+
+def publish_supplies(
+    tool_context: ToolContext,
+    legs: Dict[str, Any],
+    timed_out: List[str],
+    latitude: float,
+    longitude: float,
+    radius: int = 5000
+) -> Dict[str, Any]:
+    """
+    Apply the finished legs of a supply search to state and build the tool result.
+
+    Call on the tool's thread once run_legs has returned; results of legs
+    that timed out are never applied.
+
+    Args:
+        tool_context: The tool context containing state
+        legs: Results of the legs from supply_legs that finished in time
+        timed_out: Names of the legs that timed out
+        latitude: Latitude coordinate
+        longitude: Longitude coordinate
+        radius: Search radius in meters (default: 5000)
+
+    Returns:
+        Dict with supply search results and summary
+    """
+    results = {
+        "status": "success",
+        "latitude": latitude,
+        "longitude": longitude,
+        "bigquery_supplies": [],
+        "maps_supplies": [],
+        "partial": bool(timed_out),
+        "timed_out_legs": timed_out,
+        "summary": ""
+    }
+
+    bq_result = legs.get("bigquery")
+    if bq_result is not None:
+        if bq_result.get("status") == "success":
+            results["bigquery_supplies"] = bq_result.get("supplies", [])
+            logger.info(f"[publish_supplies] Found {len(results['bigquery_supplies'])} supplies from BigQuery")
+        else:
+            logger.info(f"[publish_supplies] BigQuery supply query: {bq_result.get('message', 'No data')}")
+
+    search = legs.get("maps")
+    if search is not None:
+        maps_result = publish_nearby_places(tool_context, search, latitude, longitude, radius)
+        if maps_result.get("status") == "success":
+            results["maps_supplies"] = maps_result.get("locations", [])
+            logger.info(f"[publish_supplies] Found {len(results['maps_supplies'])} supply locations from Google Maps")
+        else:
+            logger.warning(f"[publish_supplies] Google Maps search returned: {maps_result.get('message', 'Unknown error')}")
+
+    for activity in LEG_ACTIVITY.values():
+        update_agent_activity(tool_context.state, activity, "completed")
+
+    # Generate summary
+    total_supplies = len(results["bigquery_supplies"]) + len(results["maps_supplies"])
+
+    if total_supplies == 0:
+        results["summary"] = f"No supply locations found within {radius/1000}km of the location."
+    else:
+        summary_parts = []
+        if results["bigquery_supplies"]:
+            summary_parts.append(f"{len(results['bigquery_supplies'])} supplies from emergency database")
+        if results["maps_supplies"]:
+            summary_parts.append(f"{len(results['maps_supplies'])} pharmacy/supply locations from Google Maps")
+
+        results["summary"] = f"Found {total_supplies} total supply location(s): {' and '.join(summary_parts)}."
+
+    if timed_out:
+        results["summary"] += f" Partial results: {', '.join(timed_out)} search timed out."
+    return results
+
+
+@traced("tool find_supplies", "radius")
 def find_supplies(
     tool_context: ToolContext,
     latitude: float,
@@ -20,7 +130,9 @@ def find_supplies(
     Find available relief supplies near the given coordinates.
 
     This tool combines BigQuery supply inventory data with Google Maps Places API
-    to help locate emergency supplies.
+    to help locate emergency supplies. Both sources are queried concurrently;
+    if one misses its time budget the other's data is still returned and
+    "partial" is set.
 
     Args:
         tool_context: The tool context containing state
@@ -37,58 +149,10 @@ def find_supplies(
         # Update agent activity to running
         update_agent_activity(tool_context.state, "supply_finder_agent", "running")
 
-        results = {
-            "status": "success",
-            "latitude": latitude,
-            "longitude": longitude,
-            "bigquery_supplies": [],
-            "maps_supplies": [],
-            "summary": ""
-        }
-
-        # Step 1: Query BigQuery for supply inventory data
-        logger.info(f"[find_supplies] Step 1: Querying BigQuery for supply inventory")
-        try:
-            bq_result = check_supply_inventory(tool_context, f"supply_{latitude}_{longitude}")
-            if bq_result.get("status") == "success":
-                results["bigquery_supplies"] = bq_result.get("supplies", [])
-                logger.info(f"[find_supplies] Found {len(results['bigquery_supplies'])} supplies from BigQuery")
-            else:
-                logger.info(f"[find_supplies] BigQuery supply query: {bq_result.get('message', 'No data')}")
-        except Exception as e:
-            logger.error(f"[find_supplies] Error querying BigQuery: {str(e)}")
-
-        # Step 2: Search Google Maps for pharmacies (often have emergency supplies)
-        logger.info(f"[find_supplies] Step 2: Searching Google Maps for pharmacies and supply locations")
-        try:
-            maps_result = search_nearby_places(
-                tool_context=tool_context,
-                latitude=latitude,
-                longitude=longitude,
-                place_type="pharmacy",
-                radius=radius
-            )
-            if maps_result.get("status") == "success":
-                results["maps_supplies"] = maps_result.get("locations", [])
-                logger.info(f"[find_supplies] Found {len(results['maps_supplies'])} supply locations from Google Maps")
-            else:
-                logger.warning(f"[find_supplies] Google Maps search returned: {maps_result.get('message', 'Unknown error')}")
-        except Exception as e:
-            logger.error(f"[find_supplies] Error searching Google Maps: {str(e)}")
-
-        # Step 3: Generate summary
-        total_supplies = len(results["bigquery_supplies"]) + len(results["maps_supplies"])
-
-        if total_supplies == 0:
-            results["summary"] = f"No supply locations found within {radius/1000}km of the location."
-        else:
-            summary_parts = []
-            if results["bigquery_supplies"]:
-                summary_parts.append(f"{len(results['bigquery_supplies'])} supplies from emergency database")
-            if results["maps_supplies"]:
-                summary_parts.append(f"{len(results['maps_supplies'])} pharmacy/supply locations from Google Maps")
-
-            results["summary"] = f"Found {total_supplies} total supply location(s): {' and '.join(summary_parts)}."
+        # Run both legs concurrently; latency is max(BigQuery, Maps) instead of the sum
+        logger.info(f"[find_supplies] Querying BigQuery and Google Maps concurrently")
+        legs, timed_out = run_legs(supply_legs(tool_context, latitude, longitude, radius))
+        results = publish_supplies(tool_context, legs, timed_out, latitude, longitude, radius)
 
         logger.info(f"[find_supplies] ✅ Supply search completed: {results['summary']}")
 
@@ -0,0 +1 @@
+"""Performance tooling for the First Responder Agent (trace viewers, benchmarks)."""
@@ -0,0 +1,317 @@
+"""End-to-end benchmark of the agent tree with scripted models and stand-ins.
+
+Runs root_agent through an ADK Runner with every model replaced by a
+perf.scripted_llm.ScriptedLlm and FEMA, NOAA, Google Maps and BigQuery served
+by perf.standins, so transfers, AgentTool calls, callbacks, state updates and
+tools all run for real while nothing leaves the process.
+
+Each run's wall time is split into:
+  model      simulated think time of the scripted models
+  state      session service append_event calls (event and state delta writes)
+  tool       ADK tool calls (execute_tool spans), excluding transfers and AgentTools
+  framework  everything else: flows, request building, callbacks, transfers
+
+When these overlap (nested AgentTool runs, ParallelAgent branches) the time
+goes to the first category in that order. AgentTool runs use their own
+in-memory session service, so their event writes count as framework.
+Sessions are in memory unless --session-db points at a SQLite file
+(agent/session_store.py), so state also covers the database writes.
+
+Usage:
+    python -m perf.agent_bench --runs 20
+    python -m perf.agent_bench --workflow parallel --discovery agents --concurrency 4
+    python -m perf.agent_bench --recorded sqlite.db --tokens-per-second 80
+    python -m perf.agent_bench --think-ms 500 --latency-scale 1.0 --json
+    python -m perf.agent_bench --session-db /tmp/bench.db --concurrency 8
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from opentelemetry.sdk.trace import ReadableSpan, SpanProcessor
+
+from perf.fixture_server import add_profile_arguments, standins_from_args
+from perf.scripted_llm import add_model_arguments, model_options_from_args, select_agent_tree
+from perf.standins import StandIns
+from perf.stats import summarize
+
+logger = logging.getLogger(__name__)
+
+APP_NAME = "first_responder_bench"
+USER_ID = "bench"
+
+CATEGORIES = ("model", "state", "tool", "framework")
+
+# ADK's bookkeeping span for function calls made in one model turn
+MERGED_TOOL_SPAN = "(merged)"
+
+
+class ToolSpanCollector(SpanProcessor):
+    """Keeps ADK execute_tool spans, grouped by trace."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.spans: Dict[int, List[Tuple[str, int, int]]] = defaultdict(list)
+
+    def on_start(self, span, parent_context=None) -> None:
+        pass
+
+    def on_end(self, span: ReadableSpan) -> None:
+        if span.name.startswith("execute_tool ") and span.end_time is not None:
+            with self._lock:
+                self.spans[span.get_span_context().trace_id].append(
+                    (span.name[len("execute_tool "):], span.start_time, span.end_time))
+
+    def shutdown(self) -> None:
+        pass
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return True
+
+
+def timed_session_service(session_db: Optional[str] = None):
+    """Session service that records the interval of every append_event, per session.
+
+    InMemorySessionService, or agent.session_store.SqliteSessionService on session_db
+    (tuned by the SESSION_DB_* variables, e.g. SESSION_DB_BATCH_MS=0 for inline writes).
+    """
+    from google.adk.sessions import InMemorySessionService
+    from agent.session_store import SqliteSessionService, sqlite_options_from_env
+
+    base = SqliteSessionService if session_db else InMemorySessionService
+
+    class TimedSessionService(base):
+        def __init__(self):
+            if session_db:
+                super().__init__(session_db, **sqlite_options_from_env())
+            else:
+                super().__init__()
+            self.appends: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+
+        async def append_event(self, session, event):
+            started = time.time_ns()
+            try:
+                return await super().append_event(session, event)
+            finally:
+                self.appends[session.id].append((started, time.time_ns()))
+
+    return TimedSessionService()
+
+
+def partition(start: int, end: int, layers: List[Tuple[str, List[Tuple[int, int]]]]) -> Dict[str, float]:
+    """Split [start, end] (ns) into seconds per category; overlaps go to the earliest layer."""
+    points = {start, end}
+    for _, intervals in layers:
+        for low, high in intervals:
+            points.update(point for point in (low, high) if start < point < end)
+    seconds = {name: 0.0 for name in CATEGORIES}
+    ordered = sorted(points)
+    for low, high in zip(ordered, ordered[1:]):
+        middle = (low + high) / 2
+        category = next((name for name, intervals in layers
+                         if any(a <= middle <= b for a, b in intervals)), "framework")
+        seconds[category] += (high - low) / 1e9
+    return seconds
+
+
+def _agent_names(agent: Any) -> List[str]:
+    from google.adk.tools.agent_tool import AgentTool
+
+    names = [agent.name]
+    for tool in getattr(agent, "tools", []) or []:
+        if isinstance(tool, AgentTool):
+            names.extend(_agent_names(tool.agent))
+    for sub_agent in agent.sub_agents:
+        names.extend(_agent_names(sub_agent))
+    return names
+
+
+async def _run_once(runner: Any, service: Any, query: str, index: int, collector: ToolSpanCollector,
+                    log: Any, control: set) -> Dict[str, Any]:
+    """One end-to-end run; returns its wall time breakdown."""
+    from google.genai import types
+    from first_responder_agent.common.tracing import tracer
+
+    session = await service.create_session(app_name=APP_NAME, user_id=USER_ID, session_id=f"bench-{index}-{uuid.uuid4().hex[:8]}")
+    message = types.Content(role="user", parts=[types.Part(text=query)])
+    events, error = 0, None
+    with tracer.start_as_current_span("bench run") as span:
+        trace_id = span.get_span_context().trace_id
+        started = time.time_ns()
+        try:
+            async for _ in runner.run_async(user_id=USER_ID, session_id=session.id, new_message=message):
+                events += 1
+        except Exception as e:
+            logger.error(f"[_run_once] Run {index} failed: {str(e)}", exc_info=True)
+            error = str(e)
+        ended = time.time_ns()
+
+    calls = log.for_trace(trace_id)
+    tool_spans = collector.spans.pop(trace_id, [])
+    tools = [(low, high) for name, low, high in tool_spans if name not in control]
+    seconds = partition(started, ended, [
+        ("model", [(call["start_ns"], call["end_ns"]) for call in calls]),
+        ("state", service.appends.pop(session.id, [])),
+        ("tool", tools),
+    ])
+    stored = await service.get_session(app_name=APP_NAME, user_id=USER_ID, session_id=session.id)
+    return {
+        "run": index,
+        "session_id": session.id,
+        "wall": (ended - started) / 1e9,
+        **seconds,
+        "events": events,
+        "model_calls": len(calls),
+        "model_calls_by_agent": dict(_count(call["agent"] for call in calls)),
+        "tool_calls": [(name, (high - low) / 1e9) for name, low, high in tool_spans if name not in control],
+        "state_bytes": len(json.dumps(stored.state, default=str)) if stored else 0,
+        "error": error,
+    }
+
+
+def _count(names) -> Dict[str, int]:
+    counts: Dict[str, int] = defaultdict(int)
+    for name in names:
+        counts[name] += 1
+    return counts
+
+
+async def run_benchmark(runs: int = 10, concurrency: int = 1, warmup: int = 1, query: Optional[str] = None,
+                        cold: bool = False, standins: Optional[StandIns] = None,
+                        model_options: Optional[Dict[str, Any]] = None,
+                        session_db: Optional[str] = None) -> Dict[str, Any]:
+    """Run root_agent `runs` times (plus warm-up runs) and summarize the breakdown."""
+    from google.adk.runners import Runner
+    from first_responder_agent.agent import root_agent
+    from first_responder_agent.common.cache import clear_all_caches
+    from first_responder_agent.common.tracing import add_span_processor
+    from perf.scripted_llm import DEFAULT_QUERY, ModelCallLog, install_scripted_models, uninstall_scripted_models
+
+    query = query or DEFAULT_QUERY
+    collector = ToolSpanCollector()
+    add_span_processor(collector)
+    log = ModelCallLog()
+    # Hand-offs are orchestration, not tool work
+    control = {"transfer_to_agent", MERGED_TOOL_SPAN, *_agent_names(root_agent)}
+
+    standins = (standins or StandIns()).install()
+    replaced = install_scripted_models(root_agent, log=log, **(model_options or {}))
+    service = timed_session_service(session_db)
+    runner = Runner(app_name=APP_NAME, agent=root_agent, session_service=service)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(index: int) -> Dict[str, Any]:
+        async with semaphore:
+            if cold:
+                clear_all_caches()
+            return await _run_once(runner, service, query, index, collector, log, control)
+
+    try:
+        clear_all_caches()
+        for index in range(warmup):
+            await bounded(-1 - index)
+        log.clear()
+        started = time.perf_counter()
+        results = await asyncio.gather(*(bounded(index) for index in range(runs)))
+        wall = time.perf_counter() - started
+    finally:
+        uninstall_scripted_models(replaced)
+        standins.uninstall()
+        if session_db:
+            service.close()
+
+    by_tool: Dict[str, List[float]] = defaultdict(list)
+    model_calls: Dict[str, int] = defaultdict(int)
+    for result in results:
+        for name, seconds in result["tool_calls"]:
+            by_tool[name].append(seconds)
+        for agent, count in result["model_calls_by_agent"].items():
+            model_calls[agent] += count
+
+    total_wall = sum(result["wall"] for result in results) or 1.0
+    return {
+        "runs": runs,
+        "concurrency": concurrency,
+        "workflow": os.getenv("FIRST_RESPONDER_WORKFLOW", "agentic"),
+        "discovery": os.getenv("DISASTER_DISCOVERY_MODE", "direct"),
+        "session_db": session_db,
+        "query": query,
+        "wall_seconds": wall,
+        "runs_per_second": runs / wall if wall else 0.0,
+        "errors": sum(1 for result in results if result["error"]),
+        "latency": {key: summarize([result[key] for result in results]) for key in ("wall", *CATEGORIES)},
+        "share": {key: sum(result[key] for result in results) / total_wall for key in CATEGORIES},
+        "events": summarize([result["events"] for result in results]),
+        "state_bytes": summarize([result["state_bytes"] for result in results]),
+        "model_calls_by_agent": dict(model_calls),
+        "by_tool": sorted(({"name": name, **summarize(values)} for name, values in by_tool.items()),
+                          key=lambda row: row["total"], reverse=True),
+        "upstream_calls": dict(standins.calls),
+        "results": [{key: value for key, value in result.items() if key != "tool_calls"} for result in results],
+    }
+
+
+def render(report: Dict[str, Any]) -> str:
+    """Human-readable report."""
+    lines = [
+        f"{report['runs']} runs of {report['workflow']} workflow ({report['discovery']} discovery), "
+        f"concurrency {report['concurrency']}: {report['wall_seconds']:.2f} s, {report['runs_per_second']:.2f} runs/s, "
+        f"{report['errors']} errors",
+        f"query: {report['query']}",
+        f"sessions: {report['session_db'] or 'in memory'}",
+        "",
+        f"  {'per run':<12} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9} {'share':>7}",
+    ]
+    for key in ("wall", *CATEGORIES):
+        stats = report["latency"][key]
+        share = f"{report['share'][key]:>7.1%}" if key in report["share"] else ""
+        lines.append(f"  {key:<12} {stats['p50'] * 1000:>9.2f} {stats['p95'] * 1000:>9.2f} {stats['max'] * 1000:>9.2f} {share}")
+    lines.append("")
+    lines.append(f"events per run p50 {report['events']['p50']:.0f}, final state p50 {report['state_bytes']['p50'] / 1024:.1f} KiB")
+    lines.append("Model calls: " + ", ".join(f"{agent}={count}" for agent, count in sorted(report["model_calls_by_agent"].items())))
+    lines.append("")
+    lines.append(f"  {'tool':<28} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}")
+    for row in report["by_tool"]:
+        lines.append(f"  {row['name']:<28} {row['count']:>6} {row['p50'] * 1000:>9.2f} {row['p95'] * 1000:>9.2f} {row['max'] * 1000:>9.2f}")
+    lines.append("")
+    lines.append("Upstream calls: " + ", ".join(f"{name}={count}" for name, count in sorted(report["upstream_calls"].items())))
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the agent tree end to end with scripted models and stand-ins")
+    parser.add_argument("--runs", type=int, default=10, help="Measured runs (default: 10)")
+    parser.add_argument("--concurrency", type=int, default=1, help="Runs in flight at once (default: 1)")
+    parser.add_argument("--warmup", type=int, default=1, help="Unmeasured runs first (default: 1)")
+    parser.add_argument("--cold", action="store_true", help="Clear tool caches before every run")
+    parser.add_argument("--query", help="User message for every run")
+    parser.add_argument("--session-db", metavar="PATH",
+                        help="Store sessions in this SQLite file (agent/session_store.py) instead of in memory")
+    parser.add_argument("--latency-scale", type=float, default=0.0,
+                        help="Multiplier for typical upstream latencies (default: 0, no simulated latency)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for jitter and error injection (default: 0)")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    parser.add_argument("--log-level", default="WARNING", help="Log level for the agents and tools (default: WARNING)")
+    add_model_arguments(parser)
+    add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=args.log_level.upper())
+    select_agent_tree(args)
+    report = asyncio.run(run_benchmark(args.runs, args.concurrency, args.warmup, args.query, args.cold,
+                                       standins_from_args(args), model_options_from_args(args), args.session_db))
+    print(json.dumps(report, indent=2) if args.json else render(report))
+    return 1 if report["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
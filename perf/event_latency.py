@@ -0,0 +1,249 @@
+"""Per-invocation latency breakdown from the ADK session event store.
+
+Rebuilds each invocation's timeline from the `events` table of a
+DatabaseSessionService database (e.g. sqlite.db) and attributes its wall time
+to model turns per agent, tool calls per tool, and framework overhead between
+steps. No extra instrumentation is needed.
+
+How ADK stamps events:
+  - A model event (text or function calls) is stamped when its LLM call starts.
+  - A function response event is stamped when its tool calls have finished.
+
+So the gap after a model event is that LLM turn, plus the tools it called when
+it is followed by their responses. For tool-calling turns the LLM part is
+estimated from the same agent's pure function-call turns (those that only
+call transfer_to_agent, whose tool time is negligible) and the rest goes to
+the tools. Gaps ending at a model event (response handling, callbacks, session
+writes) are overhead. Wall time ends at the last recorded event, so the
+generation of an invocation's final response is not included. Events from
+parallel branches are interleaved in the store; each gap is attributed to the
+event that opens it.
+
+Usage:
+    python -m perf.event_latency sqlite.db
+    python -m perf.event_latency sqlite.db --top 10
+    python -m perf.event_latency sqlite.db --session <session_id> --json
+"""
+
+import argparse
+import json
+import sqlite3
+import sys
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from perf.stats import percentile, summarize
+
+# Tools that only hand control to another agent (no I/O)
+CONTROL_TOOLS = {"transfer_to_agent"}
+
+
+def _parse_event(row: sqlite3.Row) -> Dict[str, Any]:
+    """Flatten one events row into the fields the timeline needs."""
+    content = json.loads(row["content"]) if row["content"] else {}
+    calls, responses, has_text = [], [], False
+    for part in content.get("parts") or []:
+        if part.get("function_call"):
+            calls.append(part["function_call"].get("name", "unknown"))
+        elif part.get("function_response"):
+            responses.append(part["function_response"].get("name", "unknown"))
+        elif part.get("text"):
+            has_text = True
+    return {
+        "session_id": row["session_id"],
+        "invocation_id": row["invocation_id"],
+        "author": row["author"],
+        "timestamp": datetime.fromisoformat(str(row["timestamp"])).timestamp(),
+        "role": content.get("role"),
+        "calls": calls,
+        "responses": responses,
+        "has_text": has_text,
+    }
+
+
+def load_invocations(path: str, session_id: Optional[str] = None) -> List[List[Dict[str, Any]]]:
+    """Read final (non-partial) events, grouped by invocation and ordered by time."""
+    connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    connection.row_factory = sqlite3.Row
+    query = (
+        "SELECT session_id, invocation_id, author, timestamp, content FROM events "
+        "WHERE (partial IS NULL OR partial = 0)"
+    )
+    params: List[str] = []
+    if session_id:
+        query += " AND session_id = ?"
+        params.append(session_id)
+    query += " ORDER BY invocation_id, timestamp"
+    try:
+        rows = connection.execute(query, params).fetchall()
+    finally:
+        connection.close()
+
+    invocations: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for row in rows:
+        event = _parse_event(row)
+        invocations[event["invocation_id"]].append(event)
+    return [events for events in invocations.values() if len(events) > 1]
+
+
+def _is_model_event(event: Dict[str, Any]) -> bool:
+    return event["author"] != "user" and event["role"] == "model"
+
+
+def pure_turn_baselines(invocations: List[List[Dict[str, Any]]]) -> Dict[Optional[str], float]:
+    """Median pure function-call turn per agent (key None: all agents)."""
+    samples: Dict[Optional[str], List[float]] = defaultdict(list)
+    for events in invocations:
+        for previous, current in zip(events, events[1:]):
+            if _is_model_event(previous) and previous["calls"] and current["responses"] \
+                    and all(name in CONTROL_TOOLS for name in previous["calls"]):
+                gap = current["timestamp"] - previous["timestamp"]
+                samples[previous["author"]].append(gap)
+                samples[None].append(gap)
+    return {agent: percentile(values, 50) for agent, values in samples.items()}
+
+
+def build_timeline(events: List[Dict[str, Any]], baselines: Dict[Optional[str], float]) -> Dict[str, Any]:
+    """Attribute one invocation's wall time to LLM, tool and overhead segments."""
+    start = events[0]["timestamp"]
+    segments = []
+    for previous, current in zip(events, events[1:]):
+        gap = max(current["timestamp"] - previous["timestamp"], 0.0)
+        offset = previous["timestamp"] - start
+        agent = previous["author"]
+        if not _is_model_event(previous):
+            segments.append({"kind": "overhead", "agent": current["author"], "name": current["author"],
+                             "offset": offset, "duration": gap})
+            continue
+
+        tools = [name for name in previous["calls"] if name not in CONTROL_TOOLS]
+        if not (tools and current["responses"]):
+            segments.append({"kind": "llm", "agent": agent, "name": agent, "offset": offset,
+                             "duration": gap, "estimated": False})
+            continue
+
+        llm = min(gap, baselines.get(agent, baselines.get(None, 0.0)))
+        segments.append({"kind": "llm", "agent": agent, "name": agent, "offset": offset,
+                         "duration": llm, "estimated": True})
+        window = gap - llm
+        for tool in tools:
+            # Calls from one turn run side by side: each call spans the window, wall time is shared
+            segments.append({"kind": "tool", "agent": agent, "name": tool, "offset": offset + llm,
+                             "duration": window, "wall": window / len(tools)})
+
+    totals = {"llm": 0.0, "tool": 0.0, "overhead": 0.0}
+    for segment in segments:
+        totals[segment["kind"]] += segment.get("wall", segment["duration"])
+    return {
+        "invocation_id": events[0]["invocation_id"],
+        "session_id": events[0]["session_id"],
+        "started_at": datetime.fromtimestamp(start).isoformat(sep=" ", timespec="seconds"),
+        "wall": events[-1]["timestamp"] - start,
+        "events": len(events),
+        "agents": sorted({event["author"] for event in events if event["author"] != "user"}),
+        **totals,
+        "segments": segments,
+    }
+
+
+def analyze(invocations: List[List[Dict[str, Any]]], top: int = 5) -> Dict[str, Any]:
+    """Timelines for every invocation plus p50/p95 rollups and the slowest invocations."""
+    baselines = pure_turn_baselines(invocations)
+    timelines = [build_timeline(events, baselines) for events in invocations]
+
+    llm_turns: Dict[str, List[float]] = defaultdict(list)
+    tool_calls: Dict[str, List[float]] = defaultdict(list)
+    overhead: Dict[str, List[float]] = defaultdict(list)
+    wall_share: Dict[str, float] = defaultdict(float)
+    for timeline in timelines:
+        for segment in timeline["segments"]:
+            key = f"{segment['kind']}:{segment['name']}"
+            wall_share[key] += segment.get("wall", segment["duration"])
+            target = {"llm": llm_turns, "tool": tool_calls, "overhead": overhead}[segment["kind"]]
+            target[segment["name"]].append(segment["duration"])
+
+    total_wall = sum(timeline["wall"] for timeline in timelines) or 1.0
+
+    def rollup(groups: Dict[str, List[float]], kind: str) -> List[Dict[str, Any]]:
+        rows = [{"name": name, **summarize(values), "wall_share": wall_share[f"{kind}:{name}"] / total_wall}
+                for name, values in groups.items()]
+        return sorted(rows, key=lambda row: row["total"], reverse=True)
+
+    slowest = sorted(timelines, key=lambda timeline: timeline["wall"], reverse=True)[:top]
+    return {
+        "invocations": len(timelines),
+        "events": sum(timeline["events"] for timeline in timelines),
+        "wall": summarize([timeline["wall"] for timeline in timelines]),
+        "llm": summarize([timeline["llm"] for timeline in timelines]),
+        "tool": summarize([timeline["tool"] for timeline in timelines]),
+        "overhead": summarize([timeline["overhead"] for timeline in timelines]),
+        "llm_by_agent": rollup(llm_turns, "llm"),
+        "tool_by_name": rollup(tool_calls, "tool"),
+        "overhead_by_agent": rollup(overhead, "overhead"),
+        "llm_turn_baselines": {agent or "*": value for agent, value in baselines.items()},
+        "slowest": slowest,
+    }
+
+
+def _table(title: str, rows: List[Dict[str, Any]]) -> List[str]:
+    lines = [title, f"  {'name':<32} {'count':>6} {'total s':>9} {'share':>6} {'p50 s':>7} {'p95 s':>7} {'max s':>7}"]
+    for row in rows:
+        lines.append(
+            f"  {row['name']:<32} {row['count']:>6} {row['total']:>9.2f} {row['wall_share']:>6.1%} "
+            f"{row['p50']:>7.2f} {row['p95']:>7.2f} {row['max']:>7.2f}"
+        )
+    return lines
+
+
+def render(report: Dict[str, Any]) -> str:
+    """Human-readable report."""
+    lines = [f"{report['invocations']} invocations, {report['events']} events", ""]
+    lines.append(f"  {'per invocation':<16} {'p50 s':>8} {'p95 s':>8} {'max s':>8} {'total s':>9}")
+    for key in ("wall", "llm", "tool", "overhead"):
+        stats = report[key]
+        lines.append(f"  {key:<16} {stats['p50']:>8.2f} {stats['p95']:>8.2f} {stats['max']:>8.2f} {stats['total']:>9.2f}")
+    lines.append("")
+    lines.extend(_table("LLM turns by agent (tool-calling turns estimated)", report["llm_by_agent"]))
+    lines.append("")
+    lines.extend(_table("Tool calls by tool", report["tool_by_name"]))
+    lines.append("")
+    lines.extend(_table("Overhead by agent", report["overhead_by_agent"]))
+
+    for timeline in report["slowest"]:
+        lines.append("")
+        lines.append(
+            f"invocation {timeline['invocation_id']} ({timeline['started_at']}, session {timeline['session_id']})  "
+            f"{timeline['wall']:.2f} s: llm {timeline['llm']:.2f} s, tool {timeline['tool']:.2f} s, "
+            f"overhead {timeline['overhead']:.2f} s"
+        )
+        for segment in timeline["segments"]:
+            if segment["kind"] == "overhead" and segment["duration"] < 0.05:
+                continue
+            label = segment["name"] if segment["kind"] != "tool" else f"{segment['name']} ({segment['agent']})"
+            marker = " ~" if segment.get("estimated") else ""
+            lines.append(f"  {segment['offset']:>8.2f} {segment['duration']:>7.2f} s  {segment['kind']:<8} {label}{marker}")
+    lines.append("")
+    lines.append("~ LLM part of a tool-calling turn, estimated from the agent's pure function-call turns")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Per-invocation latency breakdown from the ADK session event store")
+    parser.add_argument("path", help="Session database (e.g. sqlite.db)")
+    parser.add_argument("--session", help="Only analyze this session id")
+    parser.add_argument("--top", type=int, default=5, help="Number of slowest invocations to show (default: 5)")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv)
+
+    invocations = load_invocations(args.path, args.session)
+    if not invocations:
+        print(f"No invocations found in {args.path}", file=sys.stderr)
+        return 1
+    report = analyze(invocations, args.top)
+    print(json.dumps(report, indent=2) if args.json else render(report))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,218 @@
+"""Local HTTP fixture server for FEMA, NOAA, Google Maps and BigQuery.
+
+Serves the perf.standins responses over HTTP on one port (the upstreams' URL
+paths do not overlap), with per-upstream latency, jitter, injected errors and
+payload sizes. Point the app at it with the endpoint overrides it prints:
+
+    FEMA_API_BASE          OpenFEMA base URL (fema_live_agent)
+    NOAA_API_BASE          api.weather.gov base URL (noaa_live_agent)
+    GOOGLE_MAPS_BASE_URL   Geocoding and Places base URL (geocoding, search_places_tool)
+    BIGQUERY_API_ENDPOINT  BigQuery API endpoint, anonymous credentials (bigquery_tools)
+
+Usage:
+    python -m perf.fixture_server --port 8765
+    python -m perf.fixture_server --latency-ms 50 --latency-ms bigquery=1200 --jitter-ms 20
+    python -m perf.fixture_server --error-rate noaa=0.1 --error-status noaa=503
+    python -m perf.fixture_server --payload-scale noaa=50 --pad-bytes noaa=2000
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Union
+from urllib.parse import parse_qsl, urlsplit
+
+from perf.standins import StandIns, parse_profiles
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 8765
+
+# Accepted by googlemaps.Client, which rejects keys without this prefix
+STANDIN_MAPS_KEY = "AIzaStandInKey"
+STANDIN_PROJECT = "a4i-standin"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Forwards every request to the server's StandIns."""
+
+    protocol_version = "HTTP/1.1"
+    standins: StandIns = None
+
+    def _respond(self, method: str) -> None:
+        parts = urlsplit(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        try:
+            body = json.loads(raw) if raw else None
+        except ValueError:
+            body = None
+        upstream, status, payload = self.standins.handle(method, parts.path, dict(parse_qsl(parts.query)), body)
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=UTF-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("X-Stand-In", upstream)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self) -> None:
+        self._respond("GET")
+
+    def do_POST(self) -> None:
+        self._respond("POST")
+
+    def log_message(self, format: str, *args) -> None:
+        logger.debug(f"[fixture_server] {self.address_string()} {format % args}")
+
+
+class FixtureServer:
+    """Threaded HTTP server for the stand-ins, run in a background thread."""
+
+    def __init__(self, standins: Optional[StandIns] = None, host: str = "127.0.0.1", port: int = DEFAULT_PORT):
+        """Create the server (port 0 picks a free port)."""
+        self.standins = standins or StandIns()
+        handler = type("FixtureHandler", (_Handler,), {"standins": self.standins})
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def environment(self) -> Dict[str, str]:
+        """Environment variables that point the app's tools at this server."""
+        return {
+            "FEMA_API_BASE": f"{self.url}/api/open",
+            "NOAA_API_BASE": self.url,
+            "GOOGLE_MAPS_BASE_URL": self.url,
+            "GOOGLE_MAPS_API_KEY": STANDIN_MAPS_KEY,
+            "BIGQUERY_API_ENDPOINT": self.url,
+            "GCP_PROJECT": STANDIN_PROJECT,
+        }
+
+    def start(self) -> "FixtureServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="a4i-fixture-server", daemon=True)
+        self._thread.start()
+        logger.info(f"[FixtureServer.start] Serving stand-ins at {self.url}")
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def serve_forever(self) -> None:
+        self._server.serve_forever()
+
+
+def add_profile_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the per-upstream profile options ("upstream=value", or a bare value for all upstreams)."""
+    group = parser.add_argument_group("upstream profiles", "Repeatable; 'upstream=value' or a bare value for all of "
+                                      "fema, noaa, geocode, places, bigquery")
+    group.add_argument("--latency-ms", action="append", default=[], help="Fixed latency per call")
+    group.add_argument("--jitter-ms", action="append", default=[], help="Random extra latency, up to this much")
+    group.add_argument("--error-rate", action="append", default=[], help="Fraction of calls that fail")
+    group.add_argument("--error-status", action="append", default=[], help="HTTP status of injected failures (default 503)")
+    group.add_argument("--payload-scale", action="append", default=[], help="Multiplier for items per response")
+    group.add_argument("--pad-bytes", action="append", default=[], help="Extra text per item in large feeds (NOAA)")
+    group.add_argument("--cassettes", metavar="DIR",
+                       help="Replay recorded upstream responses from DIR (common/cassette.py) instead of the "
+                            "stand-ins; --latency-scale scales the recorded timing")
+
+
+class CassetteUpstreams:
+    """Upstream calls answered from recorded cassettes, in place of StandIns.
+
+    Leaves the real clients in place and turns on cassette replay
+    (UPSTREAM_CASSETTE_* variables), so it must be created before the tools
+    are imported. Same install/uninstall/calls/errors surface as StandIns.
+    """
+
+    def __init__(self, directory: str, latency_scale: float = 0.0):
+        os.environ["UPSTREAM_CASSETTE_MODE"] = "replay"
+        os.environ["UPSTREAM_CASSETTE_DIR"] = directory
+        os.environ["UPSTREAM_CASSETTE_TIMING_SCALE"] = str(latency_scale)
+        self.directory = directory
+        self.latency_scale = latency_scale
+
+    def _outcomes(self, *outcomes: str) -> Counter:
+        from first_responder_agent.common.cassette import get_cassette_store
+
+        store = get_cassette_store()
+        counts: Counter = Counter()
+        for key, count in (store.stats if store else {}).items():
+            name, outcome = key.rsplit(":", 1)
+            if outcome in outcomes:
+                counts[name] += count
+        return counts
+
+    @property
+    def calls(self) -> Counter:
+        return self._outcomes("replayed", "nearest", "missed")
+
+    @property
+    def errors(self) -> Counter:
+        return self._outcomes("missed")
+
+    def install(self) -> "CassetteUpstreams":
+        from first_responder_agent.common.cassette import get_cassette_store
+
+        if not os.path.isdir(self.directory):
+            raise FileNotFoundError(f"No cassette directory {self.directory}")
+        get_cassette_store()
+        return self
+
+    def uninstall(self) -> None:
+        pass
+
+
+def standins_from_args(args: argparse.Namespace) -> Union[StandIns, CassetteUpstreams]:
+    """StandIns configured from add_profile_arguments options, or CassetteUpstreams for --cassettes."""
+    if getattr(args, "cassettes", None):
+        return CassetteUpstreams(args.cassettes, latency_scale=getattr(args, "latency_scale", 0.0))
+    profiles = parse_profiles(args.latency_ms, args.jitter_ms, args.error_rate,
+                              args.error_status, args.payload_scale, args.pad_bytes)
+    return StandIns(latency_scale=getattr(args, "latency_scale", 0.0), profiles=profiles, seed=getattr(args, "seed", 0))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Serve FEMA/NOAA/Maps/BigQuery stand-ins over HTTP")
+    parser.add_argument("--host", default="127.0.0.1", help="Bind address (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port (default: {DEFAULT_PORT})")
+    parser.add_argument("--latency-scale", type=float, default=0.0,
+                        help="Multiplier for typical upstream latencies where --latency-ms is not set (default: 0)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for jitter and error injection (default: 0)")
+    add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+
+    if args.cassettes:
+        print("--cassettes replaces the stand-ins in-process; set UPSTREAM_CASSETTE_MODE=replay on the app instead",
+              file=sys.stderr)
+        return 2
+    logging.basicConfig(level=logging.INFO)
+    try:
+        server = FixtureServer(standins_from_args(args), args.host, args.port)
+    except ValueError as e:
+        print(str(e), file=sys.stderr)
+        return 2
+    print(f"Serving FEMA/NOAA/Maps/BigQuery stand-ins at {server.url}. Point the app at it with:")
+    for name, value in server.environment().items():
+        print(f"  export {name}={value}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
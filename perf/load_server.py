@@ -0,0 +1,124 @@
+"""agent/main.py served with scripted models and stand-ins, for load tests.
+
+Serves the real FastAPI app (AG-UI endpoint, state sync, /brief, /metrics)
+with every agent model replaced by perf.scripted_llm and FEMA, NOAA, Google
+Maps and BigQuery answered by perf.standins, so one process can be loaded
+without Gemini quota or network access. Adds GET /loadgen/stats with the
+process's event-loop lag samples, resident memory and session count; the
+lag monitor sleeps LAG_INTERVAL_SECONDS at a time and records how late it
+wakes up.
+
+Usage:
+    python -m perf.load_server --port 8010
+    python -m perf.load_server --think-ms 800 --tokens-per-second 80 --latency-scale 1.0
+    python -m perf.load_server --recorded sqlite.db --workflow parallel
+"""
+
+import argparse
+import asyncio
+import collections
+import logging
+import os
+import resource
+import sys
+import time
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from perf.fixture_server import add_profile_arguments, standins_from_args
+from perf.scripted_llm import add_model_arguments, install_scripted_models, model_options_from_args, select_agent_tree
+from perf.standins import StandIns
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 8010
+LAG_INTERVAL_SECONDS = 0.05
+MAX_LAG_SAMPLES = 100000
+
+
+def rss_bytes() -> int:
+    """Resident memory of this process (peak RSS where /proc is not available)."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Kilobytes on Linux, bytes on macOS
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class LoopLagMonitor:
+    """Samples event-loop lag: how late a short sleep wakes up."""
+
+    def __init__(self, interval: float = LAG_INTERVAL_SECONDS):
+        self.interval = interval
+        self.samples: Deque[Tuple[float, float]] = collections.deque(maxlen=MAX_LAG_SAMPLES)
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append((time.time(), max(time.perf_counter() - started - self.interval, 0.0)))
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def since(self, timestamp: float) -> List[float]:
+        return [lag for sampled_at, lag in list(self.samples) if sampled_at >= timestamp]
+
+
+def create_app(standins: Optional[StandIns] = None, model_options: Optional[Dict[str, Any]] = None) -> Any:
+    """agent.main's app with stand-ins, scripted models and the /loadgen/stats probe.
+
+    Call select_agent_tree (or set the workflow variables) first; the agent
+    tree is built when agent.main is imported.
+    """
+    (standins or StandIns()).install()
+    from ag_ui_adk.session_manager import SessionManager
+    from agent.main import app, root_agent
+
+    install_scripted_models(root_agent, **(model_options or {}))
+    monitor = LoopLagMonitor()
+    app.add_event_handler("startup", monitor.start)
+
+    @app.get("/loadgen/stats")
+    async def loadgen_stats(since: float = 0.0):
+        """Event-loop lag samples since `since` (epoch seconds), memory and session count."""
+        return {
+            "time": time.time(),
+            "lag_interval_seconds": monitor.interval,
+            "lag_seconds": monitor.since(since),
+            "rss_bytes": rss_bytes(),
+            "sessions": SessionManager.get_instance().get_session_count(),
+            "tasks": len(asyncio.all_tasks()),
+        }
+
+    return app
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Serve agent/main.py with scripted models and stand-ins")
+    parser.add_argument("--host", default="127.0.0.1", help="Bind address (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port (default: {DEFAULT_PORT})")
+    parser.add_argument("--latency-scale", type=float, default=0.0,
+                        help="Multiplier for typical upstream latencies (default: 0, no simulated latency)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for jitter and error injection (default: 0)")
+    parser.add_argument("--log-level", default="WARNING", help="Log level (default: WARNING)")
+    add_model_arguments(parser)
+    add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+
+    import uvicorn
+
+    select_agent_tree(args)
+    app = create_app(standins_from_args(args), model_options_from_args(args))
+    # agent.main configures INFO logging on import; load tests want quiet servers
+    logging.getLogger().setLevel(args.log_level.upper())
+    print(f"Serving agent/main.py with scripted models at http://{args.host}:{args.port}", flush=True)
+    uvicorn.run(app, host=args.host, port=args.port, log_level=args.log_level.lower(), access_log=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
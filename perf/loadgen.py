@@ -0,0 +1,287 @@
+"""Concurrent load generator for the AG-UI endpoint.
+
+Starts perf.load_server (agent/main.py with scripted models and stand-ins) on
+a free port, or targets --url, and ramps the number of concurrent AG-UI
+sessions through --stages. At each stage every virtual user holds its own
+thread (session) and runs --runs-per-user briefings one after another,
+resending its earlier user messages like the UI does.
+
+Per stage it reports p50/p95/p99 of:
+  first event   time until the first SSE event (RUN_STARTED)
+  first text    time until the first TEXT_MESSAGE_CONTENT
+  brief         time until RUN_FINISHED (the full briefing)
+and, from the server's /loadgen/stats, event-loop lag during the stage and
+resident memory per session held (sessions stay in memory until they time
+out, so this is the growth since the load test started divided by sessions
+created). Ramping stops early when the error rate passes --max-error-rate or
+p95 brief time passes --slo-p95-ms.
+
+Options not listed below are passed on to the spawned perf.load_server
+(e.g. --think-ms 800 --tokens-per-second 80 --latency-scale 1.0).
+
+Usage:
+    python -m perf.loadgen --stages 1,4,16,64
+    python -m perf.loadgen --stages 8,16,32 --runs-per-user 3 --think-ms 500 --tokens-per-second 60
+    python -m perf.loadgen --url http://127.0.0.1:8010 --stages 32 --slo-p95-ms 20000 --json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import socket
+import subprocess
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from perf.stats import percentile
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STAGES = "1,2,4,8,16,32"
+DEFAULT_QUERY = "Find emergency resources near Sunnyvale, CA"
+STARTUP_TIMEOUT_SECONDS = 120
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def latency(values: List[float]) -> Dict[str, float]:
+    """p50/p95/p99/max of a list of latencies."""
+    return {
+        "count": len(values),
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": max(values) if values else 0.0,
+    }
+
+
+def _run_input(thread_id: str, messages: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {
+        "threadId": thread_id,
+        "runId": str(uuid.uuid4()),
+        "state": {},
+        "messages": messages,
+        "tools": [],
+        "context": [],
+        "forwardedProps": {},
+    }
+
+
+async def run_briefing(client: Any, url: str, thread_id: str, messages: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """POST one AG-UI run and time its event stream."""
+    started = time.perf_counter()
+    result: Dict[str, Any] = {"first_event": None, "first_text": None, "brief": None, "events": 0, "bytes": 0, "error": None}
+    try:
+        async with client.stream("POST", url, json=_run_input(thread_id, messages),
+                                 headers={"Accept": "text/event-stream"}) as response:
+            if response.status_code != 200:
+                result["error"] = f"HTTP {response.status_code}"
+                return result
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                elapsed = time.perf_counter() - started
+                result["events"] += 1
+                result["bytes"] += len(line)
+                event_type = json.loads(line[len("data:"):]).get("type")
+                if result["first_event"] is None:
+                    result["first_event"] = elapsed
+                if event_type == "TEXT_MESSAGE_CONTENT" and result["first_text"] is None:
+                    result["first_text"] = elapsed
+                elif event_type == "RUN_FINISHED":
+                    result["brief"] = elapsed
+                elif event_type == "RUN_ERROR":
+                    result["error"] = "RUN_ERROR"
+    except Exception as e:
+        result["error"] = type(e).__name__
+    if result["brief"] is None and result["error"] is None:
+        result["error"] = "stream ended without RUN_FINISHED"
+    return result
+
+
+async def _user(client: Any, url: str, runs: int, query: str) -> List[Dict[str, Any]]:
+    """One virtual user: one thread, `runs` briefings in sequence."""
+    thread_id = f"load-{uuid.uuid4()}"
+    messages: List[Dict[str, Any]] = []
+    results = []
+    for _ in range(runs):
+        messages.append({"id": str(uuid.uuid4()), "role": "user", "content": query})
+        results.append(await run_briefing(client, url, thread_id, messages))
+    return results
+
+
+async def _server_stats(client: Any, url: str, since: float = 0.0) -> Optional[Dict[str, Any]]:
+    try:
+        response = await client.get(f"{url.rstrip('/')}/loadgen/stats", params={"since": since})
+        return response.json() if response.status_code == 200 else None
+    except Exception:
+        return None
+
+
+async def run_stage(client: Any, url: str, concurrency: int, runs_per_user: int, query: str,
+                    baseline: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Run `concurrency` users at once and summarize the stage."""
+    before = await _server_stats(client, url)
+    started_at = before["time"] if before else time.time()
+    started = time.perf_counter()
+    users = await asyncio.gather(*(_user(client, url, runs_per_user, query) for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+    after = await _server_stats(client, url, started_at)
+
+    results = [result for user in users for result in user]
+    ok = [result for result in results if result["error"] is None]
+    errors: Dict[str, int] = {}
+    for result in results:
+        if result["error"]:
+            errors[result["error"]] = errors.get(result["error"], 0) + 1
+    stage: Dict[str, Any] = {
+        "concurrency": concurrency,
+        "runs": len(results),
+        "errors": errors,
+        "error_rate": (len(results) - len(ok)) / len(results) if results else 0.0,
+        "wall_seconds": wall,
+        "briefs_per_second": len(ok) / wall if wall else 0.0,
+        "first_event": latency([result["first_event"] for result in results if result["first_event"] is not None]),
+        "first_text": latency([result["first_text"] for result in ok if result["first_text"] is not None]),
+        "brief": latency([result["brief"] for result in ok]),
+        "events_per_run": sum(result["events"] for result in ok) / len(ok) if ok else 0.0,
+        "bytes_per_run": sum(result["bytes"] for result in ok) / len(ok) if ok else 0.0,
+    }
+    if after:
+        sessions = after["sessions"] - baseline["sessions"] if baseline else after["sessions"]
+        growth = after["rss_bytes"] - baseline["rss_bytes"] if baseline else 0
+        stage.update({
+            "loop_lag": latency(after["lag_seconds"]),
+            "rss_bytes": after["rss_bytes"],
+            "sessions": after["sessions"],
+            "bytes_per_session": growth / sessions if sessions > 0 else 0.0,
+            "tasks": after["tasks"],
+        })
+    return stage
+
+
+async def ramp(url: str, stages: List[int], runs_per_user: int = 2, query: str = DEFAULT_QUERY,
+               slo_p95_seconds: Optional[float] = None, max_error_rate: float = 0.05) -> Dict[str, Any]:
+    """Run the stages in order; stop after the first stage that breaks the SLO or error budget."""
+    import httpx
+
+    limits = httpx.Limits(max_connections=max(stages) * 2 + 10, max_keepalive_connections=max(stages) * 2 + 10)
+    async with httpx.AsyncClient(timeout=httpx.Timeout(None, connect=30.0), limits=limits) as client:
+        # One unmeasured run so imports and first-call setup are not part of stage 1
+        await _user(client, url, 1, query)
+        baseline = await _server_stats(client, url)
+        results = []
+        capacity = None
+        for concurrency in stages:
+            stage = await run_stage(client, url, concurrency, runs_per_user, query, baseline)
+            results.append(stage)
+            logger.info(f"[ramp] concurrency {concurrency}: p95 brief {stage['brief']['p95']:.2f} s, "
+                        f"error rate {stage['error_rate']:.1%}")
+            within = stage["error_rate"] <= max_error_rate and (
+                slo_p95_seconds is None or stage["brief"]["p95"] <= slo_p95_seconds)
+            if not within:
+                break
+            capacity = concurrency
+    return {
+        "url": url,
+        "runs_per_user": runs_per_user,
+        "query": query,
+        "slo_p95_seconds": slo_p95_seconds,
+        "max_error_rate": max_error_rate,
+        "max_concurrency_within_slo": capacity,
+        "stages": results,
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def start_server(server_args: List[str], timeout: float = STARTUP_TIMEOUT_SECONDS) -> (subprocess.Popen, str):
+    """Start perf.load_server on a free port and wait for /health."""
+    import httpx
+
+    port = _free_port()
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [str(REPO_ROOT), os.getenv("PYTHONPATH")])))
+    process = subprocess.Popen([sys.executable, "-m", "perf.load_server", "--port", str(port), *server_args],
+                               cwd=str(REPO_ROOT), env=env)
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"perf.load_server exited with status {process.returncode}")
+        try:
+            if httpx.get(f"{url}/health", timeout=1.0).status_code == 200:
+                return process, url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    process.terminate()
+    raise RuntimeError(f"perf.load_server did not answer /health within {timeout:.0f} s")
+
+
+def render(report: Dict[str, Any]) -> str:
+    """Human-readable report."""
+    lines = [f"{report['url']}, {report['runs_per_user']} runs per user", ""]
+    lines.append(f"  {'users':>5} {'runs':>5} {'err':>5} {'brief/s':>8}  {'first event p50/p95/p99 ms':>27}  "
+                 f"{'brief p50/p95/p99 s':>21}  {'loop lag p95/p99/max ms':>24}  {'MiB/session':>11}")
+    for stage in report["stages"]:
+        first, brief = stage["first_event"], stage["brief"]
+        lag = stage.get("loop_lag")
+        lag_text = f"{lag['p95'] * 1000:.1f}/{lag['p99'] * 1000:.1f}/{lag['max'] * 1000:.1f}" if lag else "n/a"
+        per_session = f"{stage['bytes_per_session'] / 2**20:.2f}" if "bytes_per_session" in stage else "n/a"
+        lines.append(
+            f"  {stage['concurrency']:>5} {stage['runs']:>5} {stage['error_rate']:>5.0%} {stage['briefs_per_second']:>8.2f}  "
+            f"{first['p50'] * 1000:>9.1f}/{first['p95'] * 1000:.1f}/{first['p99'] * 1000:.1f}".ljust(57) +
+            f"  {brief['p50']:>7.2f}/{brief['p95']:.2f}/{brief['p99']:.2f}".ljust(23) +
+            f"  {lag_text:>24}  {per_session:>11}"
+        )
+        if stage["errors"]:
+            lines.append("        errors: " + ", ".join(f"{name}={count}" for name, count in stage["errors"].items()))
+    lines.append("")
+    if report["max_concurrency_within_slo"] is None:
+        lines.append("No stage stayed within the error budget" + (" and SLO" if report["slo_p95_seconds"] else ""))
+    else:
+        slo = f" and p95 brief <= {report['slo_p95_seconds']:.1f} s" if report["slo_p95_seconds"] else ""
+        lines.append(f"Highest concurrency with error rate <= {report['max_error_rate']:.0%}{slo}: "
+                     f"{report['max_concurrency_within_slo']}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Ramp concurrent AG-UI sessions against agent/main.py",
+                                     epilog="Other options are passed to the spawned perf.load_server.")
+    parser.add_argument("--url", help="Target server (default: start perf.load_server on a free port)")
+    parser.add_argument("--stages", default=DEFAULT_STAGES, help=f"Concurrent users per stage (default: {DEFAULT_STAGES})")
+    parser.add_argument("--runs-per-user", type=int, default=2, help="Briefings per user per stage (default: 2)")
+    parser.add_argument("--query", default=DEFAULT_QUERY, help="User message for every run")
+    parser.add_argument("--slo-p95-ms", type=float, help="Stop ramping once p95 brief time exceeds this")
+    parser.add_argument("--max-error-rate", type=float, default=0.05, help="Stop ramping above this error rate (default: 0.05)")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args, server_args = parser.parse_known_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    stages = [int(value) for value in args.stages.split(",") if value.strip()]
+    process = None
+    url = args.url
+    try:
+        if url is None:
+            process, url = start_server(server_args)
+        report = asyncio.run(ramp(url, stages, args.runs_per_user, args.query,
+                                  args.slo_p95_ms / 1000 if args.slo_p95_ms else None, args.max_error_rate))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=30)
+    print(json.dumps(report, indent=2) if args.json else render(report))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
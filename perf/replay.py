@@ -0,0 +1,325 @@
+"""Replay recorded tool calls from the session event store against the stand-ins.
+
+Pulls every function call out of the `events` table (e.g. sqlite.db) and
+re-executes it with its recorded arguments through the real tool functions,
+with FEMA, NOAA, Google Maps and BigQuery served by perf.standins. Recorded
+sessions keep their order and state: each session's invocations run in
+sequence against one session state, and each invocation is one workflow.
+
+Calls to tools that were renamed since recording are mapped onto the current
+tool (see LEGACY_TOOLS); agent transfers, AgentTool calls and unknown tools
+are skipped and counted. Caches are cleared before every iteration, so each
+iteration replays the same cold-start work.
+
+Usage:
+    python -m perf.replay sqlite.db
+    python -m perf.replay sqlite.db --iterations 5 --concurrency 8
+    python -m perf.replay sqlite.db --latency-scale 1.0 --json
+    python -m perf.replay sqlite.db --error-rate noaa=0.1 --payload-scale noaa=50
+"""
+
+import argparse
+import asyncio
+import inspect
+import json
+import logging
+import sqlite3
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from perf.fixture_server import add_profile_arguments, standins_from_args
+from perf.standins import StandIns
+from perf.stats import summarize
+
+logger = logging.getLogger(__name__)
+
+# Function calls that are not tool work: agent hand-offs and AgentTool wrappers
+SKIPPED_CALLS = {"transfer_to_agent", "big_query_data_agent", "google_maps_mcp_agent", "insights_agent"}
+
+
+def _storm_args(args: Dict[str, Any]) -> Dict[str, Any]:
+    return {"lat": args.get("latitude"), "long": args.get("longitude")}
+
+
+def _maps_search_args(args: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Translate the old Maps MCP text search into a typed nearby search."""
+    from first_responder_agent.common.search_places_tool import PLACE_TYPE_MAPPING
+
+    location = args.get("location") or {}
+    query = str(args.get("query", "")).lower()
+    place_type = next((name for name in PLACE_TYPE_MAPPING if name in query), None)
+    if place_type is None or "latitude" not in location:
+        return None
+    return {"latitude": location["latitude"], "longitude": location["longitude"],
+            "place_type": place_type, "radius": args.get("radius", 5000)}
+
+
+# Recorded tool name -> (current tool name, argument translation)
+LEGACY_TOOLS: Dict[str, Tuple[str, Callable[[Dict[str, Any]], Optional[Dict[str, Any]]]]] = {
+    "get_lat_long": ("geocode_location", lambda args: {"location": args.get("location_input")}),
+    "maps_geocode": ("geocode_location", lambda args: {"location": args.get("address")}),
+    "find_nearby_shelters": ("find_shelters", lambda args: args),
+    "get_supply_info": ("find_supplies", lambda args: {"latitude": args.get("lat"), "longitude": args.get("long")}),
+    "get_storm_data": ("get_ongoing_storms_info", _storm_args),
+    "get_ongoing_storms": ("get_ongoing_storms_info", _storm_args),
+    "query_storm_data": ("get_ongoing_storms_info", _storm_args),
+    "get_historical_storm_data": ("get_ongoing_storms_info", _storm_args),
+    "maps_search_places": ("search_nearby_places", _maps_search_args),
+}
+
+
+def tool_registry() -> Dict[str, Callable[..., Any]]:
+    """The current agent tools by name."""
+    from first_responder_agent.common.bigquery_tools import (
+        get_ongoing_storms_info, get_available_shelter_info, check_hospital_capacity, check_supply_inventory
+    )
+    from first_responder_agent.common.geocoding import geocode_location
+    from first_responder_agent.common.search_places_tool import search_nearby_places, search_nearby_places_multi
+    from first_responder_agent.disaster_discovery_agent.live_discovery_tool import discover_live_disasters
+    from first_responder_agent.disaster_discovery_agent.fema_live_agent.agent import (
+        query_disasters, query_disaster_declarations, query_fema_assistance, query_disaster_summary
+    )
+    from first_responder_agent.disaster_discovery_agent.noaa_live_agent.agent import (
+        query_active_alerts, query_active_alerts_for_point, query_weather_alerts_by_type,
+        query_severe_weather_outlook, query_weather_by_location
+    )
+    from first_responder_agent.relief_finder_agent.all_relief_tool import find_all_relief
+    from first_responder_agent.relief_finder_agent.hospital_finder_tool import find_hospitals
+    from first_responder_agent.relief_finder_agent.shelter_finder_tool import find_shelters
+    from first_responder_agent.relief_finder_agent.supply_finder_tool import find_supplies
+
+    tools = [
+        geocode_location, get_ongoing_storms_info, get_available_shelter_info, check_hospital_capacity,
+        check_supply_inventory, search_nearby_places, search_nearby_places_multi, discover_live_disasters,
+        query_disasters, query_disaster_declarations, query_fema_assistance, query_disaster_summary,
+        query_active_alerts, query_active_alerts_for_point, query_weather_alerts_by_type,
+        query_severe_weather_outlook, query_weather_by_location, find_all_relief, find_hospitals,
+        find_shelters, find_supplies,
+    ]
+    return {tool.__name__: tool for tool in tools}
+
+
+class ReplayContext:
+    """The parts of ADK's ToolContext the tools use: session state and the session id."""
+
+    def __init__(self, session_id: str):
+        self.state: Dict[str, Any] = {}
+        self.session = SimpleNamespace(id=session_id)
+
+
+def load_sessions(path: str) -> List[Dict[str, Any]]:
+    """Recorded function calls grouped by session and invocation, in recorded order."""
+    connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        rows = connection.execute(
+            "SELECT session_id, invocation_id, content FROM events "
+            "WHERE (partial IS NULL OR partial = 0) ORDER BY timestamp"
+        ).fetchall()
+    finally:
+        connection.close()
+
+    sessions: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
+    for session_id, invocation_id, content in rows:
+        invocation = sessions.setdefault(session_id, {}).setdefault(invocation_id, [])
+        for part in (json.loads(content) if content else {}).get("parts") or []:
+            if part.get("function_call"):
+                call = part["function_call"]
+                invocation.append({"name": call.get("name"), "args": call.get("args") or {}})
+    return [
+        {"session_id": session_id,
+         "invocations": [{"invocation_id": invocation_id, "calls": calls} for invocation_id, calls in invocations.items()]}
+        for session_id, invocations in sessions.items()
+    ]
+
+
+def resolve_call(call: Dict[str, Any], tools: Dict[str, Callable[..., Any]]) -> Optional[Tuple[str, Callable[..., Any], Dict[str, Any]]]:
+    """Map a recorded call onto a current tool and keyword arguments, or None if it is not replayable."""
+    name, args = call["name"], dict(call["args"])
+    if name in SKIPPED_CALLS:
+        return None
+    if name in LEGACY_TOOLS:
+        name, translate = LEGACY_TOOLS[name]
+        args = translate(args)
+        if args is None:
+            return None
+    tool = tools.get(name)
+    if tool is None:
+        return None
+    parameters = inspect.signature(tool).parameters
+    kwargs = {key: value for key, value in args.items() if key in parameters and value is not None}
+    missing = [key for key, parameter in parameters.items()
+               if parameter.default is inspect.Parameter.empty and key != "tool_context" and key not in kwargs]
+    if missing:
+        return None
+    return name, tool, kwargs
+
+
+def _call_status(result: Any) -> str:
+    if isinstance(result, dict):
+        return str(result.get("status", "ok"))
+    return "ok" if result is not None else "none"
+
+
+def replay_session(session: Dict[str, Any], tools: Dict[str, Callable[..., Any]], iteration: int) -> List[Dict[str, Any]]:
+    """Replay one recorded session; returns one record per workflow (invocation) with tool calls."""
+    from first_responder_agent.common.location_store import publish_locations
+
+    context = ReplayContext(f"replay-{iteration}-{session['session_id']}")
+    workflows = []
+    for invocation in session["invocations"]:
+        resolved = [call for call in (resolve_call(call, tools) for call in invocation["calls"]) if call]
+        if not resolved:
+            continue
+        calls = []
+        started = time.perf_counter()
+        for name, tool, kwargs in resolved:
+            if "tool_context" in inspect.signature(tool).parameters:
+                kwargs = {"tool_context": context, **kwargs}
+            call_started = time.perf_counter()
+            try:
+                result = tool(**kwargs)
+                if inspect.isawaitable(result):
+                    # Async tools; replay threads have no event loop of their own
+                    result = asyncio.run(result)
+                status = _call_status(result)
+            except Exception as e:
+                logger.error(f"[replay_session] {name} raised: {str(e)}", exc_info=True)
+                status = "exception"
+            calls.append({"tool": name, "seconds": time.perf_counter() - call_started, "status": status})
+        # The agents' callbacks write the invocation's map markers to state
+        publish_locations(context)
+        shape = []
+        for call in calls:
+            if not shape or shape[-1] != call["tool"]:
+                shape.append(call["tool"])
+        workflows.append({
+            "session_id": session["session_id"],
+            "invocation_id": invocation["invocation_id"],
+            "workflow": " > ".join(shape),
+            "seconds": time.perf_counter() - started,
+            "calls": calls,
+        })
+    return workflows
+
+
+def run(sessions: List[Dict[str, Any]], iterations: int = 3, concurrency: int = 1, standins: Optional[StandIns] = None) -> Dict[str, Any]:
+    """Replay all sessions `iterations` times and summarize throughput and latency."""
+    from first_responder_agent.common.cache import clear_all_caches
+
+    tools = tool_registry()
+    recorded = [call for session in sessions for invocation in session["invocations"] for call in invocation["calls"]]
+    skipped: Dict[str, int] = defaultdict(int)
+    for call in recorded:
+        if resolve_call(call, tools) is None:
+            skipped[call["name"]] += 1
+
+    standins = (standins or StandIns()).install()
+    workflows: List[Dict[str, Any]] = []
+    wall = 0.0
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="a4i-replay") as executor:
+            for iteration in range(iterations):
+                clear_all_caches()
+                started = time.perf_counter()
+                for result in executor.map(lambda session: replay_session(session, tools, iteration), sessions):
+                    workflows.extend(result)
+                wall += time.perf_counter() - started
+    finally:
+        standins.uninstall()
+
+    by_tool: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    by_workflow: Dict[str, List[float]] = defaultdict(list)
+    for workflow in workflows:
+        by_workflow[workflow["workflow"]].append(workflow["seconds"])
+        for call in workflow["calls"]:
+            by_tool[call["tool"]].append(call["seconds"])
+            if call["status"] in ("error", "exception"):
+                errors[call["tool"]] += 1
+
+    calls = sum(len(values) for values in by_tool.values())
+    return {
+        "iterations": iterations,
+        "concurrency": concurrency,
+        "latency_scale": standins.latency_scale,
+        "wall_seconds": wall,
+        "workflows": len(workflows),
+        "calls": calls,
+        "workflows_per_second": len(workflows) / wall if wall else 0.0,
+        "calls_per_second": calls / wall if wall else 0.0,
+        "workflow_latency": summarize([workflow["seconds"] for workflow in workflows]),
+        "by_tool": sorted(({"name": name, "errors": errors[name], **summarize(values)} for name, values in by_tool.items()),
+                          key=lambda row: row["total"], reverse=True),
+        "by_workflow": sorted(({"name": name, **summarize(values)} for name, values in by_workflow.items()),
+                              key=lambda row: row["total"], reverse=True),
+        "upstream_calls": dict(standins.calls),
+        "upstream_errors": dict(standins.errors),
+        "skipped_calls": dict(skipped),
+    }
+
+
+def _table(title: str, rows: List[Dict[str, Any]], name_width: int = 32) -> List[str]:
+    lines = [title, f"  {'name':<{name_width}} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9} {'total s':>8}"]
+    for row in rows:
+        name = row["name"] if len(row["name"]) <= name_width else row["name"][:name_width - 3] + "..."
+        errors = f"  ({row['errors']} errors)" if row.get("errors") else ""
+        lines.append(
+            f"  {name:<{name_width}} {row['count']:>6} {row['p50'] * 1000:>9.2f} {row['p95'] * 1000:>9.2f} "
+            f"{row['max'] * 1000:>9.2f} {row['total']:>8.2f}{errors}"
+        )
+    return lines
+
+
+def render(report: Dict[str, Any]) -> str:
+    """Human-readable report."""
+    latency = report["workflow_latency"]
+    lines = [
+        f"{report['iterations']} iterations, concurrency {report['concurrency']}, latency scale {report['latency_scale']}",
+        f"{report['workflows']} workflows, {report['calls']} tool calls in {report['wall_seconds']:.2f} s: "
+        f"{report['workflows_per_second']:.1f} workflows/s, {report['calls_per_second']:.1f} calls/s",
+        f"workflow latency p50 {latency['p50'] * 1000:.2f} ms, p95 {latency['p95'] * 1000:.2f} ms, "
+        f"max {latency['max'] * 1000:.2f} ms",
+        "",
+    ]
+    lines.extend(_table("Per tool", report["by_tool"]))
+    lines.append("")
+    lines.extend(_table("Per workflow", report["by_workflow"], name_width=60))
+    lines.append("")
+    lines.append("Upstream calls: " + ", ".join(f"{name}={count}" for name, count in sorted(report["upstream_calls"].items())))
+    if report["upstream_errors"]:
+        lines.append("Injected upstream errors: " + ", ".join(f"{name}={count}" for name, count in sorted(report["upstream_errors"].items())))
+    lines.append("Skipped recorded calls: " + ", ".join(f"{name}={count}" for name, count in sorted(report["skipped_calls"].items())))
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Replay recorded tool calls against local stand-ins")
+    parser.add_argument("path", help="Session database (e.g. sqlite.db)")
+    parser.add_argument("--iterations", type=int, default=3, help="Times to replay every session (default: 3)")
+    parser.add_argument("--concurrency", type=int, default=1, help="Sessions replayed at once (default: 1)")
+    parser.add_argument("--latency-scale", type=float, default=0.0,
+                        help="Multiplier for typical upstream latencies (default: 0, no simulated latency)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for jitter and error injection (default: 0)")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    parser.add_argument("--log-level", default="WARNING", help="Log level for the tools (default: WARNING)")
+    add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=args.log_level.upper())
+    # Before load_sessions imports the tools: --cassettes is read when their clients are created
+    standins = standins_from_args(args)
+    sessions = load_sessions(args.path)
+    if not any(invocation["calls"] for session in sessions for invocation in session["invocations"]):
+        print(f"No recorded tool calls found in {args.path}", file=sys.stderr)
+        return 1
+    report = run(sessions, args.iterations, args.concurrency, standins)
+    print(json.dumps(report, indent=2) if args.json else render(report))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,368 @@
+"""Scripted model backend for running the agent tree without Gemini calls.
+
+ScriptedLlm is an ADK BaseLlm that plays a fixed script per agent: which tool
+calls and transfers to make, in order, then a text answer. Each agent gets
+its own instance (install_scripted_models walks the tree, AgentTool agents
+included), and picks its next step by counting its own model turns since the
+user's message. Steps whose tools or transfer targets the agent does not have
+are dropped, so one script covers both workflow modes and both discovery modes.
+
+Tool arguments are templated from the conversation: the user's location, the
+coordinates returned by geocode_location (falling back to DEFAULT_COORDINATES)
+and, for the insights_agent call, the reports the other agents have written.
+Text answers are templated, or recorded answers from the session event store.
+
+Think time per model call is simulated with asyncio.sleep: a fixed time to
+first token (per agent, e.g. recorded medians from perf.event_latency) plus
+output tokens at a configurable rate. Every call is logged with its think
+interval so benchmarks can separate model latency from everything else.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple
+
+from google.adk.agents import LlmAgent
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.tools.agent_tool import AgentTool
+from google.genai import types
+from opentelemetry import trace
+from pydantic import PrivateAttr
+
+from perf.event_latency import load_invocations, pure_turn_baselines
+
+DEFAULT_QUERY = "Find emergency resources near Sunnyvale, CA"
+# Used when no geocode result is visible to the agent (e.g. AgentTool calls)
+DEFAULT_COORDINATES = (37.36883, -122.0363496)
+DEFAULT_STATE_CODE = "CA"
+DEFAULT_TEXT_WORDS = 120
+
+TRANSFER = "transfer_to_agent"
+
+# Agent name -> steps in order. A step makes its tool calls (several calls run
+# side by side), writes text, or both. "{name}" placeholders are filled from
+# the conversation; see ScriptedLlm._slots.
+SCRIPT: Dict[str, List[Dict[str, Any]]] = {
+    "first_responder": [
+        {"calls": [("geocode_location", {"location": "{location}"})]},
+        {"calls": [(TRANSFER, {"agent_name": "disaster_discovery_agent"})]},
+        {"calls": [(TRANSFER, {"agent_name": "relief_finder_agent"})]},
+        {"calls": [(TRANSFER, {"agent_name": "briefing_workflow"})]},
+        {"calls": [("insights_agent", {"request": "{reports}"})]},
+        {"text": True},
+    ],
+    "disaster_discovery_agent": [
+        {"calls": [("get_ongoing_storms_info", {"lat": "{lat}", "long": "{lng}"}),
+                   ("discover_live_disasters", {"latitude": "{lat}", "longitude": "{lng}"})]},
+        {"calls": [(TRANSFER, {"agent_name": "fema_live_agent"})]},
+        {"calls": [(TRANSFER, {"agent_name": "noaa_live_agent"})]},
+        {"text": True, "calls": [(TRANSFER, {"agent_name": "first_responder"})]},
+    ],
+    "fema_live_agent": [
+        {"calls": [("query_disasters", {"state": "{state}"})]},
+        {"text": True, "calls": [(TRANSFER, {"agent_name": "disaster_discovery_agent"})]},
+    ],
+    "noaa_live_agent": [
+        {"calls": [("query_active_alerts", {"state": "{state}"})]},
+        {"text": True, "calls": [(TRANSFER, {"agent_name": "disaster_discovery_agent"})]},
+    ],
+    "relief_finder_agent": [
+        {"calls": [("find_all_relief", {"latitude": "{lat}", "longitude": "{lng}"})]},
+        {"text": True, "calls": [(TRANSFER, {"agent_name": "first_responder"})]},
+    ],
+    "insights_agent": [
+        {"text": True},
+    ],
+}
+DEFAULT_SCRIPT = [{"text": True}]
+
+_CONTEXT_PREFIX = "For context:"
+_COORDINATES = re.compile(r"`geocode_location` tool returned result: \{'result': [\[(](-?\d+(?:\.\d+)?), (-?\d+(?:\.\d+)?)")
+_LOCATION = re.compile(r"\b(?:near|in|at|around|for)\s+(.+?)[.?!]*$", re.IGNORECASE)
+_STATE_CODE = re.compile(r",\s*([A-Z]{2})\b")
+
+
+class ModelCallLog:
+    """Thread-safe record of scripted model calls (shared by all instances of a run)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls: List[Dict[str, Any]] = []
+
+    def add(self, record: Dict[str, Any]) -> None:
+        with self._lock:
+            self.calls.append(record)
+
+    def for_trace(self, trace_id: int) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [call for call in self.calls if call["trace_id"] == trace_id]
+
+    def clear(self) -> None:
+        with self._lock:
+            self.calls.clear()
+
+
+class ScriptedLlm(BaseLlm):
+    """Plays SCRIPT for one agent with simulated think time."""
+
+    model: str = "scripted"
+    agent_name: str
+    script: List[Dict[str, Any]] = DEFAULT_SCRIPT
+    think_ms: float = 0.0
+    jitter_ms: float = 0.0
+    tokens_per_second: float = 0.0
+    text_words: int = DEFAULT_TEXT_WORDS
+    texts: List[str] = []
+    log: Optional[ModelCallLog] = None
+    seed: int = 0
+
+    _rng: random.Random = PrivateAttr(default=None)
+    _text_index: int = PrivateAttr(default=0)
+
+    def model_post_init(self, __context: Any) -> None:
+        self._rng = random.Random(f"{self.seed}:{self.agent_name}")
+
+    @staticmethod
+    def _current_turn(llm_request: LlmRequest) -> List[types.Content]:
+        """Contents since the last message typed by the user."""
+        for index in range(len(llm_request.contents) - 1, -1, -1):
+            content = llm_request.contents[index]
+            parts = content.parts or []
+            # Other agents' events are passed as user content starting with "For context:"
+            if content.role == "user" and parts and parts[0].text and not parts[0].text.startswith(_CONTEXT_PREFIX):
+                return llm_request.contents[index:]
+        return list(llm_request.contents)
+
+    @staticmethod
+    def _lines(turn: List[types.Content]) -> List[str]:
+        """The turn as text, with this agent's tool results in ADK's "For context" format."""
+        lines = []
+        for content in turn:
+            for part in content.parts or []:
+                if part.text:
+                    lines.append(part.text)
+                elif part.function_response:
+                    lines.append(f"`{part.function_response.name}` tool returned result: {part.function_response.response}")
+        return lines
+
+    def _slots(self, turn: List[types.Content]) -> Dict[str, Any]:
+        """Placeholder values for tool arguments and text templates."""
+        query = next((part.text for part in turn[0].parts or [] if part.text), DEFAULT_QUERY) if turn else DEFAULT_QUERY
+        lines = self._lines(turn)
+        match = _LOCATION.search(query.strip())
+        location = match.group(1) if match else query.strip()
+        state = _STATE_CODE.search(location)
+        latitude, longitude = DEFAULT_COORDINATES
+        for line in lines:
+            coordinates = _COORDINATES.search(line)
+            if coordinates:
+                latitude, longitude = float(coordinates.group(1)), float(coordinates.group(2))
+        reports = [line.split("] said: ", 1)[1] for line in lines if "] said: " in line]
+        return {
+            "query": query,
+            "location": location,
+            "state": state.group(1) if state else DEFAULT_STATE_CODE,
+            "lat": latitude,
+            "lng": longitude,
+            "reports": "\n\n".join(reports) or query,
+            "tool_results": [line.split("`")[1] for line in lines if "` tool returned result:" in line],
+        }
+
+    @staticmethod
+    def _fill(value: Any, slots: Dict[str, Any]) -> Any:
+        if isinstance(value, str):
+            exact = re.fullmatch(r"\{(\w+)\}", value)
+            return slots[exact.group(1)] if exact else value.format(**slots)
+        return value
+
+    def _applicable_steps(self, llm_request: LlmRequest) -> List[Dict[str, Any]]:
+        """Script steps reduced to the tools and transfer targets this agent has."""
+        instruction = str(llm_request.config.system_instruction or "") if llm_request.config else ""
+        steps = []
+        for step in self.script:
+            calls = [(name, args) for name, args in step.get("calls", [])
+                     if name in llm_request.tools_dict
+                     and (name != TRANSFER or f"Agent name: {args['agent_name']}\n" in instruction)]
+            if calls or step.get("text"):
+                steps.append({"text": step.get("text", False), "calls": calls})
+        return steps
+
+    def _text(self, slots: Dict[str, Any]) -> str:
+        if self.texts:
+            text = self.texts[self._text_index % len(self.texts)]
+            self._text_index += 1
+            return text
+        results = ", ".join(slots["tool_results"]) or "no tool results"
+        header = (f"{self.agent_name} report for {slots['location']} "
+                  f"({slots['lat']:.4f}, {slots['lng']:.4f}) based on {results}.")
+        filler = " ".join(f"finding-{index}" for index in range(max(self.text_words - len(header.split()), 0)))
+        return f"{header} {filler}".strip()
+
+    def _think_seconds(self, output_tokens: int) -> float:
+        think = self.think_ms + (self._rng.uniform(0, self.jitter_ms) if self.jitter_ms else 0.0)
+        if self.tokens_per_second:
+            think += output_tokens / self.tokens_per_second * 1000
+        return think / 1000
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        turn = self._current_turn(llm_request)
+        taken = sum(1 for content in turn if content.role == "model")
+        steps = self._applicable_steps(llm_request)
+        step = steps[taken] if taken < len(steps) else {"text": True, "calls": []}
+        slots = self._slots(turn)
+
+        parts = []
+        if step["text"]:
+            parts.append(types.Part(text=self._text(slots)))
+        for name, args in step["calls"]:
+            filled = {key: self._fill(value, slots) for key, value in args.items()}
+            parts.append(types.Part(function_call=types.FunctionCall(name=name, args=filled)))
+
+        # Rough token counts: ~4 characters per token
+        prompt_tokens = sum(len(str(part.text or part.function_call or part.function_response or ""))
+                            for content in llm_request.contents for part in content.parts or []) // 4
+        output_tokens = sum(len(part.text or "") + len(json.dumps(
+            part.function_call.args if part.function_call else {}, default=str)) for part in parts) // 4
+        think = self._think_seconds(output_tokens)
+        started = time.time_ns()
+        if think > 0:
+            await asyncio.sleep(think)
+        if self.log is not None:
+            self.log.add({
+                "agent": self.agent_name,
+                "trace_id": trace.get_current_span().get_span_context().trace_id,
+                "start_ns": started,
+                "end_ns": time.time_ns(),
+                "prompt_tokens": prompt_tokens,
+                "output_tokens": output_tokens,
+                "calls": [name for name, _ in step["calls"]],
+            })
+        yield LlmResponse(
+            content=types.Content(role="model", parts=parts),
+            usage_metadata=types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=prompt_tokens, candidates_token_count=output_tokens,
+                total_token_count=prompt_tokens + output_tokens),
+        )
+
+
+def _tree(agent: Any) -> List[Any]:
+    """Every agent under `agent`, including agents wrapped by AgentTool."""
+    agents = [agent]
+    for tool in getattr(agent, "tools", []) or []:
+        if isinstance(tool, AgentTool):
+            agents.extend(_tree(tool.agent))
+    for sub_agent in agent.sub_agents:
+        agents.extend(_tree(sub_agent))
+    return agents
+
+
+def install_scripted_models(root_agent: Any, log: Optional[ModelCallLog] = None,
+                            think_ms: Optional[Dict[str, float]] = None,
+                            texts: Optional[Dict[str, List[str]]] = None,
+                            **options: Any) -> List[Tuple[Any, Any]]:
+    """Give every LLM agent in the tree a ScriptedLlm.
+
+    Args:
+        root_agent: Root of the agent tree
+        log: Shared call log for the benchmark
+        think_ms: Time to first token per agent name (key None: all other agents)
+        texts: Recorded text answers per agent name
+        **options: Other ScriptedLlm fields (jitter_ms, tokens_per_second, text_words, seed)
+
+    Returns:
+        (agent, original model) pairs for uninstall_scripted_models
+    """
+    think_ms = think_ms or {}
+    texts = texts or {}
+    replaced = []
+    for agent in _tree(root_agent):
+        if not isinstance(agent, LlmAgent):
+            continue
+        replaced.append((agent, agent.model))
+        agent.model = ScriptedLlm(
+            agent_name=agent.name,
+            script=SCRIPT.get(agent.name, DEFAULT_SCRIPT),
+            think_ms=think_ms.get(agent.name, think_ms.get(None, 0.0)),
+            texts=texts.get(agent.name, []),
+            log=log,
+            **options,
+        )
+    return replaced
+
+
+def uninstall_scripted_models(replaced: List[Tuple[Any, Any]]) -> None:
+    """Restore the models replaced by install_scripted_models."""
+    for agent, model in replaced:
+        agent.model = model
+
+
+def recorded_texts(path: str) -> Dict[str, List[str]]:
+    """Final text answers per agent from the session event store."""
+    connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        rows = connection.execute(
+            "SELECT author, content FROM events WHERE author != 'user' "
+            "AND (partial IS NULL OR partial = 0) ORDER BY timestamp"
+        ).fetchall()
+    finally:
+        connection.close()
+    texts: Dict[str, List[str]] = defaultdict(list)
+    for author, content in rows:
+        parts = (json.loads(content) if content else {}).get("parts") or []
+        text = "".join(part.get("text") or "" for part in parts if not part.get("thought"))
+        if text.strip():
+            texts[author].append(text)
+    return dict(texts)
+
+
+def recorded_think_ms(path: str, scale: float = 1.0) -> Dict[Optional[str], float]:
+    """Median model turn per agent from the session event store, in ms (key None: all agents)."""
+    baselines = pure_turn_baselines(load_invocations(path))
+    return {agent: seconds * 1000 * scale for agent, seconds in baselines.items()}
+
+
+def add_model_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the agent tree and scripted model options."""
+    group = parser.add_argument_group("scripted model")
+    group.add_argument("--workflow", choices=["agentic", "parallel"], help="FIRST_RESPONDER_WORKFLOW for the agent tree")
+    group.add_argument("--discovery", choices=["direct", "agents"], help="DISASTER_DISCOVERY_MODE for the agent tree")
+    group.add_argument("--think-ms", type=float, default=0.0, help="Model time to first token per call (default: 0)")
+    group.add_argument("--think-jitter-ms", type=float, default=0.0, help="Random extra think time, up to this much")
+    group.add_argument("--tokens-per-second", type=float, default=0.0,
+                       help="Simulated output speed; 0 makes output instant (default: 0)")
+    group.add_argument("--recorded", metavar="DB",
+                       help="Session database with recorded answers and per-agent think times (overrides --think-ms)")
+    group.add_argument("--think-scale", type=float, default=1.0, help="Multiplier for recorded think times (default: 1)")
+
+
+def select_agent_tree(args: argparse.Namespace) -> None:
+    """Set the workflow environment variables from add_model_arguments options.
+
+    The agent tree reads them when first_responder_agent.agent is imported.
+    """
+    if args.workflow:
+        os.environ["FIRST_RESPONDER_WORKFLOW"] = args.workflow
+    if args.discovery:
+        os.environ["DISASTER_DISCOVERY_MODE"] = args.discovery
+
+
+def model_options_from_args(args: argparse.Namespace) -> Dict[str, Any]:
+    """install_scripted_models options from add_model_arguments options."""
+    options: Dict[str, Any] = {"think_ms": {None: args.think_ms}, "jitter_ms": args.think_jitter_ms,
+                               "tokens_per_second": args.tokens_per_second, "seed": getattr(args, "seed", 0)}
+    if args.recorded:
+        options["think_ms"] = recorded_think_ms(args.recorded, args.think_scale)
+        options["texts"] = recorded_texts(args.recorded)
+    return options
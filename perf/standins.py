@@ -0,0 +1,686 @@
+"""Stand-ins for the upstream APIs (FEMA, NOAA, Google Maps, BigQuery).
+
+Responses are synthetic but shaped like the real APIs, and deterministic: the
+same request always returns the same payload. Each upstream has a profile
+(UpstreamProfile) for simulated latency, injected errors and payload size.
+
+The stand-ins can be served two ways:
+  - In-process, installed at the client seams the tools already use
+    (StandIns.install): a transport adapter on the shared HTTP session for
+    FEMA, NOAA and Geocoding, and stand-in Places and BigQuery clients. Used
+    by perf.replay.
+  - Over HTTP by perf.fixture_server, which the app reaches through the
+    endpoint overrides (FEMA_API_BASE, NOAA_API_BASE, GOOGLE_MAPS_BASE_URL,
+    BIGQUERY_API_ENDPOINT).
+
+Simulated latency is off by default, so benchmarks measure the tools' own
+overhead; latency_scale=1.0 adds typical upstream latencies.
+"""
+
+import base64
+import json
+import os
+import random
+import re
+import threading
+import time
+import uuid
+import zlib
+from collections import Counter, OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+import requests
+from requests.adapters import BaseAdapter
+
+UPSTREAMS = ("fema", "noaa", "geocode", "places", "bigquery")
+
+# Real hosts answered by the in-process transport adapter
+HOSTS = ("www.fema.gov", "api.weather.gov", "maps.googleapis.com")
+
+# Typical upstream latencies in seconds, applied with latency_scale
+TYPICAL_LATENCY_SECONDS = {
+    "fema": 0.4,
+    "noaa": 0.3,
+    "geocode": 0.1,
+    "places": 0.35,
+    "bigquery": 1.5,
+}
+
+PLACES_PAGE_SIZE = 20
+PLACES_MAX_PAGES = 3
+FEMA_COUNTIES_PER_DISASTER = 4
+NOAA_ALERT_COUNT = 10
+MAX_BIGQUERY_JOBS = 1024
+
+STATES = ["CA", "TX", "FL", "LA", "NC", "NY", "OK", "WA", "CO", "AZ"]
+INCIDENT_TYPES = ["Fire", "Flood", "Hurricane", "Severe Storm", "Tornado", "Earthquake", "Winter Storm"]
+ALERT_EVENTS = ["Flood Warning", "Red Flag Warning", "Heat Advisory", "Wind Advisory", "Tornado Watch",
+                "Severe Thunderstorm Warning", "Winter Storm Warning"]
+SEVERITIES = ["Minor", "Moderate", "Severe", "Extreme"]
+PLACE_NAMES = {
+    "hospital": ["Medical Center", "General Hospital", "Community Hospital", "Urgent Care"],
+    "lodging": ["Inn", "Suites", "Motel", "Lodge"],
+    "pharmacy": ["Pharmacy", "Drug Store", "Rx"],
+    "police": ["Police Department", "Sheriff Station"],
+    "fire_station": ["Fire Station", "Fire Rescue"],
+    "restaurant": ["Cafe", "Diner", "Kitchen"],
+    "store": ["Market", "Hardware", "Supply Co."],
+}
+# Geocoded exactly, so replayed sessions keep their recorded coordinates
+KNOWN_PLACES = {
+    "sunnyvale": (37.36883, -122.0363496, "CA"),
+    "san francisco": (37.7749295, -122.4194155, "CA"),
+    "los angeles": (34.0549076, -118.242643, "CA"),
+    "houston": (29.7600771, -95.3701108, "TX"),
+    "miami": (25.7616798, -80.1917902, "FL"),
+    "new orleans": (29.9508941, -90.0758316, "LA"),
+}
+STREETS = ["Main St", "Oak Ave", "El Camino Real", "Mathilda Ave", "Central Expy", "Washington Blvd"]
+
+
+def _rng(*parts: Any) -> random.Random:
+    """Random generator seeded by the request, so responses are repeatable."""
+    return random.Random(zlib.crc32(repr(parts).encode("utf-8")))
+
+
+def _point_near(rng: random.Random, latitude: float, longitude: float, radius_meters: float) -> Tuple[float, float]:
+    """A random point within roughly radius_meters of a coordinate."""
+    degrees = radius_meters / 111320.0
+    return (round(latitude + rng.uniform(-degrees, degrees) * 0.7, 7),
+            round(longitude + rng.uniform(-degrees, degrees) * 0.7, 7))
+
+
+# ============ PAYLOADS ============
+
+def fema_declarations(params: Dict[str, str]) -> Dict[str, Any]:
+    """OpenFEMA DisasterDeclarationsSummaries response ($top rows, several counties per disaster)."""
+    top = int(params.get("$top", 1000))
+    match = re.search(r"(\w+) eq '?([^']+)'?", params.get("$filter", ""))
+    field, value = match.groups() if match else (None, None)
+    state = value if field == "state" else None
+    rng = _rng("fema", params.get("$filter"))
+
+    rows = []
+    disaster_number = 4000 + rng.randint(0, 800)
+    while len(rows) < top:
+        disaster_number += rng.randint(1, 20)
+        incident = value if field == "incidentType" else rng.choice(INCIDENT_TYPES)
+        row_state = state or rng.choice(STATES)
+        begin = f"2025-{rng.randint(1, 9):02d}-{rng.randint(1, 28):02d}T00:00:00.000Z"
+        for county in range(FEMA_COUNTIES_PER_DISASTER):
+            if len(rows) >= top:
+                break
+            rows.append({
+                "femaDeclarationString": f"DR-{disaster_number}-{row_state}",
+                "disasterNumber": disaster_number,
+                "state": row_state,
+                "declarationType": "DR",
+                "declarationDate": begin,
+                "fyDeclared": 2025,
+                "incidentType": incident,
+                "declarationTitle": f"{incident.upper()} {rng.choice(['EVENT', 'COMPLEX', 'SYSTEM'])}",
+                "ihProgramDeclared": rng.random() < 0.5,
+                "iaProgramDeclared": False,
+                "paProgramDeclared": True,
+                "hmProgramDeclared": True,
+                "incidentBeginDate": begin,
+                "incidentEndDate": None,
+                "fipsStateCode": "06",
+                "fipsCountyCode": f"{county * 2 + 1:03d}",
+                "designatedArea": f"County {county + 1} (County)",
+                "declarationRequestNumber": f"25{rng.randint(100, 999)}",
+                "lastRefresh": "2025-10-16T00:00:00.000Z",
+                "id": f"{disaster_number:06d}-{county:02d}",
+            })
+    return {"metadata": {"skip": 0, "top": top, "count": 0}, "DisasterDeclarationsSummaries": rows}
+
+
+def noaa_alerts(params: Dict[str, str], count: int = NOAA_ALERT_COUNT, pad_bytes: int = 0) -> Dict[str, Any]:
+    """api.weather.gov /alerts/active GeoJSON feature collection.
+
+    Args:
+        params: Query parameters
+        count: Number of alert features
+        pad_bytes: Extra description text per alert (real statewide feeds run to several MB)
+    """
+    rng = _rng("noaa_alerts", sorted(params.items()))
+    features = []
+    for index in range(count):
+        event = params.get("event") or rng.choice(ALERT_EVENTS)
+        alert_id = f"urn:oid:2.49.0.1.840.0.{rng.getrandbits(64):016x}.{index:03d}.1"
+        features.append({
+            "id": f"https://api.weather.gov/alerts/{alert_id}",
+            "type": "Feature",
+            "geometry": None,
+            "properties": {
+                "id": alert_id,
+                "areaDesc": f"Zone {rng.randint(1, 99)}; Zone {rng.randint(100, 199)}",
+                "geocode": {"SAME": [f"006{rng.randint(1, 115):03d}"], "UGC": [f"CAZ{rng.randint(1, 599):03d}"]},
+                "sent": "2025-10-16T12:00:00-07:00",
+                "effective": "2025-10-16T12:00:00-07:00",
+                "expires": "2025-10-17T12:00:00-07:00",
+                "status": "Actual",
+                "messageType": "Alert",
+                "category": "Met",
+                "severity": rng.choice(SEVERITIES),
+                "certainty": "Likely",
+                "urgency": "Expected",
+                "event": event,
+                "senderName": "NWS Stand-in",
+                "headline": f"{event} issued October 16 by NWS",
+                "description": f"* WHAT...{event} conditions expected.\n\n* WHERE...Portions of the area.\n\n"
+                               f"* WHEN...Through Friday evening." + " Stand-in detail." * (pad_bytes // 17),
+                "instruction": "Monitor local media and follow instructions from officials.",
+                "response": "Prepare",
+            },
+        })
+    return {"type": "FeatureCollection", "features": features, "title": "Current watches, warnings, and advisories"}
+
+
+def noaa_point(latitude: float, longitude: float) -> Dict[str, Any]:
+    """api.weather.gov /points/{lat},{lng} response."""
+    rng = _rng("noaa_point", round(latitude, 4), round(longitude, 4))
+    grid_x, grid_y = rng.randint(1, 150), rng.randint(1, 150)
+    office = rng.choice(["MTR", "LOX", "HGX", "MFL", "LIX"])
+    forecast = f"https://api.weather.gov/gridpoints/{office}/{grid_x},{grid_y}"
+    return {
+        "id": f"https://api.weather.gov/points/{latitude},{longitude}",
+        "type": "Feature",
+        "properties": {
+            "gridId": office,
+            "gridX": grid_x,
+            "gridY": grid_y,
+            "forecast": f"{forecast}/forecast",
+            "forecastHourly": f"{forecast}/forecast/hourly",
+            "forecastGridData": forecast,
+            "relativeLocation": {"properties": {"city": "Stand-in City", "state": rng.choice(STATES)}},
+            "timeZone": "America/Los_Angeles",
+            "radarStation": f"K{office}",
+        },
+    }
+
+
+def _state_for(latitude: float, longitude: float) -> str:
+    return _rng("state", round(latitude, 1), round(longitude, 1)).choice(STATES)
+
+
+def geocode(params: Dict[str, str]) -> Dict[str, Any]:
+    """Geocoding API response for an "address" or "latlng" lookup."""
+    if "latlng" in params:
+        latitude, longitude = (float(value) for value in params["latlng"].split(","))
+        state = next((place[2] for place in KNOWN_PLACES.values()
+                      if abs(place[0] - latitude) < 0.5 and abs(place[1] - longitude) < 0.5), None)
+        state = state or _state_for(latitude, longitude)
+        label = state
+    else:
+        address = params.get("address", "")
+        known = next((place for name, place in KNOWN_PLACES.items() if name in address.lower()), None)
+        if known:
+            latitude, longitude, state = known
+        else:
+            rng = _rng("geocode", address.lower().strip())
+            # Continental US
+            latitude, longitude = round(rng.uniform(30.0, 47.0), 7), round(rng.uniform(-122.0, -80.0), 7)
+            match = re.search(r"[,\s]([A-Za-z]{2})\s*$", address)
+            state = match.group(1).upper() if match else _state_for(latitude, longitude)
+        label = address
+    result = {
+        "address_components": [
+            {"long_name": label.split(",")[0].strip().title(), "short_name": label.split(",")[0].strip().title(),
+             "types": ["locality", "political"]},
+            {"long_name": state, "short_name": state, "types": ["administrative_area_level_1", "political"]},
+            {"long_name": "United States", "short_name": "US", "types": ["country", "political"]},
+        ],
+        "formatted_address": f"{label.split(',')[0].strip().title()}, {state}, USA",
+        "geometry": {
+            "location": {"lat": latitude, "lng": longitude},
+            "location_type": "APPROXIMATE",
+            "viewport": {"northeast": {"lat": latitude + 0.05, "lng": longitude + 0.05},
+                         "southwest": {"lat": latitude - 0.05, "lng": longitude - 0.05}},
+        },
+        "place_id": f"standin-geocode-{zlib.crc32(label.encode('utf-8')):08x}",
+        "types": ["locality", "political"],
+    }
+    return {"results": [result], "status": "OK"}
+
+
+def _page_token(latitude: float, longitude: float, search_type: str, radius: int, page: int) -> str:
+    raw = json.dumps([latitude, longitude, search_type, radius, page])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def places_nearby(location: Optional[Dict[str, float]] = None, radius: Optional[int] = None,
+                  search_type: Optional[str] = None, page_token: Optional[str] = None) -> Dict[str, Any]:
+    """Places nearby search response (PLACES_PAGE_SIZE results per page, up to PLACES_MAX_PAGES pages)."""
+    if page_token:
+        latitude, longitude, search_type, radius, page = json.loads(base64.urlsafe_b64decode(page_token))
+    else:
+        latitude, longitude, page = location["lat"], location["lng"], 0
+    radius = int(radius or 5000)
+    rng = _rng("places", round(latitude, 4), round(longitude, 4), search_type, radius, page)
+    names = PLACE_NAMES.get(search_type, ["Place"])
+    results = []
+    for index in range(PLACES_PAGE_SIZE):
+        place_lat, place_lng = _point_near(rng, latitude, longitude, radius)
+        place_id = f"standin-{search_type}-{zlib.crc32(f'{place_lat},{place_lng}'.encode('utf-8')):08x}"
+        results.append({
+            "business_status": "OPERATIONAL",
+            "geometry": {"location": {"lat": place_lat, "lng": place_lng}},
+            "name": f"{rng.choice(['North', 'South', 'Valley', 'Bay', 'Central'])} {rng.choice(names)}",
+            "opening_hours": {"open_now": rng.random() < 0.8},
+            "place_id": place_id,
+            "rating": round(rng.uniform(2.5, 5.0), 1),
+            "types": [search_type or "point_of_interest", "point_of_interest", "establishment"],
+            "user_ratings_total": rng.randint(0, 2000),
+            "vicinity": f"{rng.randint(1, 9999)} {rng.choice(STREETS)}",
+        })
+    response = {"html_attributions": [], "results": results, "status": "OK"}
+    if page + 1 < PLACES_MAX_PAGES:
+        response["next_page_token"] = _page_token(latitude, longitude, search_type, radius, page + 1)
+    return response
+
+
+_BETWEEN = re.compile(r"(LATITUDE|LONGITUDE) BETWEEN (-?[\d.]+) AND (-?[\d.]+)")
+_EQUALS = re.compile(r"(LATITUDE|LONGITUDE) = (-?[\d.]+)")
+
+
+STORM_SCHEMA = [("YEARMONTH", "INTEGER"), ("EPISODE_ID", "INTEGER"), ("LOCATION_INDEX", "INTEGER"),
+                ("AZIMUTH", "STRING"), ("LOCATION", "STRING"), ("LATITUDE", "FLOAT"), ("LONGITUDE", "FLOAT")]
+SHELTER_SCHEMA = [(name, "STRING") for name in (
+    "NAME", "ADDRESS", "CITY", "STATE", "ZIPCODE", "WARD", "PROVIDER", "TYPE", "SUBTYPE", "STATUS"
+)] + [("NUMBER_OF_BEDS", "INTEGER")] + [(name, "STRING") for name in (
+    "ON_SITE_MEDICAL_CLINIC", "AGES_SERVED", "HOW_TO_ACCESS", "LGBTQ_FOCUSED"
+)] + [("LATITUDE", "FLOAT"), ("LONGITUDE", "FLOAT")]
+
+
+def bigquery_schema(sql: str) -> List[Tuple[str, str]]:
+    """(column, type) pairs of the result of a bigquery_tools query."""
+    return STORM_SCHEMA if "StormLocations" in sql else SHELTER_SCHEMA if "Shelter" in sql else []
+
+
+def bigquery_rows(sql: str, payload_scale: float = 1.0) -> List[Dict[str, Any]]:
+    """Rows for the StormLocations and Shelter queries in bigquery_tools."""
+    limit = re.search(r"LIMIT (\d+)", sql)
+    if "StormLocations" in sql:
+        bounds = {column: (float(low), float(high)) for column, low, high in _BETWEEN.findall(sql)}
+        (lat_min, lat_max), (lng_min, lng_max) = bounds.get("LATITUDE", (0, 0)), bounds.get("LONGITUDE", (0, 0))
+        rng = _rng("storms", round(lat_min, 4), round(lng_min, 4))
+        rows = [{
+            "YEARMONTH": 202500 + rng.randint(1, 9),
+            "EPISODE_ID": rng.randint(190000, 199999),
+            "LOCATION_INDEX": rng.randint(1, 5),
+            "AZIMUTH": rng.choice(["N", "NE", "E", "SE", "S", "SW", "W", "NW"]),
+            "LOCATION": f"{rng.randint(1, 9)}MI {rng.choice(['N', 'S', 'E', 'W'])} OF STAND-IN",
+            "LATITUDE": round(rng.uniform(lat_min, lat_max), 4),
+            "LONGITUDE": round(rng.uniform(lng_min, lng_max), 4),
+        } for _ in range(int(rng.randint(10, 60) * payload_scale))]
+        rows = sorted(rows, key=lambda row: (row["LATITUDE"], row["LONGITUDE"]))
+        return rows[:int(limit.group(1))] if limit else rows
+    if "Shelter" in sql:
+        point = {column: float(value) for column, value in _EQUALS.findall(sql)}
+        rng = _rng("shelters", point.get("LATITUDE"), point.get("LONGITUDE"))
+        return [{
+            "NAME": f"Stand-in Shelter {index + 1}",
+            "ADDRESS": f"{rng.randint(1, 9999)} {rng.choice(STREETS)}",
+            "CITY": "Stand-in City",
+            "STATE": _state_for(point.get("LATITUDE", 0.0), point.get("LONGITUDE", 0.0)),
+            "ZIPCODE": f"{rng.randint(10000, 99999)}",
+            "WARD": None,
+            "PROVIDER": "Stand-in Relief",
+            "TYPE": "Emergency",
+            "SUBTYPE": "Family",
+            "STATUS": "Open",
+            "NUMBER_OF_BEDS": rng.randint(10, 300),
+            "ON_SITE_MEDICAL_CLINIC": rng.choice(["Yes", "No"]),
+            "AGES_SERVED": "All",
+            "HOW_TO_ACCESS": "Walk-in",
+            "LGBTQ_FOCUSED": "No",
+            "LATITUDE": point.get("LATITUDE"),
+            "LONGITUDE": point.get("LONGITUDE"),
+        } for index in range(rng.randint(0, 2))]
+    return []
+
+
+
+
+def upstream_for(path: str) -> str:
+    """Which upstream an HTTP path belongs to (paths do not overlap, so one server can host all)."""
+    if path.startswith("/api/open/"):
+        return "fema"
+    if path.startswith("/alerts") or path.startswith("/points/"):
+        return "noaa"
+    if path.startswith("/maps/api/geocode/"):
+        return "geocode"
+    if path.startswith("/maps/api/place/"):
+        return "places"
+    if path.startswith("/bigquery/v2/"):
+        return "bigquery"
+    return "unknown"
+
+
+def _encode_row(row: Dict[str, Any], schema: List[Tuple[str, str]]) -> Dict[str, Any]:
+    """A row in the BigQuery REST format (every value a string)."""
+    return {"f": [{"v": None if row.get(name) is None else str(row[name])} for name, _ in schema]}
+
+
+# ============ STAND-INS ============
+
+class StandInError(Exception):
+    """Injected upstream failure raised by the in-process client stand-ins."""
+
+    def __init__(self, upstream: str, status: int):
+        super().__init__(f"Injected {status} from {upstream} stand-in")
+        self.upstream = upstream
+        self.status = status
+
+
+class UpstreamProfile:
+    """Simulated behavior of one upstream."""
+
+    def __init__(
+        self,
+        latency_ms: Optional[float] = None,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        payload_scale: float = 1.0,
+        pad_bytes: int = 0
+    ):
+        """Create a profile.
+
+        Args:
+            latency_ms: Fixed latency per call (None: typical latency times the latency scale)
+            jitter_ms: Uniform random extra latency, up to this much
+            error_rate: Fraction of calls answered with error_status
+            error_status: HTTP status of injected errors (e.g. 429, 500, 503)
+            payload_scale: Multiplier for the number of items per response where the API allows it
+            pad_bytes: Extra text per item in large feeds (NOAA alert descriptions)
+        """
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.payload_scale = payload_scale
+        self.pad_bytes = pad_bytes
+
+
+class StandIns:
+    """Answers upstream requests, applies the profiles and counts calls."""
+
+    def __init__(self, latency_scale: float = 0.0, profiles: Optional[Dict[str, UpstreamProfile]] = None, seed: int = 0):
+        """Create the stand-ins.
+
+        Args:
+            latency_scale: Multiplier for TYPICAL_LATENCY_SECONDS where a profile sets no latency_ms
+            profiles: Profile per upstream name (see UPSTREAMS)
+            seed: Seed for jitter and error injection, so runs are repeatable
+        """
+        self.latency_scale = latency_scale
+        self.profiles = profiles or {}
+        self.calls: Counter = Counter()
+        self.errors: Counter = Counter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._saved: Dict[str, Any] = {}
+
+    def profile(self, upstream: str) -> UpstreamProfile:
+        return self.profiles.get(upstream) or UpstreamProfile()
+
+    def simulate(self, upstream: str) -> Optional[int]:
+        """Count a call and wait its latency; returns the injected error status, if any."""
+        profile = self.profile(upstream)
+        with self._lock:
+            self.calls[upstream] += 1
+            jitter = self._random.uniform(0, profile.jitter_ms) if profile.jitter_ms else 0.0
+            failed = profile.error_rate > 0 and self._random.random() < profile.error_rate
+            if failed:
+                self.errors[upstream] += 1
+        if profile.latency_ms is not None:
+            delay = (profile.latency_ms + jitter) / 1000
+        else:
+            delay = TYPICAL_LATENCY_SECONDS.get(upstream, 0.0) * self.latency_scale + jitter / 1000
+        if delay > 0:
+            time.sleep(delay)
+        return profile.error_status if failed else None
+
+    def call(self, upstream: str, respond: Callable[[], Any]) -> Any:
+        """Simulate a client call: wait, raise StandInError if an error is injected, else return respond()."""
+        status = self.simulate(upstream)
+        if status:
+            raise StandInError(upstream, status)
+        return respond()
+
+    def handle(self, method: str, path: str, params: Dict[str, str], body: Optional[Dict[str, Any]] = None) -> Tuple[str, int, Dict[str, Any]]:
+        """Answer an HTTP request to any stand-in upstream.
+
+        Returns:
+            (upstream, status_code, json_payload)
+        """
+        upstream = upstream_for(path)
+        status = self.simulate(upstream)
+        if status:
+            return upstream, status, {"error": {"code": status, "message": f"Injected {upstream} stand-in error"}}
+        return (upstream,) + self._route(upstream, method, path, params, body or {})
+
+    def _route(self, upstream: str, method: str, path: str, params: Dict[str, str], body: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        profile = self.profile(upstream)
+        if upstream == "fema" and path.endswith("/DisasterDeclarationsSummaries"):
+            return 200, fema_declarations(params)
+        if upstream == "noaa" and path.startswith("/alerts/active"):
+            count = max(1, int(NOAA_ALERT_COUNT * profile.payload_scale))
+            return 200, noaa_alerts(params, count, profile.pad_bytes)
+        if upstream == "noaa" and path.startswith("/points/"):
+            latitude, longitude = (float(value) for value in path[len("/points/"):].split(","))
+            return 200, noaa_point(latitude, longitude)
+        if upstream == "geocode" and path == "/maps/api/geocode/json":
+            return 200, geocode(params)
+        if upstream == "places" and path == "/maps/api/place/nearbysearch/json":
+            location = None
+            if "location" in params:
+                latitude, longitude = (float(value) for value in params["location"].split(","))
+                location = {"lat": latitude, "lng": longitude}
+            return 200, places_nearby(location, params.get("radius"), params.get("type"), params.get("pagetoken"))
+        if upstream == "bigquery":
+            return self._bigquery(method, path, params, body, profile)
+        return 404, {"error": {"code": 404, "message": f"No stand-in for {method} {path}"}}
+
+    # BigQuery REST: jobs.insert, jobs.query, jobs.get, jobs.getQueryResults, tables.get, tabledata.list
+
+    def _bigquery(self, method: str, path: str, params: Dict[str, str], body: Dict[str, Any],
+                  profile: UpstreamProfile) -> Tuple[int, Dict[str, Any]]:
+        parts = path.strip("/").split("/")  # bigquery/v2/projects/{project}/...
+        project, rest = parts[3] if len(parts) > 3 else "", parts[4:]
+        if method == "POST" and rest == ["jobs"]:
+            job_id = (body.get("jobReference") or {}).get("jobId") or uuid.uuid4().hex
+            query = (body.get("configuration") or {}).get("query", {}).get("query", "")
+            return 200, self._job_resource(project, self._add_job(job_id, query, profile))
+        if method == "POST" and rest == ["queries"]:
+            job = self._add_job(uuid.uuid4().hex, body.get("query", ""), profile)
+            return 200, self._query_results(project, job, {"maxResults": body.get("maxResults")})
+        if method == "GET" and len(rest) == 2 and rest[0] in ("jobs", "queries"):
+            job = self._jobs.get(rest[1])
+            if job is None:
+                return 404, {"error": {"code": 404, "message": f"Not found: Job {project}:{rest[1]}"}}
+            return 200, self._job_resource(project, job) if rest[0] == "jobs" else self._query_results(project, job, params)
+        if method == "GET" and len(rest) >= 4 and rest[0] == "datasets" and rest[2] == "tables":
+            job = self._jobs.get(rest[3])
+            if job is None:
+                return 404, {"error": {"code": 404, "message": f"Not found: Table {rest[3]}"}}
+            if rest[4:] == ["data"]:
+                return 200, {"kind": "bigquery#tableDataList", **self._page(job, params)}
+            return 200, {
+                "kind": "bigquery#table",
+                "tableReference": {"projectId": project, "datasetId": "_standin", "tableId": job["id"]},
+                "schema": {"fields": [{"name": name, "type": kind, "mode": "NULLABLE"} for name, kind in job["schema"]]},
+                "numRows": str(len(job["rows"])),
+                "type": "TABLE",
+            }
+        return 404, {"error": {"code": 404, "message": f"No stand-in for {method} {path}"}}
+
+    def _add_job(self, job_id: str, query: str, profile: UpstreamProfile) -> Dict[str, Any]:
+        job = {"id": job_id, "query": query, "schema": bigquery_schema(query),
+               "rows": bigquery_rows(query, profile.payload_scale), "created_ms": int(time.time() * 1000)}
+        with self._lock:
+            self._jobs[job_id] = job
+            while len(self._jobs) > MAX_BIGQUERY_JOBS:
+                self._jobs.popitem(last=False)
+        return job
+
+    def _job_resource(self, project: str, job: Dict[str, Any]) -> Dict[str, Any]:
+        reference = {"projectId": project, "jobId": job["id"], "location": "US"}
+        return {
+            "kind": "bigquery#job",
+            "id": f"{project}:US.{job['id']}",
+            "jobReference": reference,
+            "configuration": {"jobType": "QUERY", "query": {
+                "query": job["query"], "useLegacySql": False,
+                "destinationTable": {"projectId": project, "datasetId": "_standin", "tableId": job["id"]},
+            }},
+            "status": {"state": "DONE"},
+            "statistics": {
+                "creationTime": str(job["created_ms"]), "startTime": str(job["created_ms"]), "endTime": str(job["created_ms"]),
+                "query": {"statementType": "SELECT", "totalBytesProcessed": "0", "cacheHit": False},
+            },
+        }
+
+    def _page(self, job: Dict[str, Any], params: Dict[str, Any]) -> Dict[str, Any]:
+        """One page of a job's rows (pageToken is the start index)."""
+        rows = job["rows"]
+        start = int(params.get("pageToken") or params.get("startIndex") or 0)
+        max_results = params.get("maxResults")
+        end = len(rows) if max_results in (None, "") else min(len(rows), start + int(max_results))
+        page = {"totalRows": str(len(rows))}
+        if end > start:
+            page["rows"] = [_encode_row(row, job["schema"]) for row in rows[start:end]]
+        if end < len(rows):
+            page["pageToken"] = str(end)
+        return page
+
+    def _query_results(self, project: str, job: Dict[str, Any], params: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "kind": "bigquery#getQueryResultsResponse",
+            "jobReference": {"projectId": project, "jobId": job["id"], "location": "US"},
+            "jobComplete": True,
+            "schema": {"fields": [{"name": name, "type": kind, "mode": "NULLABLE"} for name, kind in job["schema"]]},
+            "totalBytesProcessed": "0",
+            "cacheHit": False,
+            **self._page(job, params),
+        }
+
+    # In-process installation
+
+    def install(self) -> "StandIns":
+        """Point the shared HTTP session, Places client and BigQuery client at the stand-ins."""
+        from first_responder_agent.common import bigquery_tools, search_places_tool
+        from first_responder_agent.common.http import get_session
+
+        session = get_session()
+        adapter = StandInAdapter(self)
+        for host in HOSTS:
+            session.mount(f"https://{host}/", adapter)
+        self._saved = {
+            "gmaps_client": search_places_tool.gmaps_client,
+            "bigquery_client": bigquery_tools.bigquery_client,
+            "GOOGLE_MAPS_API_KEY": os.environ.get("GOOGLE_MAPS_API_KEY"),
+        }
+        search_places_tool.gmaps_client = StandInPlacesClient(self)
+        bigquery_tools.bigquery_client = StandInBigQueryClient(self)
+        # Geocoding refuses to run without a key
+        os.environ["GOOGLE_MAPS_API_KEY"] = os.environ.get("GOOGLE_MAPS_API_KEY") or "standin-key"
+        return self
+
+    def uninstall(self) -> None:
+        """Restore the real clients."""
+        from first_responder_agent.common import bigquery_tools, search_places_tool
+        from first_responder_agent.common.http import get_session
+
+        session = get_session()
+        for host in HOSTS:
+            session.adapters.pop(f"https://{host}/", None)
+        search_places_tool.gmaps_client = self._saved.get("gmaps_client")
+        bigquery_tools.bigquery_client = self._saved.get("bigquery_client")
+        if self._saved.get("GOOGLE_MAPS_API_KEY") is None:
+            os.environ.pop("GOOGLE_MAPS_API_KEY", None)
+
+
+def parse_profiles(latency_ms: List[str] = (), jitter_ms: List[str] = (), error_rate: List[str] = (),
+                   error_status: List[str] = (), payload_scale: List[str] = (), pad_bytes: List[str] = ()) -> Dict[str, UpstreamProfile]:
+    """Build profiles from "upstream=value" settings; a bare value applies to every upstream.
+
+    Example: parse_profiles(latency_ms=["50", "bigquery=1200"], error_rate=["noaa=0.1"])
+    """
+    fields = {"latency_ms": (latency_ms, float), "jitter_ms": (jitter_ms, float), "error_rate": (error_rate, float),
+              "error_status": (error_status, int), "payload_scale": (payload_scale, float), "pad_bytes": (pad_bytes, int)}
+    profiles = {upstream: UpstreamProfile() for upstream in UPSTREAMS}
+    for field, (settings, convert) in fields.items():
+        # Bare values first, so "upstream=value" settings override them
+        for setting in sorted(settings or (), key=lambda item: "=" in item):
+            name, _, value = setting.rpartition("=")
+            targets = [name] if name else UPSTREAMS
+            for target in targets:
+                if target not in profiles:
+                    raise ValueError(f"Unknown upstream {target!r} (expected one of {', '.join(UPSTREAMS)})")
+                setattr(profiles[target], field, convert(value))
+    return profiles
+
+
+class StandInAdapter(BaseAdapter):
+    """requests transport adapter that answers from the stand-ins instead of the network."""
+
+    def __init__(self, standins: StandIns):
+        super().__init__()
+        self.standins = standins
+
+    def send(self, request: requests.PreparedRequest, stream: bool = False, timeout: Any = None,
+             verify: Any = True, cert: Any = None, proxies: Any = None) -> requests.Response:
+        parts = urlsplit(request.url)
+        body = json.loads(request.body) if request.body else None
+        _, status, payload = self.standins.handle(request.method, parts.path, dict(parse_qsl(parts.query)), body)
+
+        response = requests.Response()
+        response.status_code = status
+        response.reason = "OK" if status < 400 else "Error"
+        response._content = json.dumps(payload).encode("utf-8")
+        response.headers["Content-Type"] = "application/json"
+        response.encoding = "utf-8"
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self) -> None:
+        pass
+
+
+class StandInPlacesClient:
+    """Stand-in for googlemaps.Client covering the calls search_places_tool makes."""
+
+    def __init__(self, standins: StandIns):
+        self.standins = standins
+
+    def places_nearby(self, location: Optional[Dict[str, float]] = None, radius: Optional[int] = None,
+                      type: Optional[str] = None, page_token: Optional[str] = None, **kwargs: Any) -> Dict[str, Any]:
+        return self.standins.call("places", lambda: places_nearby(location, radius, type, page_token))
+
+
+class _StandInQueryJob:
+    def __init__(self, standins: StandIns, sql: str):
+        self.standins = standins
+        self.sql = sql
+
+    def result(self, **kwargs: Any) -> List[Dict[str, Any]]:
+        profile = self.standins.profile("bigquery")
+        return self.standins.call("bigquery", lambda: bigquery_rows(self.sql, profile.payload_scale))
+
+
+class StandInBigQueryClient:
+    """Stand-in for google.cloud.bigquery.Client covering the queries bigquery_tools runs."""
+
+    project = "a4i-standin"
+
+    def __init__(self, standins: StandIns):
+        self.standins = standins
+
+    def query(self, sql: str, **kwargs: Any) -> _StandInQueryJob:
+        return _StandInQueryJob(self.standins, sql)
@@ -0,0 +1,99 @@
+"""Print per-invocation span waterfalls from a JSONL trace file.
+
+Usage:
+    python -m perf.waterfall traces.jsonl                 # most recent trace
+    python -m perf.waterfall traces.jsonl --last 3        # three most recent traces
+    python -m perf.waterfall traces.jsonl --trace-id <id> # one trace
+"""
+
+import argparse
+import json
+import sys
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+
+def load_spans(path: str) -> Dict[str, List[Dict[str, Any]]]:
+    """Read spans written by JsonlSpanExporter, grouped by trace id."""
+    traces: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    with open(path, encoding="utf-8") as source:
+        for line in source:
+            line = line.strip()
+            if line:
+                span = json.loads(line)
+                traces[span["trace_id"]].append(span)
+    return traces
+
+
+def _label(span: Dict[str, Any]) -> str:
+    """Span name plus its most useful attributes."""
+    attributes = span.get("attributes", {})
+    details = [f"{key[4:]}={value}" for key, value in attributes.items() if key.startswith("a4i.") and key != "a4i.kind"]
+    if "http.response.status_code" in attributes:
+        details.append(f"status={attributes['http.response.status_code']}")
+    label = span["name"]
+    if details:
+        label += f" ({', '.join(details)})"
+    if span.get("status") == "ERROR":
+        label += " !"
+    return label
+
+
+def render(spans: List[Dict[str, Any]], width: int = 40) -> str:
+    """Render one trace as an indented waterfall with offset, duration and a timeline bar."""
+    spans = [span for span in spans if span.get("end_ns")]
+    if not spans:
+        return ""
+    start = min(span["start_ns"] for span in spans)
+    end = max(span["end_ns"] for span in spans)
+    total = max(end - start, 1)
+
+    by_id = {span["span_id"]: span for span in spans}
+    children: Dict[Optional[str], List[Dict[str, Any]]] = defaultdict(list)
+    for span in spans:
+        parent = span.get("parent_id") if span.get("parent_id") in by_id else None
+        children[parent].append(span)
+
+    lines = [f"trace {spans[0]['trace_id']}  {total / 1e6:.1f} ms, {len(spans)} spans"]
+
+    def walk(parent: Optional[str], depth: int) -> None:
+        for span in sorted(children[parent], key=lambda item: item["start_ns"]):
+            offset = span["start_ns"] - start
+            duration = span["end_ns"] - span["start_ns"]
+            bar_start = int(offset / total * width)
+            bar_length = max(1, int(duration / total * width))
+            bar = " " * bar_start + "#" * min(bar_length, width - bar_start)
+            lines.append(
+                f"{offset / 1e6:>9.1f} {duration / 1e6:>9.1f} ms |{bar:<{width}}| "
+                f"{'  ' * depth}{_label(span)}"
+            )
+            walk(span["span_id"], depth + 1)
+
+    walk(None, 0)
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Print span waterfalls from a JSONL trace file")
+    parser.add_argument("path", help="JSONL trace file (TRACE_JSONL_PATH)")
+    parser.add_argument("--trace-id", help="Trace id to show")
+    parser.add_argument("--last", type=int, default=1, help="Number of most recent traces to show (default: 1)")
+    parser.add_argument("--width", type=int, default=40, help="Timeline bar width (default: 40)")
+    args = parser.parse_args(argv)
+
+    traces = load_spans(args.path)
+    if args.trace_id:
+        if args.trace_id not in traces:
+            print(f"Trace {args.trace_id} not found in {args.path}", file=sys.stderr)
+            return 1
+        selected = [traces[args.trace_id]]
+    else:
+        ordered = sorted(traces.values(), key=lambda spans: min(span["start_ns"] for span in spans))
+        selected = ordered[-args.last:]
+
+    print("\n\n".join(render(spans, args.width) for spans in selected))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -11,9 +11,11 @@ const AGENT_MESSAGES: Record<string, string> = {
   "shelter_finder_agent": "🏠 Finding shelters around you...",
   "hospital_finder_agent": "🏥 Finding hospitals around you...",
   "supply_finder_agent": "📦 Finding supplies around you...",
+  "all_relief_finder_agent": "🧭 Finding shelters, hospitals and supplies around you...",
   "insights_agent": "📊 Analyzing data and creating action plan...",
   "fema_live_agent": "🚨 Checking FEMA disaster data...",
   "noaa_live_agent": "🌊 Checking NOAA weather alerts...",
+  "live_discovery_tool": "🛰️ Fetching FEMA and NOAA live data...",
   "bigquery_storms_tool": "🌩️ Querying storm data from BigQuery...",
   "bigquery_shelter_tool": "🏠 Querying shelter data from BigQuery...",
   "bigquery_hospital_tool": "🏥 Querying hospital data from BigQuery...",
@@ -47,6 +47,12 @@ const AGENT_INFO: Record<string, { name: string; icon: string; description: stri
     description: "Finding emergency supplies",
     color: "yellow"
   },
+  "all_relief_finder_agent": {
+    name: "All Relief Finder",
+    icon: "🧭",
+    description: "Finding shelters, hospitals and supplies in parallel",
+    color: "green"
+  },
   "insights_agent": {
     name: "Insights Agent",
     icon: "📊",
@@ -65,6 +71,12 @@ const AGENT_INFO: Record<string, { name: string; icon: string; description: stri
     description: "Checking weather alerts and forecasts",
     color: "blue"
   },
+  "live_discovery_tool": {
+    name: "Live Discovery",
+    icon: "🛰️",
+    description: "Fetching FEMA and NOAA live data in parallel",
+    color: "orange"
+  },
   "bigquery_storms_tool": {
     name: "BigQuery Storms",
     icon: "🌩️",